@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import HTTPException, status
+
+from .config import (
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_MAX_QUEUE_WAIT,
+    RPC_CONCURRENCY_INITIAL,
+    RPC_CONCURRENCY_MAX,
+    RPC_CONCURRENCY_MIN,
+    RPC_LATENCY_TARGET,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    detail = "Line provider service is overloaded, retry later."
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Admission rejected, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit on outstanding line-provider calls: every call that finishes
+    under the latency target grows the limit by roughly one per "window" of
+    calls, a slow call shrinks it a little and a timeout halves it. Callers
+    over the limit wait in a bounded FIFO queue for at most `max_queue_wait`
+    seconds and are then rejected, so an overloaded line-provider sheds load
+    quickly instead of every request waiting for the full RPC timeout.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        max_queue: int,
+        max_queue_wait: float,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.max_queue_wait))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self._acquire()
+        started_at = time.monotonic()
+        try:
+            yield
+        except TimeoutError:
+            self._on_overload()
+            raise
+        else:
+            self._on_success(time.monotonic() - started_at)
+        finally:
+            self._release()
+
+    async def _acquire(self) -> None:
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            raise AdmissionRejected(self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_queue_wait)
+        except TimeoutError:
+            if waiter.done():
+                # The slot was handed over just as the wait ran out.
+                return
+            self._waiters.remove(waiter)
+            raise AdmissionRejected(self.retry_after)
+        except asyncio.CancelledError:
+            if waiter.done():
+                self._release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            self._waiters.popleft().set_result(None)
+
+    def _on_success(self, latency: float) -> None:
+        if latency > self.latency_target:
+            self.limit = max(self.min_limit, self.limit * 0.9)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def _on_overload(self) -> None:
+        self.limit = max(self.min_limit, self.limit / 2)
+        logger.warning(
+            f"Line-provider call timed out, concurrency limit {self.limit:.1f}"
+        )
+
+
+rpc_limiter = AdaptiveConcurrencyLimiter(
+    initial_limit=RPC_CONCURRENCY_INITIAL,
+    min_limit=RPC_CONCURRENCY_MIN,
+    max_limit=RPC_CONCURRENCY_MAX,
+    latency_target=RPC_LATENCY_TARGET,
+    max_queue=ADMISSION_MAX_QUEUE,
+    max_queue_wait=ADMISSION_MAX_QUEUE_WAIT,
+)
+
+
+def service_unavailable(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=e.detail,
+        headers={"Retry-After": str(e.retry_after)},
+    )
@@ -0,0 +1,202 @@
+"""
+Columnar exports of the bets table for analytics, served by
+GET /admin/bets/export and written to a file by
+`python -m app.analytics --format parquet -o bets.parquet`.
+
+Bets are read in EXPORT_BATCH_SIZE batches through server-side cursors on
+every shard, merged in id order, and each batch becomes one Arrow record
+batch: an Arrow IPC stream message or a Parquet row group. Money columns are
+decimals of the database's own precision, and the enum columns are
+dictionary-encoded against the full set of enum values, so every batch
+shares one dictionary. Building and encoding a batch runs on a worker
+thread, off the event loop.
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import AsyncIterator, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import String, cast
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from . import sharding
+from .config import EXPORT_BATCH_SIZE
+from .database import async_session_maker
+from .logging_config import setup_logging
+from .models import bets
+from .schemas import BetPrediction, BetStatus
+
+logger = logging.getLogger(__name__)
+
+EXPORT_MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+PREDICTIONS = [prediction.value for prediction in BetPrediction]
+STATUSES = [bet_status.value for bet_status in BetStatus]
+
+BET_SCHEMA = pa.schema(
+    [
+        pa.field("id", pa.int64(), nullable=False),
+        pa.field("event_id", pa.int64(), nullable=False),
+        pa.field(
+            "bet_prediction", pa.dictionary(pa.int8(), pa.string()), nullable=False
+        ),
+        pa.field("coefficient", pa.decimal128(3, 2), nullable=False),
+        pa.field("amount", pa.decimal128(10, 2), nullable=False),
+        pa.field("possible_winning", pa.decimal128(15, 2), nullable=False),
+        pa.field("status", pa.dictionary(pa.int8(), pa.string())),
+    ]
+)
+
+
+def bets_export_query(event_id: Optional[int], bet_status: Optional[BetStatus]):
+    # Enum columns come back as their text labels, which skips building an
+    # enum member per row only to take its value again.
+    query = select(
+        bets.c.id,
+        bets.c.event_id,
+        cast(bets.c.bet_prediction, String).label("bet_prediction"),
+        bets.c.coefficient,
+        bets.c.amount,
+        bets.c.possible_winning,
+        cast(bets.c.status, String).label("status"),
+    )
+    if event_id is not None:
+        query = query.where(bets.c.event_id == event_id)
+    if bet_status is not None:
+        query = query.where(bets.c.status == bet_status)
+    return query
+
+
+def dictionary_array(values, dictionary: list[str]) -> pa.DictionaryArray:
+    codes = {value: code for code, value in enumerate(dictionary)}
+    indices = pa.array([codes.get(value) for value in values], pa.int8())
+    return pa.DictionaryArray.from_arrays(indices, pa.array(dictionary, pa.string()))
+
+
+def record_batch(rows) -> pa.RecordBatch:
+    ids, event_ids, predictions, coefficients, amounts, winnings, statuses = zip(*rows)
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array(ids, pa.int64()),
+            pa.array(event_ids, pa.int64()),
+            dictionary_array(predictions, PREDICTIONS),
+            pa.array(coefficients, pa.decimal128(3, 2)),
+            pa.array(amounts, pa.decimal128(10, 2)),
+            pa.array(winnings, pa.decimal128(15, 2)),
+            dictionary_array(statuses, STATUSES),
+        ],
+        schema=BET_SCHEMA,
+    )
+
+
+class ChunkSink:
+    """
+    Write-only file object for pyarrow's writers that keeps what they write
+    until take() hands it out.
+    """
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def open_writer(export_format: str, sink: ChunkSink):
+    output = pa.PythonFile(sink, mode="w")
+    if export_format == "parquet":
+        return pq.ParquetWriter(output, BET_SCHEMA)
+    return pa.ipc.new_stream(output, BET_SCHEMA)
+
+
+async def export_bets(
+    session: AsyncSession,
+    export_format: str,
+    event_id: Optional[int] = None,
+    bet_status: Optional[BetStatus] = None,
+    batch_size: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """
+    The bets matching the filters, in id order, as an Arrow IPC stream or a
+    Parquet file, yielded a record batch at a time.
+    """
+    batch_size = batch_size or EXPORT_BATCH_SIZE
+    sink = ChunkSink()
+    writer = open_writer(export_format, sink)
+
+    def write_batch(rows) -> bytes:
+        writer.write_batch(record_batch(rows))
+        return sink.take()
+
+    def close_writer() -> bytes:
+        writer.close()
+        return sink.take()
+
+    exported = 0
+    query = bets_export_query(event_id, bet_status)
+    async for rows in sharding.stream_shards(session, query, "id", batch_size):
+        yield await asyncio.to_thread(write_batch, rows)
+        exported += len(rows)
+    yield await asyncio.to_thread(close_writer)
+
+    logger.info(f"Exported {exported} bets as {export_format}")
+
+
+async def export_to_file(
+    path: str,
+    export_format: str,
+    event_id: Optional[int] = None,
+    bet_status: Optional[BetStatus] = None,
+) -> None:
+    async with async_session_maker() as session:
+        with open(path, "wb") as file:
+            async for data in export_bets(session, export_format, event_id, bet_status):
+                file.write(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--format", choices=EXPORT_MEDIA_TYPES, default="parquet")
+    parser.add_argument("--event-id", type=int)
+    parser.add_argument("--status", choices=STATUSES)
+    parser.add_argument("-o", "--output", required=True, help="file to write")
+    args = parser.parse_args()
+
+    setup_logging()
+    asyncio.run(
+        export_to_file(
+            args.output,
+            args.format,
+            args.event_id,
+            BetStatus(args.status) if args.status else None,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
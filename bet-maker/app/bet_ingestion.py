@@ -0,0 +1,196 @@
+"""
+Write-behind bet placement, used when BET_INGESTION_MODE is "stream".
+POST /bets/ takes the bet's id from ids pre-allocated off the bets id
+sequence in blocks of BET_ID_BLOCK_SIZE, appends the bet to a Redis stream
+and returns once Redis has it; app.bet_writer drains the stream into the
+bets table in COPY batches. Placed bets therefore show up in GET /bets/
+after a short delay instead of immediately.
+
+The queue is only as durable as Redis is configured to be: run it with
+appendonly and appendfsync always (or everysec, accepting up to a second
+of loss on a crash).
+"""
+
+import asyncio
+import logging
+from collections import deque
+from decimal import ROUND_HALF_UP, Decimal
+
+from fastapi import HTTPException, status
+from redis.exceptions import RedisError, ResponseError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import (
+    BET_ID_BLOCK_SIZE,
+    BET_STREAM_NAME,
+    BET_WRITER_BATCH_SIZE,
+    BET_WRITER_BLOCK_MS,
+    BET_WRITER_CONSUMER_NAME,
+)
+from .redis_client import get_redis
+from .schemas import BetCreate, BetResponse, BetStatus
+
+logger = logging.getLogger(__name__)
+
+WRITER_GROUP = "bet-writers"
+
+# Entries another writer took but hasn't acknowledged for this long are
+# taken over, so bets held by a writer that went away still get written.
+CLAIM_IDLE_MS = 60_000
+
+ALLOCATE_IDS_QUERY = text(
+    "SELECT nextval(pg_get_serial_sequence('bets', 'id')) "
+    "FROM generate_series(1, :block_size)"
+)
+
+
+class IdAllocator:
+    """
+    Hands out bet ids from blocks reserved off the bets id sequence, so most
+    bets don't need a database round trip for their id. Ids left in a block
+    when the process exits are simply never used.
+    """
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        self._ids: deque[int] = deque()
+        self._lock = asyncio.Lock()
+
+    async def next_id(self, session: AsyncSession) -> int:
+        async with self._lock:
+            if not self._ids:
+                result = await session.execute(
+                    ALLOCATE_IDS_QUERY, {"block_size": self.block_size}
+                )
+                self._ids.extend(result.scalars())
+            return self._ids.popleft()
+
+
+id_allocator = IdAllocator(BET_ID_BLOCK_SIZE)
+
+
+async def enqueue_bet(
+    session: AsyncSession,
+    bet: BetCreate,
+    coefficient: Decimal,
+    possible_winning: Decimal,
+) -> BetResponse:
+    try:
+        bet_id = await id_allocator.next_id(session)
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while allocating a bet id: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred",
+        )
+
+    queued_bet = BetResponse(
+        id=bet_id,
+        event_id=bet.event_id,
+        bet_prediction=bet.bet_prediction,
+        coefficient=coefficient,
+        amount=bet.amount,
+        possible_winning=possible_winning.quantize(Decimal("0.01"), ROUND_HALF_UP),
+        status=BetStatus.NOT_PLAYED,
+    )
+
+    try:
+        await get_redis().xadd(BET_STREAM_NAME, {"bet": queued_bet.model_dump_json()})
+    except RedisError as e:
+        logger.error(f"Failed to queue bet {bet_id}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Bet queue is unavailable.",
+        )
+
+    return queued_bet
+
+
+def row_for_copy(bet: BetResponse) -> dict:
+    # COPY takes enum columns as their text labels.
+    return {
+        **bet.model_dump(),
+        "bet_prediction": bet.bet_prediction.value,
+        "status": bet.status.value,
+    }
+
+
+async def ensure_writer_group() -> None:
+    try:
+        await get_redis().xgroup_create(
+            BET_STREAM_NAME, WRITER_GROUP, id="0", mkstream=True
+        )
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def claim_stale_entries(min_idle_ms: int = CLAIM_IDLE_MS) -> None:
+    """
+    Makes every entry another writer has held unacknowledged for at least
+    `min_idle_ms` pending on this one; 0 takes over all of them.
+    """
+    start_id = "0-0"
+    while True:
+        # Not justid: redis-py drops the cursor from JUSTID replies.
+        next_id, *_ = await get_redis().xautoclaim(
+            BET_STREAM_NAME,
+            WRITER_GROUP,
+            BET_WRITER_CONSUMER_NAME,
+            min_idle_time=min_idle_ms,
+            start_id=start_id,
+            count=BET_WRITER_BATCH_SIZE,
+        )
+        if next_id == "0-0":
+            return
+        start_id = next_id
+
+
+async def count_pending_entries() -> int:
+    """Entries delivered to any writer of the group and not yet acknowledged."""
+    summary = await get_redis().xpending(BET_STREAM_NAME, WRITER_GROUP)
+    return summary["pending"]
+
+
+async def read_queued_bets(
+    pending: bool, block_ms: int | None = BET_WRITER_BLOCK_MS
+) -> list[tuple[str, dict | None]]:
+    """
+    Reads up to BET_WRITER_BATCH_SIZE stream entries for this writer: its
+    own delivered-but-unacknowledged entries if `pending`, otherwise new
+    ones, waiting up to `block_ms` (None: not at all) for them. Returns
+    (entry id, bet row) pairs; the row is None for a pending entry no longer
+    in the stream.
+    """
+    response = await get_redis().xreadgroup(
+        WRITER_GROUP,
+        BET_WRITER_CONSUMER_NAME,
+        {BET_STREAM_NAME: "0" if pending else ">"},
+        count=BET_WRITER_BATCH_SIZE,
+        block=None if pending else block_ms,
+    )
+    if not response:
+        return []
+
+    _, entries = response[0]
+    return [
+        (
+            entry_id,
+            (
+                row_for_copy(BetResponse.model_validate_json(fields["bet"]))
+                if fields
+                else None
+            ),
+        )
+        for entry_id, fields in entries
+    ]
+
+
+async def acknowledge(entry_ids: list[str]) -> None:
+    if entry_ids:
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.xack(BET_STREAM_NAME, WRITER_GROUP, *entry_ids)
+            pipe.xdel(BET_STREAM_NAME, *entry_ids)
+            await pipe.execute()
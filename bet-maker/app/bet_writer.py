@@ -0,0 +1,85 @@
+"""
+Background writer for write-behind bet placement (see app.bet_ingestion).
+Drains the bet stream in batches of up to BET_WRITER_BATCH_SIZE, writing
+each batch to the bets table with one COPY and one commit before
+acknowledging it. A batch that fails stays pending and is retried, and
+copy_bets skips bets already stored, so every queued bet is written once.
+"""
+
+import asyncio
+import logging
+
+from .bet_ingestion import (
+    acknowledge,
+    claim_stale_entries,
+    count_pending_entries,
+    ensure_writer_group,
+    read_queued_bets,
+)
+from .config import BET_WRITER_BLOCK_MS
+from .crud import copy_bets
+from .database import get_async_session
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY = 1.0
+
+# Settlement drains the stream through the same lock, so it never races the
+# background loop over the same entries.
+writer_lock = asyncio.Lock()
+
+
+async def flush_once(pending: bool, block_ms: int | None = None) -> int:
+    """Writes one batch; returns how many stream entries it handled."""
+    async with writer_lock:
+        entries = await read_queued_bets(pending, block_ms)
+        if not entries:
+            return 0
+
+        rows = [row for _, row in entries if row is not None]
+        if rows:
+            async for session in get_async_session():
+                written = await copy_bets(session, rows)
+                await session.commit()
+            logger.info("Wrote %d of %d queued bets", written, len(rows))
+
+        await acknowledge([entry_id for entry_id, _ in entries])
+        return len(entries)
+
+
+async def drain() -> None:
+    """
+    Writes every bet queued so far, e.g. before their events are settled.
+    Entries another writer replica took but hasn't written yet are taken
+    over too, until no writer of the group holds any; copy_bets skips those
+    that replica writes meanwhile.
+    """
+    await ensure_writer_group()
+    while True:
+        await claim_stale_entries(min_idle_ms=0)
+        while await flush_once(pending=True):
+            pass
+        while await flush_once(pending=False):
+            pass
+        if not await count_pending_entries():
+            return
+
+
+async def run_bet_writer() -> None:
+    # This writer's unacknowledged entries, left by a crash or a failed
+    # batch, are written before any new ones.
+    pending = True
+    while True:
+        try:
+            if pending:
+                await ensure_writer_group()
+                await claim_stale_entries()
+                pending = bool(await flush_once(pending=True))
+            else:
+                await flush_once(pending=False, block_ms=BET_WRITER_BLOCK_MS)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Bet writer failed, retrying: {e}", exc_info=True)
+            pending = True
+            await asyncio.sleep(RETRY_DELAY)
@@ -0,0 +1,128 @@
+"""
+Cash-out quotes for open single bets. Whenever an event's odds move, every
+open bet on it is re-priced in one vectorized pass and the quotes are stored
+in a per-event Redis hash, so GET /bets/{id}/cashout is a single HGET.
+
+A quote is the stake scaled by how the odds on the bet's prediction moved
+since it was placed, minus CASHOUT_MARGIN, and never more than the bet's
+possible winning:
+
+    cashout = amount * placed_coefficient / current_coefficient * (1 - margin)
+
+Pricing runs in integer cents, so quotes are rounded down exactly.
+"""
+
+import json
+import logging
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from . import sharding
+from .config import CASHOUT_MARGIN, CASHOUT_QUOTE_TTL
+from .exposure import from_cents, to_cents
+from .models import bets
+from .redis_client import get_redis
+from .schemas import BetPrediction, BetStatus
+
+logger = logging.getLogger(__name__)
+
+
+def quotes_key(event_id: int) -> str:
+    return f"cashout:event:{event_id}"
+
+
+def price_cashouts(
+    amounts: np.ndarray,
+    coefficients: np.ndarray,
+    current_coefficients: np.ndarray,
+    margin: float = CASHOUT_MARGIN,
+) -> np.ndarray:
+    """
+    Cash-out values in cents, rounded down, for arrays of open bets given
+    their amounts in cents and their coefficients in hundredths. All the
+    arithmetic is on int64 (the margin to basis points), which holds stakes
+    up to the amount column's 99 999 999.99 without overflowing.
+    """
+    amounts = amounts.astype(np.int64)
+    scaled_winnings = amounts * coefficients.astype(np.int64)
+    keep = round((1 - margin) * 10_000)
+    values = scaled_winnings * keep // (current_coefficients.astype(np.int64) * 10_000)
+    return np.minimum(values, scaled_winnings // 100)
+
+
+async def reprice_event(
+    session: AsyncSession,
+    event_id: int,
+    coef_1st_team_win: Decimal,
+    coef_2nd_team_win: Decimal,
+) -> dict[int, dict]:
+    """
+    Re-prices every open bet on an event at the given odds and replaces the
+    event's stored quotes; returns the new quotes by bet id.
+    """
+    query = select(
+        bets.c.id,
+        (bets.c.bet_prediction == BetPrediction.FIRST_TEAM_WIN).label("first_team"),
+        bets.c.coefficient,
+        bets.c.amount,
+    ).where(bets.c.event_id == event_id, bets.c.status == BetStatus.NOT_PLAYED)
+    async with sharding.session_for_event(session, event_id) as shard_session:
+        rows = (await shard_session.execute(query)).fetchall()
+
+    redis = get_redis()
+    if not rows:
+        await redis.delete(quotes_key(event_id))
+        return {}
+
+    bet_ids, first_team, coefficients, amounts = zip(*rows)
+    current_coefficients = np.where(
+        np.array(first_team, dtype=bool),
+        to_cents(coef_1st_team_win),
+        to_cents(coef_2nd_team_win),
+    )
+    values = price_cashouts(
+        np.array([to_cents(amount) for amount in amounts], dtype=np.int64),
+        np.array([to_cents(coefficient) for coefficient in coefficients]),
+        current_coefficients,
+    )
+
+    priced_at = datetime.now(timezone.utc).isoformat()
+    quotes = {
+        bet_id: {
+            "cashout_value": f"{from_cents(value):.2f}",
+            "current_coefficient": f"{from_cents(current_coefficient):.2f}",
+            "priced_at": priced_at,
+        }
+        for bet_id, value, current_coefficient in zip(
+            bet_ids, values.tolist(), current_coefficients.tolist()
+        )
+    }
+
+    # Swapped in atomically, so readers never see a half-written event.
+    # The TTL bounds how stale a quote can get if an odds message is lost.
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.delete(quotes_key(event_id))
+        pipe.hset(
+            quotes_key(event_id),
+            mapping={bet_id: json.dumps(quote) for bet_id, quote in quotes.items()},
+        )
+        pipe.expire(quotes_key(event_id), CASHOUT_QUOTE_TTL)
+        await pipe.execute()
+
+    logger.info("Re-priced cash-out for %d bets on event_id: %s", len(quotes), event_id)
+    return quotes
+
+
+async def get_quote(event_id: int, bet_id: int) -> dict | None:
+    stored = await get_redis().hget(quotes_key(event_id), str(bet_id))
+    return json.loads(stored) if stored is not None else None
+
+
+async def drop_quotes(event_ids: list[int]) -> None:
+    """Forgets the quotes of settled events."""
+    if event_ids:
+        await get_redis().delete(*(quotes_key(event_id) for event_id in event_ids))
@@ -0,0 +1,96 @@
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from .admission import AdmissionRejected
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpen(AdmissionRejected):
+    detail = "Line provider service is unavailable, retry later."
+
+    def __str__(self) -> str:
+        return f"Circuit open, retry after {self.retry_after}s"
+
+
+class CircuitBreaker:
+    """
+    Fails line-provider calls fast while line-provider looks down. Closed,
+    calls go through; `failure_threshold` consecutive failures or timeouts
+    open it, and for `reset_timeout` seconds every call is rejected with
+    CircuitOpen at once instead of waiting out its timeout. It is then
+    half-open: one probe call goes through while the others are still
+    rejected, and the probe's outcome closes or reopens it.
+
+    A call shed by the admission limiter says nothing about line-provider
+    and counts as neither a success nor a failure.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+    @property
+    def retry_after(self) -> int:
+        remaining = self.opened_at + self.reset_timeout - time.monotonic()
+        return max(1, math.ceil(remaining))
+
+    @asynccontextmanager
+    async def call(self) -> AsyncIterator[None]:
+        probe = self._admit()
+        try:
+            yield
+        except AdmissionRejected:
+            raise
+        except Exception:
+            self._on_failure()
+            raise
+        else:
+            self._on_success()
+        finally:
+            if probe:
+                self.probing = False
+
+    def _admit(self) -> bool:
+        """Raises CircuitOpen unless the call may go through; True for a probe."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpen(self.retry_after)
+            self.state = self.HALF_OPEN
+            logger.info("Line-provider circuit half-open, sending a probe call")
+
+        if self.state == self.HALF_OPEN:
+            if self.probing:
+                raise CircuitOpen(self.retry_after)
+            self.probing = True
+            return True
+        return False
+
+    def _on_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED and self.failures >= self.failure_threshold
+        ):
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            logger.warning(
+                f"Line-provider circuit open after {self.failures} consecutive "
+                f"failures, failing calls fast for {self.reset_timeout}s"
+            )
+
+    def _on_success(self) -> None:
+        self.failures = 0
+        if self.state != self.CLOSED:
+            self.state = self.CLOSED
+            logger.info("Line-provider circuit closed")
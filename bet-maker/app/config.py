@@ -1,4 +1,5 @@
 import os
+import socket
 
 from dotenv import load_dotenv
 
@@ -11,13 +12,175 @@ DB_NAME = os.environ.get("DB_NAME")
 DB_USER = os.environ.get("DB_USER")
 DB_PASS = os.environ.get("DB_PASS")
 
+# DB_POOL_SIZE=0 disables pooling (a fresh connection per session).
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+
+# Optional streaming replicas ("host" or "host:port", comma separated) that
+# take read-only queries; same credentials and database name as the primary.
+DB_REPLICA_HOSTS = [
+    host.strip()
+    for host in os.environ.get("DB_REPLICA_HOSTS", "").split(",")
+    if host.strip()
+]
+DB_REPLICA_MAX_LAG = float(os.environ.get("DB_REPLICA_MAX_LAG", 5))
+DB_REPLICA_LAG_CHECK_INTERVAL = float(
+    os.environ.get("DB_REPLICA_LAG_CHECK_INTERVAL", 1)
+)
+
+# Further databases ("host" or "host:port", comma separated) that the bets
+# are hash-sharded across by event_id, the primary being shard 0; same
+# credentials and database name as the primary. Changing the list moves
+# events between shards: run `python -m app.rebalance` afterwards.
+DB_SHARD_HOSTS = [
+    host.strip()
+    for host in os.environ.get("DB_SHARD_HOSTS", "").split(",")
+    if host.strip()
+]
+
 RABBITMQ_USER = os.environ.get("RABBITMQ_USER")
 RABBITMQ_PASS = os.environ.get("RABBITMQ_PASS")
 RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST")
 
 EXCHANGE_NAME = os.environ.get("EXCHANGE_NAME")
 EVENT_UPDATE_QUEUE_NAME = os.environ.get("EVENT_UPDATE_QUEUE_NAME")
+# Odds changes on open events, consumed by bet-maker to re-price cash-outs.
+EVENT_ODDS_QUEUE_NAME = os.environ.get("EVENT_ODDS_QUEUE_NAME", "event_odds_queue")
+# Bet-placement event-detail lookups and the heavy full event list travel on
+# separate queues, so list traffic never queues ahead of a detail lookup.
 REQUEST_QUEUE_NAME = os.environ.get("REQUEST_QUEUE_NAME")
+EVENT_LIST_REQUEST_QUEUE_NAME = os.environ.get(
+    "EVENT_LIST_REQUEST_QUEUE_NAME", "event_list_request_queue"
+)
+
+# How bet-maker reads events from line-provider: "rabbitmq" (RPC over the
+# queues above) or "http" (line-provider's /internal endpoints).
+LINE_PROVIDER_TRANSPORT = os.environ.get("LINE_PROVIDER_TRANSPORT", "rabbitmq").lower()
+LINE_PROVIDER_URL = os.environ.get("LINE_PROVIDER_URL", "http://line_provider:8001")
+LINE_PROVIDER_HTTP_TIMEOUT = float(os.environ.get("LINE_PROVIDER_HTTP_TIMEOUT", 10))
+LINE_PROVIDER_HTTP_MAX_CONNECTIONS = int(
+    os.environ.get("LINE_PROVIDER_HTTP_MAX_CONNECTIONS", 100)
+)
 
 REDIS_HOST = os.environ.get("REDIS_HOST")
 REDIS_PORT = os.environ.get("REDIS_PORT")
+
+IDEMPOTENCY_KEY_TTL = int(os.environ.get("IDEMPOTENCY_KEY_TTL", 24 * 60 * 60))
+IDEMPOTENCY_LOCK_TTL = int(os.environ.get("IDEMPOTENCY_LOCK_TTL", 30))
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.environ.get("IDEMPOTENCY_WAIT_TIMEOUT", 15))
+
+RPC_CONCURRENCY_INITIAL = int(os.environ.get("RPC_CONCURRENCY_INITIAL", 20))
+RPC_CONCURRENCY_MIN = int(os.environ.get("RPC_CONCURRENCY_MIN", 2))
+RPC_CONCURRENCY_MAX = int(os.environ.get("RPC_CONCURRENCY_MAX", 200))
+RPC_LATENCY_TARGET = float(os.environ.get("RPC_LATENCY_TARGET", 0.5))
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", 100))
+ADMISSION_MAX_QUEUE_WAIT = float(os.environ.get("ADMISSION_MAX_QUEUE_WAIT", 1.0))
+
+# Line-provider calls fail fast for LINE_PROVIDER_BREAKER_RESET seconds
+# after LINE_PROVIDER_BREAKER_FAILURES consecutive failures or timeouts.
+LINE_PROVIDER_BREAKER_FAILURES = int(
+    os.environ.get("LINE_PROVIDER_BREAKER_FAILURES", 5)
+)
+LINE_PROVIDER_BREAKER_RESET = float(os.environ.get("LINE_PROVIDER_BREAKER_RESET", 5))
+# A call's timeout is LINE_PROVIDER_TIMEOUT_MULTIPLIER times the p99 latency
+# of the last LINE_PROVIDER_LATENCY_WINDOW calls, kept within
+# [LINE_PROVIDER_TIMEOUT_MIN, LINE_PROVIDER_TIMEOUT_MAX] seconds, and the
+# max until LINE_PROVIDER_LATENCY_MIN_SAMPLES calls were seen.
+LINE_PROVIDER_TIMEOUT_MIN = float(os.environ.get("LINE_PROVIDER_TIMEOUT_MIN", 0.5))
+LINE_PROVIDER_TIMEOUT_MAX = float(os.environ.get("LINE_PROVIDER_TIMEOUT_MAX", 10))
+LINE_PROVIDER_TIMEOUT_MULTIPLIER = float(
+    os.environ.get("LINE_PROVIDER_TIMEOUT_MULTIPLIER", 3)
+)
+LINE_PROVIDER_LATENCY_WINDOW = int(os.environ.get("LINE_PROVIDER_LATENCY_WINDOW", 1000))
+LINE_PROVIDER_LATENCY_MIN_SAMPLES = int(
+    os.environ.get("LINE_PROVIDER_LATENCY_MIN_SAMPLES", 50)
+)
+# When true, an event detail lookup still unanswered after the p95 latency
+# gets a second, hedged attempt; at most LINE_PROVIDER_HEDGE_RATIO of
+# lookups are hedged.
+LINE_PROVIDER_HEDGE_DETAIL = (
+    os.environ.get("LINE_PROVIDER_HEDGE_DETAIL", "false").lower() == "true"
+)
+LINE_PROVIDER_HEDGE_RATIO = float(os.environ.get("LINE_PROVIDER_HEDGE_RATIO", 0.1))
+
+RATE_LIMIT_PER_SECOND = float(os.environ.get("RATE_LIMIT_PER_SECOND", 10))
+RATE_LIMIT_BURST = int(os.environ.get("RATE_LIMIT_BURST", 20))
+
+# "direct" inserts and commits each bet in POST /bets/; "stream" queues it on
+# a Redis stream and a background writer COPYs the stream into Postgres in
+# batches of up to BET_WRITER_BATCH_SIZE.
+BET_INGESTION_MODE = os.environ.get("BET_INGESTION_MODE", "direct").lower()
+BET_STREAM_NAME = os.environ.get("BET_STREAM_NAME", "bets:ingest")
+BET_ID_BLOCK_SIZE = int(os.environ.get("BET_ID_BLOCK_SIZE", 100))
+BET_WRITER_BATCH_SIZE = int(os.environ.get("BET_WRITER_BATCH_SIZE", 1000))
+BET_WRITER_BLOCK_MS = int(os.environ.get("BET_WRITER_BLOCK_MS", 100))
+BET_WRITER_CONSUMER_NAME = os.environ.get(
+    "BET_WRITER_CONSUMER_NAME", socket.gethostname()
+)
+
+# Per-event limits on the total stake and on the liability (possible winning)
+# of each outcome, in currency units; 0 means unlimited. Overridable per event
+# through PUT /admin/exposure/{event_id}/limits.
+MAX_EVENT_STAKE = float(os.environ.get("MAX_EVENT_STAKE", 0))
+MAX_OUTCOME_LIABILITY = float(os.environ.get("MAX_OUTCOME_LIABILITY", 0))
+
+# Cash-out quotes keep this share of the fair value as margin, and expire if
+# no odds update has refreshed them for CASHOUT_QUOTE_TTL seconds.
+CASHOUT_MARGIN = float(os.environ.get("CASHOUT_MARGIN", 0.05))
+CASHOUT_QUOTE_TTL = int(os.environ.get("CASHOUT_QUOTE_TTL", 300))
+
+# Failed settlement messages are retried after SETTLEMENT_RETRY_BASE_DELAY
+# seconds, doubling per attempt, then dead-lettered.
+SETTLEMENT_MAX_ATTEMPTS = int(os.environ.get("SETTLEMENT_MAX_ATTEMPTS", 5))
+SETTLEMENT_RETRY_BASE_DELAY = float(os.environ.get("SETTLEMENT_RETRY_BASE_DELAY", 1))
+
+# Web containers scaled to several uvicorn workers should set this to false
+# and run the consumer separately with `python -m app.worker`.
+RUN_CONSUMER_IN_APP = os.environ.get("RUN_CONSUMER_IN_APP", "true").lower() == "true"
+CONSUMER_PREFETCH_COUNT = int(os.environ.get("CONSUMER_PREFETCH_COUNT", 10))
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# "json" (one object per line) or "text".
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json").lower()
+# Share of INFO/DEBUG records kept for high-volume loggers ("logger=rate",
+# comma separated); a logger's rate also covers its children.
+LOG_SAMPLE_RATES = {
+    name.strip(): float(rate)
+    for name, rate in (
+        item.split("=", 1)
+        for item in os.environ.get("LOG_SAMPLE_RATES", "app.rabbitmq.rpc=0.01").split(
+            ","
+        )
+        if "=" in item
+    )
+}
+# Logs every SQL statement when true.
+DB_ECHO = os.environ.get("DB_ECHO", "false").lower() == "true"
+
+# /debug endpoints (profiling, slow requests) and /admin endpoints are only
+# served when this is set, to clients sending it in X-Debug-Token.
+DEBUG_TOKEN = os.environ.get("DEBUG_TOKEN", "")
+PROFILE_MAX_SECONDS = float(os.environ.get("PROFILE_MAX_SECONDS", 60))
+# Requests slower than this are logged with their DB statements and calls.
+SLOW_REQUEST_THRESHOLD_MS = float(os.environ.get("SLOW_REQUEST_THRESHOLD_MS", 500))
+SLOW_REQUEST_LOG_SIZE = int(os.environ.get("SLOW_REQUEST_LOG_SIZE", 100))
+
+# How often the worker logs latency metrics; 0 disables it.
+METRICS_LOG_INTERVAL = float(os.environ.get("METRICS_LOG_INTERVAL", 60))
+
+# The loop watchdog measures event-loop lag every LOOP_LAG_CHECK_INTERVAL
+# seconds and logs the blocking stack when the loop stalls for longer than
+# LOOP_BLOCK_THRESHOLD seconds (0 disables the stack dumps).
+LOOP_LAG_CHECK_INTERVAL = float(os.environ.get("LOOP_LAG_CHECK_INTERVAL", 0.5))
+LOOP_BLOCK_THRESHOLD = float(os.environ.get("LOOP_BLOCK_THRESHOLD", 0.1))
+# line-provider responses at least this many bytes are decoded on a worker
+# thread instead of the event loop; 0 keeps decoding on the loop.
+OFFLOAD_DESERIALIZATION_MIN_BYTES = int(
+    os.environ.get("OFFLOAD_DESERIALIZATION_MIN_BYTES", 256 * 1024)
+)
+# Chunks of a streamed line-provider reply (GET /events/stream) held by
+# this process at once; the rest wait on the broker.
+RPC_STREAM_PREFETCH_COUNT = int(os.environ.get("RPC_STREAM_PREFETCH_COUNT", 2))
+# Bets read per batch by the analytics export; each batch becomes one Arrow
+# record batch or Parquet row group.
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", 50_000))
@@ -1,44 +1,107 @@
 import asyncio
 import json
 import logging
+from decimal import Decimal
 
 from aio_pika import IncomingMessage
+from aio_pika.abc import AbstractChannel
 
-from .config import EVENT_UPDATE_QUEUE_NAME
-from .crud import update_bets_status
+from . import bet_writer, exposure, readiness
+from .cashout import drop_quotes, reprice_event
+from .config import BET_INGESTION_MODE, CONSUMER_PREFETCH_COUNT, EVENT_ODDS_QUEUE_NAME
+from .crud import update_bets_status_bulk
 from .database import get_async_session
 from .rabbitmq import connect_with_retry
+from .settlement_retry import declare_settlement_queues, schedule_retry
 
 logger = logging.getLogger(__name__)
 
 
-async def process_event_update_message(message: IncomingMessage) -> None:
-    async with message.process():
+async def process_event_update_message(
+    message: IncomingMessage, channel: AbstractChannel
+) -> None:
+    # If even the retry can't be published, the message goes back on the
+    # queue (requeue=True) rather than being dropped.
+    async with message.process(requeue=True):
         try:
             event_data = json.loads(message.body.decode())
-            event_id = event_data["event_id"]
-            new_status = event_data["new_status"]
+            # A bulk settlement in line-provider sends one combined message
+            # for the whole round instead of one message per event.
+            event_updates = event_data.get("events", [event_data])
+            new_statuses = {
+                update["event_id"]: update["new_status"] for update in event_updates
+            }
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.error(f"Malformed event update message: {e}", exc_info=True)
+            await schedule_retry(channel, message, e, retryable=False)
+            return
 
-            logger.info(
-                f"Received event update: ID={event_id}, New Status={new_status}"
-            )
+        logger.info("Received event updates: %s", new_statuses)
 
+        try:
+            if BET_INGESTION_MODE == "stream":
+                # Bets still queued for these events must be stored first, or
+                # they would miss their settlement.
+                await bet_writer.drain()
             async for session in get_async_session():
-                await update_bets_status(session, event_id, new_status)
-
+                await update_bets_status_bulk(session, new_statuses)
         except Exception as e:
             logger.error(f"Error processing message: {e}", exc_info=True)
+            await schedule_retry(channel, message, e)
+            return
+
+        try:
+            await drop_quotes(list(new_statuses))
+            await exposure.drop(list(new_statuses))
+        except Exception as e:
+            logger.warning(f"Failed to drop Redis state of settled events: {e}")
+
+
+async def process_odds_update_message(message: IncomingMessage) -> None:
+    # A lost re-pricing is not retried: the next odds update or the next
+    # cash-out request prices the event again.
+    async with message.process():
+        try:
+            odds = json.loads(message.body.decode())
+            async for session in get_async_session():
+                await reprice_event(
+                    session,
+                    odds["event_id"],
+                    Decimal(odds["coef_1st_team_win"]),
+                    Decimal(odds["coef_2nd_team_win"]),
+                )
+        except Exception as e:
+            logger.error(f"Error re-pricing cash-outs: {e}", exc_info=True)
 
 
 async def consume() -> None:
+    if BET_INGESTION_MODE == "stream":
+        asyncio.create_task(bet_writer.run_bet_writer())
+        logger.info("Bet writer started.")
+
     connection = await connect_with_retry()
     async with connection:
         channel = await connection.channel()
+        await channel.set_qos(prefetch_count=CONSUMER_PREFETCH_COUNT)
 
-        event_updates_queue = await channel.declare_queue(
-            EVENT_UPDATE_QUEUE_NAME, durable=True
-        )
-        await event_updates_queue.consume(process_event_update_message)
+        event_updates_queue = await declare_settlement_queues(channel)
+
+        async def handler(message: IncomingMessage) -> None:
+            await process_event_update_message(message, channel)
+
+        await event_updates_queue.consume(handler)
         logger.info("Consuming messages from event updates queue...")
 
+        # Odds updates on a channel of their own with prefetch 1, so they are
+        # applied in order and a later tick can't be overwritten by an
+        # earlier one.
+        odds_channel = await connection.channel()
+        await odds_channel.set_qos(prefetch_count=1)
+        odds_queue = await odds_channel.declare_queue(
+            EVENT_ODDS_QUEUE_NAME, durable=True
+        )
+        await odds_queue.consume(process_odds_update_message)
+        logger.info("Consuming messages from event odds queue...")
+        readiness.mark_ready("consumer")
+
         await asyncio.Future()
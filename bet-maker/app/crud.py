@@ -1,70 +1,134 @@
+import asyncio
+import itertools
 import logging
-from decimal import Decimal
+import math
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy import and_, update
+from redis.exceptions import RedisError
+from sqlalchemy import case, cast, delete, func, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from .config import REQUEST_QUEUE_NAME
-from .models import bets
-from .rabbitmq import rpc_call
-from .schemas import BetCreate, BetPrediction, BetResponse, BetStatus, EventStatus
+from . import bet_ingestion, cashout, exposure, line_provider, sharding
+from .admission import AdmissionRejected, service_unavailable
+from .config import BET_INGESTION_MODE
+from .models import accumulator_legs, accumulators, bet_stats, bets
+from .schemas import (
+    AccumulatorCreate,
+    AccumulatorLegResponse,
+    AccumulatorResponse,
+    BetCreate,
+    BetPrediction,
+    BetResponse,
+    BetStats,
+    BetStatsResponse,
+    BetStatus,
+    BetStatusStats,
+    CashoutQuoteResponse,
+    EventBetStats,
+    EventStatus,
+)
 
 logger = logging.getLogger(__name__)
 
 
-async def create_bet(bet: BetCreate, session: AsyncSession) -> BetResponse:
+async def get_event_odds(event_id: int) -> tuple[Decimal, Decimal]:
+    """Current (first team win, second team win) odds of an event still open for betting."""
     try:
-        response_data = await rpc_call(
-            routing_key="bet-request",
-            queue_name=REQUEST_QUEUE_NAME,
-            payload={"request": "get_available_event_detail", "event_id": bet.event_id},
-        )
+        response_data = await line_provider.get_available_event_detail(event_id)
+    except AdmissionRejected as e:
+        logger.warning(f"Shedding bet placement for event_id: {event_id}. {e}")
+        raise service_unavailable(e)
     except TimeoutError as e:
-        logger.error(
-            f"Timed out waiting for event detail. event_id: {bet.event_id}. {e}"
-        )
+        logger.error(f"Timed out waiting for event detail. event_id: {event_id}. {e}")
         raise HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
             detail="Line provider service did not respond in time.",
         )
+    except ConnectionError as e:
+        logger.error(f"Line provider unavailable. event_id: {event_id}. {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Line provider service is unavailable, retry later.",
+        )
 
     if "error" in response_data:
-        logger.error(f"{response_data['error']}. event_id: {bet.event_id}")
+        logger.error(f"{response_data['error']}. event_id: {event_id}")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Available event not found.",
         )
 
-    coef_1st_team_win = Decimal(response_data.get("coef_1st_team_win"))
-    coef_2nd_team_win = Decimal(response_data.get("coef_2nd_team_win"))
+    return (
+        Decimal(response_data.get("coef_1st_team_win")),
+        Decimal(response_data.get("coef_2nd_team_win")),
+    )
+
+
+async def get_event_coefficient(
+    event_id: int, bet_prediction: BetPrediction
+) -> Decimal:
+    """Current odds for `bet_prediction` on an event still open for betting."""
+    coef_1st_team_win, coef_2nd_team_win = await get_event_odds(event_id)
 
-    coefficient = (
-        coef_1st_team_win
-        if bet.bet_prediction == "FIRST_TEAM_WIN"
-        else coef_2nd_team_win
+    return (
+        coef_1st_team_win if bet_prediction == "FIRST_TEAM_WIN" else coef_2nd_team_win
     )
+
+
+async def create_bet(bet: BetCreate, session: AsyncSession) -> BetResponse:
+    coefficient = await get_event_coefficient(bet.event_id, bet.bet_prediction)
     possible_winning = Decimal(bet.amount) * coefficient
+    await exposure.reserve(
+        bet.event_id, bet.bet_prediction, bet.amount, possible_winning
+    )
 
-    query = (
-        bets.insert()
-        .values(
-            event_id=bet.event_id,
-            bet_prediction=bet.bet_prediction,
-            coefficient=coefficient,
-            amount=bet.amount,
-            possible_winning=possible_winning,
-            status=BetStatus.NOT_PLAYED,
+    try:
+        return await store_bet(bet, session, coefficient, possible_winning)
+    except BaseException:
+        # Whatever kept the bet from being stored, cancellation included, its
+        # reservation must not outlive it.
+        await exposure.release(
+            bet.event_id, bet.bet_prediction, bet.amount, possible_winning
         )
-        .returning(bets)
-    )
+        raise
+
+
+async def store_bet(
+    bet: BetCreate,
+    session: AsyncSession,
+    coefficient: Decimal,
+    possible_winning: Decimal,
+) -> BetResponse:
+    if BET_INGESTION_MODE == "stream":
+        return await bet_ingestion.enqueue_bet(
+            session, bet, coefficient, possible_winning
+        )
+
+    values = {
+        "event_id": bet.event_id,
+        "bet_prediction": bet.bet_prediction,
+        "coefficient": coefficient,
+        "amount": bet.amount,
+        "possible_winning": possible_winning,
+        "status": BetStatus.NOT_PLAYED,
+    }
 
     try:
-        result = await session.execute(query)
+        if sharding.is_sharded():
+            # Each shard has its own bets sequence; ids come from shard 0's.
+            values["id"] = await bet_ingestion.id_allocator.next_id(session)
+        async with sharding.session_for_event(session, bet.event_id) as shard_session:
+            result = await shard_session.execute(
+                bets.insert().values(**values).returning(bets)
+            )
+            created_bet = result.mappings().fetchone()
+            await add_to_bet_stats(shard_session, created_bet)
         await session.commit()
-        created_bet = result.mappings().fetchone()
 
         return BetResponse(**created_bet)
 
@@ -80,11 +144,10 @@ async def create_bet(bet: BetCreate, session: AsyncSession) -> BetResponse:
 async def get_all_bets(
     session: AsyncSession, offset: int = 0, limit: int = 10
 ) -> list[BetResponse]:
-    query = select(bets).offset(offset).limit(limit).order_by(bets.c.id)
-
     try:
-        result = await session.execute(query)
-        bets_list = result.mappings().fetchall()
+        bets_list = await sharding.merged_page(
+            session, select(bets), "id", offset, limit
+        )
         return [BetResponse(**bet) for bet in bets_list]
 
     except SQLAlchemyError as e:
@@ -98,47 +161,565 @@ async def get_all_bets(
 async def update_bets_status(
     session: AsyncSession, event_id: int, new_event_status: EventStatus
 ) -> None:
-    winning_prediction = (
-        BetPrediction.FIRST_TEAM_WIN
-        if new_event_status == EventStatus.FIRST_TEAM_WON
-        else BetPrediction.SECOND_TEAM_WIN
-    )
+    await update_bets_status_bulk(session, {event_id: new_event_status})
+
+
+async def update_bets_status_bulk(
+    session: AsyncSession, new_event_statuses: dict[int, EventStatus]
+) -> None:
+    """
+    Settles the bets of every given event with a single UPDATE per shard,
+    so a whole round of results costs one statement and one commit each.
+    A result sent again, or corrected, settles the event's bets anew. An
+    event back to NOT_FINISHED has no result and is skipped.
+    """
+    winning_predictions = {
+        event_id: (
+            BetPrediction.FIRST_TEAM_WIN
+            if new_event_status == EventStatus.FIRST_TEAM_WON
+            else BetPrediction.SECOND_TEAM_WIN
+        )
+        for event_id, new_event_status in new_event_statuses.items()
+        if new_event_status != EventStatus.NOT_FINISHED
+    }
+    event_ids = list(winning_predictions)
+    if not event_ids:
+        return
+
     try:
-        update_won_query = (
-            update(bets)
-            .where(
-                and_(
-                    bets.c.event_id == event_id,
-                    bets.c.bet_prediction == winning_prediction,
+        # Each shard settles its own events; accumulators are on shard 0 and
+        # go in the caller's transaction. A failure part-way is safe to retry:
+        # settling an event again gives the same result.
+        for shard, shard_event_ids in sharding.group_by_shard(event_ids).items():
+            async with sharding.session_for(session, shard) as shard_session:
+                await settle_bets(
+                    shard_session,
+                    {
+                        event_id: winning_predictions[event_id]
+                        for event_id in shard_event_ids
+                    },
                 )
+        await settle_accumulator_legs(session, winning_predictions)
+        await session.commit()
+        logger.info("Bet statuses successfully updated for event_ids: %s", event_ids)
+
+    except SQLAlchemyError as e:
+        await session.rollback()
+        logger.error(
+            f"Error occurred while updating bet statuses for event_ids: {event_ids}. Error: {str(e)}",
+            exc_info=True,
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred",
+        )
+
+
+async def settle_bets(
+    session: AsyncSession, winning_predictions: dict[int, BetPrediction]
+) -> None:
+    """Settles the bets of the given events and refreshes their stats rows."""
+    winning_prediction = cast(
+        case(winning_predictions, value=bets.c.event_id),
+        bets.c.bet_prediction.type,
+    )
+    update_query = (
+        update(bets)
+        .where(bets.c.event_id.in_(list(winning_predictions)))
+        .values(
+            status=cast(
+                case(
+                    (bets.c.bet_prediction == winning_prediction, BetStatus.WON),
+                    else_=BetStatus.LOST,
+                ),
+                bets.c.status.type,
+            )
+        )
+    )
+
+    await session.execute(update_query)
+    await refresh_bet_stats(session, list(winning_predictions))
+
+
+async def add_to_bet_stats(session: AsyncSession, bet) -> None:
+    """Counts a newly placed bet into its event's stats row, in the caller's transaction."""
+    await add_many_to_bet_stats(session, [bet])
+
+
+async def add_many_to_bet_stats(session: AsyncSession, placed_bets: list) -> None:
+    """
+    Counts newly placed bets into their events' stats rows with one upsert,
+    in the caller's transaction.
+    """
+    totals: dict[tuple, dict] = {}
+    for bet in placed_bets:
+        row = totals.setdefault(
+            (bet["event_id"], bet["status"]),
+            {
+                "event_id": bet["event_id"],
+                "status": bet["status"],
+                "bets_count": 0,
+                "total_amount": Decimal(0),
+                "total_possible_winning": Decimal(0),
+            },
+        )
+        row["bets_count"] += 1
+        row["total_amount"] += Decimal(bet["amount"])
+        row["total_possible_winning"] += Decimal(bet["possible_winning"])
+
+    if not totals:
+        return
+
+    query = pg_insert(bet_stats).values(list(totals.values()))
+    query = query.on_conflict_do_update(
+        index_elements=[bet_stats.c.event_id, bet_stats.c.status],
+        set_={
+            "bets_count": bet_stats.c.bets_count + query.excluded.bets_count,
+            "total_amount": bet_stats.c.total_amount + query.excluded.total_amount,
+            "total_possible_winning": bet_stats.c.total_possible_winning
+            + query.excluded.total_possible_winning,
+        },
+    )
+    await session.execute(query)
+
+
+async def copy_bets(session: AsyncSession, placed_bets: list[dict]) -> int:
+    """
+    Writes bets with pre-allocated ids to the bets table with a single COPY
+    per shard and counts them into bet_stats, in the caller's transaction
+    for shard 0. Bets whose id is already stored are skipped, so a batch
+    replayed after a crash between commit and acknowledgement is not written
+    twice. Returns how many bets were written.
+    """
+    bets_by_shard: dict[int, list[dict]] = {}
+    for bet in placed_bets:
+        shard = sharding.shard_for_event(bet["event_id"])
+        bets_by_shard.setdefault(shard, []).append(bet)
+
+    written = 0
+    for shard, shard_bets in bets_by_shard.items():
+        async with sharding.session_for(session, shard) as shard_session:
+            written += await copy_bets_to_shard(shard_session, shard_bets)
+    return written
+
+
+async def copy_bets_to_shard(session: AsyncSession, placed_bets: list[dict]) -> int:
+    stored_ids = set(
+        (
+            await session.execute(
+                select(bets.c.id).where(
+                    bets.c.id.in_([bet["id"] for bet in placed_bets])
+                )
+            )
+        ).scalars()
+    )
+    new_bets = [bet for bet in placed_bets if bet["id"] not in stored_ids]
+    if not new_bets:
+        return 0
+
+    columns = [column.name for column in bets.columns]
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        bets.name,
+        records=[tuple(bet[column] for column in columns) for bet in new_bets],
+        columns=columns,
+    )
+    await add_many_to_bet_stats(session, new_bets)
+    return len(new_bets)
+
+
+async def refresh_bet_stats(
+    session: AsyncSession, event_ids: Optional[list[int]] = None
+) -> None:
+    """
+    Recomputes the stats rows of the given events (all events if None) from
+    the bets table, in the caller's transaction. Settlement moves bets
+    between statuses, so the affected events are re-aggregated rather than
+    adjusted; with the index on bets.event_id that only touches their bets.
+    """
+    bet_status = func.coalesce(bets.c.status, BetStatus.NOT_PLAYED)
+    aggregate = select(
+        bets.c.event_id,
+        bet_status,
+        func.count(),
+        func.sum(bets.c.amount),
+        func.sum(bets.c.possible_winning),
+    ).group_by(bets.c.event_id, bet_status)
+    stale_rows = delete(bet_stats)
+
+    if event_ids is not None:
+        aggregate = aggregate.where(bets.c.event_id.in_(event_ids))
+        stale_rows = stale_rows.where(bet_stats.c.event_id.in_(event_ids))
+
+    await session.execute(stale_rows)
+    await session.execute(
+        insert(bet_stats).from_select(
+            [
+                bet_stats.c.event_id,
+                bet_stats.c.status,
+                bet_stats.c.bets_count,
+                bet_stats.c.total_amount,
+                bet_stats.c.total_possible_winning,
+            ],
+            aggregate,
+        )
+    )
+
+
+def _summarize(rows) -> dict:
+    by_status = {
+        row["status"]: BetStatusStats(
+            bets_count=row["bets_count"],
+            total_amount=row["total_amount"],
+            total_possible_winning=row["total_possible_winning"],
+        )
+        for row in rows
+    }
+    return {
+        "bets_count": sum(stats.bets_count for stats in by_status.values()),
+        "total_amount": sum(
+            (stats.total_amount for stats in by_status.values()), Decimal(0)
+        ),
+        "total_possible_winning": sum(
+            (stats.total_possible_winning for stats in by_status.values()),
+            Decimal(0),
+        ),
+        "by_status": by_status,
+    }
+
+
+async def get_bet_stats(
+    session: AsyncSession,
+    event_id: Optional[int] = None,
+    offset: int = 0,
+    limit: int = 10,
+) -> BetStatsResponse:
+    totals_query = select(
+        bet_stats.c.status,
+        func.sum(bet_stats.c.bets_count).label("bets_count"),
+        func.sum(bet_stats.c.total_amount).label("total_amount"),
+        func.sum(bet_stats.c.total_possible_winning).label("total_possible_winning"),
+    ).group_by(bet_stats.c.status)
+    page_query = select(bet_stats.c.event_id).distinct()
+
+    if event_id is not None:
+        totals_query = totals_query.where(bet_stats.c.event_id == event_id)
+        page_query = page_query.where(bet_stats.c.event_id == event_id)
+
+    try:
+        shard_totals = await sharding.query_shards(session, totals_query)
+        page_event_ids = [
+            row["event_id"]
+            for row in await sharding.merged_page(
+                session, page_query, "event_id", offset, limit
             )
-            .values(status=BetStatus.WON)
+        ]
+        events_query = (
+            select(bet_stats)
+            .where(bet_stats.c.event_id.in_(page_event_ids))
+            .order_by(bet_stats.c.event_id, bet_stats.c.status)
+        )
+        event_rows = sorted(
+            itertools.chain.from_iterable(
+                await sharding.query_shards(session, events_query)
+            ),
+            key=lambda row: row["event_id"],
+        )
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while retrieving bet stats: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred",
         )
 
-        await session.execute(update_won_query)
+    # Each shard has its own totals per status; add them up.
+    totals: dict[BetStatus, dict] = {}
+    for row in itertools.chain.from_iterable(shard_totals):
+        total = totals.setdefault(
+            row["status"],
+            {
+                "status": row["status"],
+                "bets_count": 0,
+                "total_amount": Decimal(0),
+                "total_possible_winning": Decimal(0),
+            },
+        )
+        total["bets_count"] += row["bets_count"]
+        total["total_amount"] += row["total_amount"]
+        total["total_possible_winning"] += row["total_possible_winning"]
+
+    rows_by_event: dict[int, list] = {}
+    for row in event_rows:
+        rows_by_event.setdefault(row["event_id"], []).append(row)
 
-        update_lost_query = (
-            update(bets)
-            .where(
-                and_(
-                    bets.c.event_id == event_id,
-                    bets.c.bet_prediction != winning_prediction,
+    return BetStatsResponse(
+        total=BetStats(**_summarize(totals.values())),
+        events=[
+            EventBetStats(event_id=event_id, **_summarize(rows))
+            for event_id, rows in rows_by_event.items()
+        ],
+    )
+
+
+async def reconcile_bet_stats(
+    session: AsyncSession, event_id: Optional[int] = None
+) -> int:
+    """Rebuilds the stats table (or one event's rows) from the bets table."""
+    if event_id is None:
+        shards = range(len(sharding.shard_session_makers))
+    else:
+        shards = [sharding.shard_for_event(event_id)]
+
+    reconciled_query = select(func.count(func.distinct(bet_stats.c.event_id)))
+    if event_id is not None:
+        reconciled_query = reconciled_query.where(bet_stats.c.event_id == event_id)
+
+    try:
+        reconciled_events = 0
+        for shard in shards:
+            async with sharding.session_for(session, shard) as shard_session:
+                await refresh_bet_stats(
+                    shard_session, None if event_id is None else [event_id]
                 )
+                reconciled_events += (
+                    await shard_session.execute(reconciled_query)
+                ).scalar_one()
+        await session.commit()
+        logger.info("Reconciled bet stats for %d events", reconciled_events)
+        return reconciled_events
+
+    except SQLAlchemyError as e:
+        await session.rollback()
+        logger.error(f"Database error while reconciling bet stats: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred",
+        )
+
+
+async def create_accumulator(
+    accumulator: AccumulatorCreate, session: AsyncSession
+) -> AccumulatorResponse:
+    coefficients = await asyncio.gather(
+        *(
+            get_event_coefficient(leg.event_id, leg.bet_prediction)
+            for leg in accumulator.legs
+        )
+    )
+    combined_coefficient = math.prod(coefficients, start=Decimal(1)).quantize(
+        Decimal("0.01"), rounding=ROUND_HALF_UP
+    )
+    possible_winning = Decimal(accumulator.amount) * combined_coefficient
+
+    try:
+        result = await session.execute(
+            accumulators.insert()
+            .values(
+                coefficient=combined_coefficient,
+                amount=accumulator.amount,
+                possible_winning=possible_winning,
+                remaining_legs=len(accumulator.legs),
+                status=BetStatus.NOT_PLAYED,
             )
-            .values(status=BetStatus.LOST)
+            .returning(accumulators)
         )
+        created_accumulator = result.mappings().fetchone()
 
-        await session.execute(update_lost_query)
+        legs_result = await session.execute(
+            accumulator_legs.insert().returning(
+                accumulator_legs, sort_by_parameter_order=True
+            ),
+            [
+                {
+                    "accumulator_id": created_accumulator["id"],
+                    "event_id": leg.event_id,
+                    "bet_prediction": leg.bet_prediction,
+                    "coefficient": coefficient,
+                    "status": BetStatus.NOT_PLAYED,
+                }
+                for leg, coefficient in zip(accumulator.legs, coefficients)
+            ],
+        )
+        created_legs = legs_result.mappings().fetchall()
         await session.commit()
-        logger.info(f"Bet statuses successfully updated for event_id: {event_id}")
+
+        return AccumulatorResponse(
+            **created_accumulator,
+            legs=[AccumulatorLegResponse(**leg) for leg in created_legs],
+        )
 
     except SQLAlchemyError as e:
         await session.rollback()
         logger.error(
-            f"Error occurred while updating bet statuses for event_id: {event_id}. Error: {str(e)}",
-            exc_info=True,
+            f"Database error occurred while creating accumulator: {e}", exc_info=True
         )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Database error occurred",
         )
+
+
+async def get_all_accumulators(
+    session: AsyncSession, offset: int = 0, limit: int = 10
+) -> list[AccumulatorResponse]:
+    page_query = (
+        select(accumulators).offset(offset).limit(limit).order_by(accumulators.c.id)
+    )
+
+    try:
+        page = (await session.execute(page_query)).mappings().fetchall()
+        legs_query = (
+            select(accumulator_legs)
+            .where(accumulator_legs.c.accumulator_id.in_([row["id"] for row in page]))
+            .order_by(accumulator_legs.c.id)
+        )
+        legs = (await session.execute(legs_query)).mappings().fetchall()
+
+    except SQLAlchemyError as e:
+        logger.error(
+            f"Database error while retrieving accumulators: {e}", exc_info=True
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred",
+        )
+
+    legs_by_accumulator: dict[int, list[AccumulatorLegResponse]] = {}
+    for leg in legs:
+        legs_by_accumulator.setdefault(leg["accumulator_id"], []).append(
+            AccumulatorLegResponse(**leg)
+        )
+
+    return [
+        AccumulatorResponse(**row, legs=legs_by_accumulator.get(row["id"], []))
+        for row in page
+    ]
+
+
+async def settle_accumulator_legs(
+    session: AsyncSession, winning_predictions: dict[int, BetPrediction]
+) -> None:
+    """
+    Settles the accumulator legs on the given events and recomputes their
+    parents from all of their legs' current statuses, in the caller's
+    transaction. Only legs on these events and the accumulators they belong
+    to are touched: a parent is lost if any leg lost, won once no leg is
+    left unsettled, and open otherwise, so a redelivered result changes
+    nothing and a corrected one settles the parents anew.
+    """
+    winning_prediction = cast(
+        case(winning_predictions, value=accumulator_legs.c.event_id),
+        accumulator_legs.c.bet_prediction.type,
+    )
+    settled_legs = await session.execute(
+        update(accumulator_legs)
+        .where(accumulator_legs.c.event_id.in_(list(winning_predictions)))
+        .values(
+            status=cast(
+                case(
+                    (
+                        accumulator_legs.c.bet_prediction == winning_prediction,
+                        BetStatus.WON,
+                    ),
+                    else_=BetStatus.LOST,
+                ),
+                accumulator_legs.c.status.type,
+            )
+        )
+        .returning(accumulator_legs.c.accumulator_id)
+    )
+    accumulator_ids = list(set(settled_legs.scalars()))
+    if not accumulator_ids:
+        return
+
+    legs = (
+        select(
+            accumulator_legs.c.accumulator_id,
+            func.count()
+            .filter(accumulator_legs.c.status == BetStatus.NOT_PLAYED)
+            .label("remaining_legs"),
+            func.count()
+            .filter(accumulator_legs.c.status == BetStatus.LOST)
+            .label("lost_legs"),
+        )
+        .where(accumulator_legs.c.accumulator_id.in_(accumulator_ids))
+        .group_by(accumulator_legs.c.accumulator_id)
+        .subquery()
+    )
+    await session.execute(
+        update(accumulators)
+        .where(accumulators.c.id == legs.c.accumulator_id)
+        .values(
+            remaining_legs=legs.c.remaining_legs,
+            status=cast(
+                case(
+                    (legs.c.lost_legs > 0, BetStatus.LOST),
+                    (legs.c.remaining_legs == 0, BetStatus.WON),
+                    else_=BetStatus.NOT_PLAYED,
+                ),
+                accumulators.c.status.type,
+            ),
+        )
+    )
+    logger.info("Settled legs of %d accumulators", len(accumulator_ids))
+
+
+async def get_cashout_quote(session: AsyncSession, bet_id: int) -> CashoutQuoteResponse:
+    try:
+        # The id says nothing about the shard; ask them all.
+        found = await sharding.query_shards(
+            session, select(bets).where(bets.c.id == bet_id)
+        )
+        bet = next(itertools.chain.from_iterable(found), None)
+    except SQLAlchemyError as e:
+        logger.error(
+            f"Database error while retrieving bet {bet_id}: {e}", exc_info=True
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred",
+        )
+
+    if bet is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Bet not found."
+        )
+    if bet["status"] != BetStatus.NOT_PLAYED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Bet is already settled."
+        )
+
+    try:
+        quote = await cashout.get_quote(bet["event_id"], bet_id)
+    except RedisError as e:
+        logger.error(f"Cash-out quote store unavailable: {e}")
+        quote = None
+
+    if quote is None:
+        # No odds update since this bet was placed (or the quotes expired):
+        # price the whole event now, which also fills the cache for its bets.
+        odds = await get_event_odds(bet["event_id"])
+        try:
+            quotes = await cashout.reprice_event(session, bet["event_id"], *odds)
+        except (SQLAlchemyError, RedisError) as e:
+            logger.error(f"Error while pricing cash-out for bet {bet_id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Cash-out is temporarily unavailable.",
+            )
+        quote = quotes.get(bet_id)
+        if quote is None:
+            # Settled, or the event closed, since the status check above.
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Bet is no longer open for cash-out.",
+            )
+
+    return CashoutQuoteResponse(
+        bet_id=bet_id,
+        event_id=bet["event_id"],
+        amount=bet["amount"],
+        coefficient=bet["coefficient"],
+        **quote,
+    )
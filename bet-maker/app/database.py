@@ -1,15 +1,50 @@
+import asyncio
+import itertools
+import logging
+import math
+import time
 from typing import AsyncGenerator
 
-from sqlalchemy import MetaData
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from fastapi import Request, Response
+from sqlalchemy import MetaData, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 
-from .config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER
+from .config import (
+    DB_HOST,
+    DB_MAX_OVERFLOW,
+    DB_NAME,
+    DB_PASS,
+    DB_POOL_SIZE,
+    DB_PORT,
+    DB_REPLICA_HOSTS,
+    DB_REPLICA_LAG_CHECK_INTERVAL,
+    DB_REPLICA_MAX_LAG,
+    DB_USER,
+)
+from .profiling import instrument_engine
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_async_engine(DATABASE_URL, echo=True, poolclass=NullPool)
+
+def create_engine(url: str) -> AsyncEngine:
+    if DB_POOL_SIZE <= 0:
+        async_engine = create_async_engine(url, poolclass=NullPool)
+    else:
+        async_engine = create_async_engine(
+            url,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_pre_ping=True,
+        )
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+
+engine = create_engine(DATABASE_URL)
 
 async_session_maker = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
@@ -17,7 +52,125 @@ async_session_maker = sessionmaker(
 
 metadata = MetaData()
 
+# Set on responses to writes; while it is valid the client's reads go to the
+# primary, so it always sees its own writes whatever the replicas' lag.
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery()
+            OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+def database_url(host: str) -> str:
+    """URL of this service's database on another server, "host" or "host:port"."""
+    if ":" not in host:
+        host = f"{host}:{DB_PORT}"
+    return f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{host}/{DB_NAME}"
+
+
+class Replica:
+    def __init__(self, host: str):
+        self.host = host
+        self.engine = create_engine(database_url(host))
+        self.session_maker = sessionmaker(
+            bind=self.engine, class_=AsyncSession, expire_on_commit=False
+        )
+        self.lag = 0.0
+        self.lag_checked_at = -math.inf
+
+    async def current_lag(self) -> float:
+        """Replication lag in seconds, re-measured at most once per interval."""
+        now = time.monotonic()
+        if now - self.lag_checked_at < DB_REPLICA_LAG_CHECK_INTERVAL:
+            return self.lag
+
+        self.lag_checked_at = now
+        try:
+            async with self.engine.connect() as conn:
+                lag = (await conn.execute(REPLICA_LAG_QUERY)).scalar()
+            self.lag = math.inf if lag is None else float(lag)
+        except Exception as e:
+            logger.warning(f"Replica {self.host} lag check failed: {e}")
+            self.lag = math.inf
+
+        return self.lag
+
+
+replicas = [Replica(host) for host in DB_REPLICA_HOSTS]
+_replica_cycle = itertools.count()
+
+
+async def choose_read_session_maker() -> sessionmaker:
+    """
+    Round-robins over replicas that are within DB_REPLICA_MAX_LAG of the
+    primary, falling back to the primary when none is.
+    """
+    if not replicas:
+        return async_session_maker
+
+    start = next(_replica_cycle)
+    for offset in range(len(replicas)):
+        replica = replicas[(start + offset) % len(replicas)]
+        if await replica.current_lag() <= DB_REPLICA_MAX_LAG:
+            return replica.session_maker
+
+    logger.warning("No replica within the lag budget, reading from primary")
+    return async_session_maker
+
+
+def pin_reads_to_primary(response: Response) -> None:
+    if replicas:
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            str(time.time() + DB_REPLICA_MAX_LAG),
+            max_age=math.ceil(DB_REPLICA_MAX_LAG),
+            httponly=True,
+        )
+
+
+def reads_pinned_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def warm_up_pools() -> None:
+    """Opens every pooled connection up front so first requests don't pay for it."""
+
+    async def open_connection(pool_engine: AsyncEngine) -> None:
+        async with pool_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    for pool_engine in [engine, *(replica.engine for replica in replicas)]:
+        await asyncio.gather(
+            *(open_connection(pool_engine) for _ in range(max(DB_POOL_SIZE, 1)))
+        )
+
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
+
+
+async def get_replica_session() -> AsyncGenerator[AsyncSession, None]:
+    session_maker = await choose_read_session_maker()
+    async with session_maker() as session:
+        yield session
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only routes: a replica unless the client just wrote."""
+    if reads_pinned_to_primary(request):
+        session_maker = async_session_maker
+    else:
+        session_maker = await choose_read_session_maker()
+
+    async with session_maker() as session:
+        yield session
@@ -0,0 +1,200 @@
+"""
+Per-event exposure limits. Running totals of the stake on an event and of
+the liability (possible winning) on each of its outcomes live in a Redis
+hash, checked and incremented atomically by a Lua script before a bet is
+inserted, so enforcing limits never aggregates or locks the bets table.
+Amounts are kept in integer cents.
+
+Limits default to MAX_EVENT_STAKE / MAX_OUTCOME_LIABILITY (0 = unlimited)
+and can be overridden per event through the admin API.
+"""
+
+import logging
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Optional
+
+from fastapi import HTTPException, status
+from redis.exceptions import RedisError
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from . import sharding
+from .config import MAX_EVENT_STAKE, MAX_OUTCOME_LIABILITY
+from .models import bets
+from .redis_client import get_redis
+from .schemas import BetPrediction, BetStatus, ExposureLimits, ExposureResponse
+
+logger = logging.getLogger(__name__)
+
+STAKE_FIELD = "stake"
+
+# KEYS: counters hash, limits hash.
+# ARGV: stake, liability, liability field, default max stake, default max
+# liability (cents; 0 = unlimited). Returns {reserved, exceeded limit}.
+RESERVE_SCRIPT = """
+local limits = redis.call("HMGET", KEYS[2], "max_stake", "max_liability")
+local max_stake = tonumber(limits[1]) or tonumber(ARGV[4])
+local max_liability = tonumber(limits[2]) or tonumber(ARGV[5])
+
+local stake = tonumber(ARGV[1])
+local liability = tonumber(ARGV[2])
+local current = redis.call("HMGET", KEYS[1], "stake", ARGV[3])
+local current_stake = tonumber(current[1]) or 0
+local current_liability = tonumber(current[2]) or 0
+
+if max_stake > 0 and current_stake + stake > max_stake then
+    return {0, "stake"}
+end
+if max_liability > 0 and current_liability + liability > max_liability then
+    return {0, "liability"}
+end
+
+redis.call("HINCRBY", KEYS[1], "stake", stake)
+redis.call("HINCRBY", KEYS[1], ARGV[3], liability)
+return {1, ""}
+"""
+
+
+def counters_key(event_id: int) -> str:
+    return f"exposure:event:{event_id}"
+
+
+def limits_key(event_id: int) -> str:
+    return f"exposure:limits:{event_id}"
+
+
+def liability_field(bet_prediction: BetPrediction) -> str:
+    return f"liability:{BetPrediction(bet_prediction).value}"
+
+
+def to_cents(amount: Decimal | float) -> int:
+    return int(Decimal(str(amount)).quantize(Decimal("0.01"), ROUND_HALF_UP) * 100)
+
+
+def from_cents(cents: Optional[str | int]) -> Optional[Decimal]:
+    return None if cents is None else Decimal(int(cents)) / 100
+
+
+async def reserve(
+    event_id: int,
+    bet_prediction: BetPrediction,
+    amount: Decimal,
+    possible_winning: Decimal,
+) -> None:
+    """
+    Adds a bet to its event's counters, or raises 409 if that would break
+    the event's stake limit or the outcome's liability limit.
+    """
+    try:
+        reserved, exceeded = await get_redis().eval(
+            RESERVE_SCRIPT,
+            2,
+            counters_key(event_id),
+            limits_key(event_id),
+            to_cents(amount),
+            to_cents(possible_winning),
+            liability_field(bet_prediction),
+            to_cents(MAX_EVENT_STAKE),
+            to_cents(MAX_OUTCOME_LIABILITY),
+        )
+    except RedisError as e:
+        # Like the rate limiter, limits fail open rather than take bet
+        # placement down with Redis.
+        logger.error(f"Exposure store unavailable, skipping limit check: {e}")
+        return
+
+    if not reserved:
+        logger.warning(f"Bet rejected, {exceeded} limit reached. event_id: {event_id}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Bet exceeds the {exceeded} limit for this event.",
+        )
+
+
+async def release(
+    event_id: int,
+    bet_prediction: BetPrediction,
+    amount: Decimal,
+    possible_winning: Decimal,
+) -> None:
+    """Takes back a reservation whose bet was never stored."""
+    try:
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.hincrby(counters_key(event_id), STAKE_FIELD, -to_cents(amount))
+            pipe.hincrby(
+                counters_key(event_id),
+                liability_field(bet_prediction),
+                -to_cents(possible_winning),
+            )
+            await pipe.execute()
+    except RedisError as e:
+        logger.error(f"Failed to release exposure for event_id {event_id}: {e}")
+
+
+async def drop(event_ids: list[int]) -> None:
+    """Forgets the counters of settled events."""
+    if event_ids:
+        await get_redis().delete(*(counters_key(event_id) for event_id in event_ids))
+
+
+async def get_exposure(event_id: int) -> ExposureResponse:
+    redis = get_redis()
+    counters = await redis.hgetall(counters_key(event_id))
+    limits = await redis.hgetall(limits_key(event_id))
+
+    return ExposureResponse(
+        event_id=event_id,
+        stake=from_cents(counters.get(STAKE_FIELD, 0)),
+        liability={
+            prediction: from_cents(counters.get(liability_field(prediction), 0))
+            for prediction in BetPrediction
+        },
+        max_stake=from_cents(limits.get("max_stake", to_cents(MAX_EVENT_STAKE))),
+        max_liability=from_cents(
+            limits.get("max_liability", to_cents(MAX_OUTCOME_LIABILITY))
+        ),
+    )
+
+
+async def set_limits(event_id: int, limits: ExposureLimits) -> ExposureResponse:
+    """Overrides an event's limits; a None limit falls back to the default."""
+    async with get_redis().pipeline(transaction=True) as pipe:
+        for field, value in (
+            ("max_stake", limits.max_stake),
+            ("max_liability", limits.max_liability),
+        ):
+            if value is None:
+                pipe.hdel(limits_key(event_id), field)
+            else:
+                pipe.hset(limits_key(event_id), field, to_cents(value))
+        await pipe.execute()
+
+    return await get_exposure(event_id)
+
+
+async def reconcile(session: AsyncSession, event_id: int) -> ExposureResponse:
+    """Rebuilds an event's counters from its open bets."""
+    query = (
+        select(
+            bets.c.bet_prediction,
+            func.sum(bets.c.amount),
+            func.sum(bets.c.possible_winning),
+        )
+        .where(bets.c.event_id == event_id, bets.c.status == BetStatus.NOT_PLAYED)
+        .group_by(bets.c.bet_prediction)
+    )
+    async with sharding.session_for_event(session, event_id) as shard_session:
+        rows = (await shard_session.execute(query)).fetchall()
+
+    counters = {STAKE_FIELD: sum(to_cents(amount) for _, amount, _ in rows)}
+    for prediction, _, liability in rows:
+        counters[liability_field(prediction)] = to_cents(liability)
+
+    async with get_redis().pipeline(transaction=True) as pipe:
+        pipe.delete(counters_key(event_id))
+        pipe.hset(counters_key(event_id), mapping=counters)
+        await pipe.execute()
+
+    logger.info(f"Reconciled exposure counters for event_id: {event_id}")
+    return await get_exposure(event_id)
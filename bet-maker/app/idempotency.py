@@ -0,0 +1,127 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import uuid
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from redis.exceptions import RedisError
+
+from .config import IDEMPOTENCY_KEY_TTL, IDEMPOTENCY_LOCK_TTL, IDEMPOTENCY_WAIT_TIMEOUT
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.02
+MAX_POLL_INTERVAL = 0.2
+
+# A claim is only ours while the key still holds our in-flight record; once
+# IDEMPOTENCY_LOCK_TTL has passed another request may have claimed the key.
+# KEYS: idempotency key. ARGV: our in-flight record.
+RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+# KEYS: idempotency key. ARGV: our in-flight record, response record, TTL.
+# Also stores the response if the claim expired and nobody took the key.
+FINISH_SCRIPT = """
+local current = redis.call("GET", KEYS[1])
+if current == ARGV[1] or not current then
+    redis.call("SET", KEYS[1], ARGV[2], "EX", ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+def request_fingerprint(body: str) -> str:
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+async def run_idempotent(
+    key: str, fingerprint: str, handler: Callable[[], Awaitable[Any]]
+) -> tuple[Any, bool]:
+    """
+    Runs `handler` at most once per idempotency key and returns its result
+    together with a flag telling whether it was replayed from Redis.
+
+    The first request claims the key with SET NX (an "in flight" record with
+    a short TTL, so a crashed worker can't block the key forever); concurrent
+    duplicates poll until the stored response appears instead of running the
+    handler again. Failed attempts release the key so the client can retry.
+    The in-flight record carries a token of its own, and releasing or
+    finishing only touches the key while it still holds that record, so a
+    request outliving its claim can't clobber the next one's.
+    """
+    redis = get_redis()
+    redis_key = f"idempotency:bets:{key}"
+    in_flight_record = json.dumps(
+        {"fingerprint": fingerprint, "token": uuid.uuid4().hex}
+    )
+
+    loop = asyncio.get_running_loop()
+    wait_deadline = loop.time() + IDEMPOTENCY_WAIT_TIMEOUT
+    poll_interval = POLL_INTERVAL
+
+    try:
+        while not await redis.set(
+            redis_key, in_flight_record, nx=True, ex=IDEMPOTENCY_LOCK_TTL
+        ):
+            stored = await redis.get(redis_key)
+            if stored is not None:
+                record = json.loads(stored)
+                if record["fingerprint"] != fingerprint:
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail="Idempotency-Key was already used for a different request.",
+                    )
+                if "response" in record:
+                    logger.info("Replaying stored response for Idempotency-Key %s", key)
+                    return record["response"], True
+
+            if loop.time() >= wait_deadline:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is still in progress.",
+                )
+            await asyncio.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, MAX_POLL_INTERVAL)
+
+    except RedisError as e:
+        # Bet placement must not depend on Redis being up; without it we
+        # simply lose duplicate protection for this request.
+        logger.error(f"Idempotency store unavailable, executing request: {e}")
+        return await handler(), False
+
+    try:
+        result = await handler()
+    except BaseException:
+        with contextlib.suppress(RedisError):
+            await redis.eval(RELEASE_SCRIPT, 1, redis_key, in_flight_record)
+        raise
+
+    record = {"fingerprint": fingerprint, "response": jsonable_encoder(result)}
+    try:
+        stored = await redis.eval(
+            FINISH_SCRIPT,
+            1,
+            redis_key,
+            in_flight_record,
+            json.dumps(record),
+            IDEMPOTENCY_KEY_TTL,
+        )
+        if not stored:
+            logger.warning(
+                f"Claim on Idempotency-Key {key} expired and was taken by another "
+                "request, not storing the response"
+            )
+    except RedisError as e:
+        logger.error(f"Failed to store response for Idempotency-Key {key}: {e}")
+
+    return result, False
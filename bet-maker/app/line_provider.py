@@ -0,0 +1,361 @@
+"""
+Reads of line-provider data (open events and event detail) for bet
+placement and GET /events/. LINE_PROVIDER_TRANSPORT selects how they travel:
+RabbitMQ RPC ("rabbitmq", the default) or direct HTTP to line-provider's
+/internal endpoints over a pooled keep-alive client ("http").
+
+Both transports return line-provider's JSON as-is, with an {"error": ...}
+dict for an unknown or closed event. They raise TimeoutError when
+line-provider doesn't answer in time, and ConnectionError when it can't be
+reached or fails with a server error. Every call goes through the adaptive
+admission limiter and the circuit breaker, which fails calls fast while
+line-provider is down.
+
+A call's timeout adapts to line-provider's recent latency: a multiple of
+the p99 of the last calls of its kind. Timed-out calls count as taking the
+whole timeout, so the timeout grows back when line-provider slows down.
+With LINE_PROVIDER_HEDGE_DETAIL, an event detail lookup not answered by
+the p95 latency is sent a second time and the first answer wins.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable
+from urllib.parse import urlencode
+
+import httpx
+
+from . import metrics, profiling
+from .admission import rpc_limiter
+from .circuit_breaker import CircuitBreaker
+from .config import (
+    EVENT_LIST_REQUEST_QUEUE_NAME,
+    LINE_PROVIDER_BREAKER_FAILURES,
+    LINE_PROVIDER_BREAKER_RESET,
+    LINE_PROVIDER_HEDGE_DETAIL,
+    LINE_PROVIDER_HEDGE_RATIO,
+    LINE_PROVIDER_HTTP_MAX_CONNECTIONS,
+    LINE_PROVIDER_HTTP_TIMEOUT,
+    LINE_PROVIDER_LATENCY_MIN_SAMPLES,
+    LINE_PROVIDER_LATENCY_WINDOW,
+    LINE_PROVIDER_TIMEOUT_MAX,
+    LINE_PROVIDER_TIMEOUT_MIN,
+    LINE_PROVIDER_TIMEOUT_MULTIPLIER,
+    LINE_PROVIDER_TRANSPORT,
+    LINE_PROVIDER_URL,
+    REQUEST_QUEUE_NAME,
+)
+from .rabbitmq import decode_json, rpc_call, rpc_stream
+
+logger = logging.getLogger(__name__)
+
+
+class LineProviderUnavailable(ConnectionError):
+    """line-provider couldn't be reached over HTTP or answered with a 5xx."""
+
+
+class RabbitMQTransport:
+    async def get_available_events(
+        self, window: dict, timeout: float = LINE_PROVIDER_TIMEOUT_MAX
+    ) -> Any:
+        return await rpc_call(
+            routing_key="event-list-request",
+            queue_name=EVENT_LIST_REQUEST_QUEUE_NAME,
+            payload={"request": "get_available_events", **window},
+            timeout=timeout,
+        )
+
+    def stream_available_events(self, window: dict) -> AsyncIterator[Any]:
+        return rpc_stream(
+            routing_key="event-list-request",
+            queue_name=EVENT_LIST_REQUEST_QUEUE_NAME,
+            payload={"request": "get_available_events", "stream": True, **window},
+        )
+
+    async def get_available_event_detail(
+        self, event_id: int, timeout: float = LINE_PROVIDER_TIMEOUT_MAX
+    ) -> dict:
+        return await rpc_call(
+            routing_key="bet-request",
+            queue_name=REQUEST_QUEUE_NAME,
+            payload={"request": "get_available_event_detail", "event_id": event_id},
+            timeout=timeout,
+        )
+
+    async def close(self) -> None:
+        pass
+
+
+class HTTPTransport:
+    """
+    Keeps the last response and ETag of up to `max_cached_responses` URLs
+    and revalidates with If-None-Match, so unchanged events come back as an
+    empty 304 instead of a full body.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, max_cached_responses: int = 1024):
+        self.client = client
+        self.max_cached_responses = max_cached_responses
+        self._cached: OrderedDict[str, tuple[str, Any]] = OrderedDict()
+
+    async def _get(self, path: str, timeout: float) -> Any:
+        cached = self._cached.get(path)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        try:
+            response = await self.client.get(path, headers=headers, timeout=timeout)
+        except httpx.TimeoutException as e:
+            raise TimeoutError(f"No response received for GET {path}: {e!r}")
+        except httpx.TransportError as e:
+            raise LineProviderUnavailable(f"GET {path} failed: {e!r}")
+
+        if response.status_code == httpx.codes.NOT_MODIFIED and cached:
+            self._cached.move_to_end(path)
+            return cached[1]
+
+        if response.status_code == httpx.codes.NOT_FOUND:
+            self._cached.pop(path, None)
+            return {"error": response.json().get("detail", "Not found")}
+
+        if response.is_server_error:
+            raise LineProviderUnavailable(f"GET {path} answered {response.status_code}")
+        response.raise_for_status()
+        payload = await decode_json(response.content)
+
+        if etag := response.headers.get("etag"):
+            self._cached[path] = (etag, payload)
+            self._cached.move_to_end(path)
+            if len(self._cached) > self.max_cached_responses:
+                self._cached.popitem(last=False)
+
+        return payload
+
+    async def get_available_events(
+        self, window: dict, timeout: float = LINE_PROVIDER_TIMEOUT_MAX
+    ) -> Any:
+        path = "/internal/events/available"
+        return await self._get(
+            f"{path}?{urlencode(window)}" if window else path, timeout
+        )
+
+    async def stream_available_events(self, window: dict) -> AsyncIterator[Any]:
+        # One NDJSON line per chunk; no ETag revalidation for streams.
+        try:
+            async with self.client.stream(
+                "GET", "/internal/events/stream", params=window
+            ) as response:
+                if response.is_server_error:
+                    raise LineProviderUnavailable(
+                        f"Event stream answered {response.status_code}"
+                    )
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line:
+                        yield json.loads(line)
+        except httpx.TimeoutException as e:
+            raise TimeoutError(f"No chunk received from the event stream: {e!r}")
+        except httpx.TransportError as e:
+            raise LineProviderUnavailable(f"Event stream failed: {e!r}")
+
+    async def get_available_event_detail(
+        self, event_id: int, timeout: float = LINE_PROVIDER_TIMEOUT_MAX
+    ) -> dict:
+        return await self._get(f"/internal/events/available/{event_id}", timeout)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=LINE_PROVIDER_URL,
+        timeout=LINE_PROVIDER_HTTP_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=LINE_PROVIDER_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=LINE_PROVIDER_HTTP_MAX_CONNECTIONS,
+        ),
+    )
+
+
+def create_transport(name: str) -> RabbitMQTransport | HTTPTransport:
+    if name == "http":
+        return HTTPTransport(create_http_client())
+    if name != "rabbitmq":
+        logger.warning(f"Unknown LINE_PROVIDER_TRANSPORT {name!r}, using rabbitmq")
+    return RabbitMQTransport()
+
+
+transport = create_transport(LINE_PROVIDER_TRANSPORT)
+
+
+class HedgeBudget:
+    """Allows hedging `ratio` of calls, saving up for at most `burst` hedges."""
+
+    def __init__(self, ratio: float, burst: int = 10):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = float(burst)
+
+    def on_call(self) -> None:
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def spend(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+breaker = CircuitBreaker(LINE_PROVIDER_BREAKER_FAILURES, LINE_PROVIDER_BREAKER_RESET)
+hedge_budget = HedgeBudget(LINE_PROVIDER_HEDGE_RATIO)
+# Recent latencies of each kind of call, timed-out calls included.
+latencies: defaultdict[str, metrics.RecentLatencies] = defaultdict(
+    lambda: metrics.RecentLatencies(LINE_PROVIDER_LATENCY_WINDOW)
+)
+
+
+def recent_latency(operation: str, q: float) -> float | None:
+    """The q-quantile of the operation's recent latency, once there are enough calls."""
+    recent = latencies[operation]
+    if len(recent) < LINE_PROVIDER_LATENCY_MIN_SAMPLES:
+        return None
+    return recent.quantile(q)
+
+
+def call_timeout(operation: str) -> float:
+    p99 = recent_latency(operation, 0.99)
+    if p99 is None:
+        return LINE_PROVIDER_TIMEOUT_MAX
+    return min(
+        LINE_PROVIDER_TIMEOUT_MAX,
+        max(LINE_PROVIDER_TIMEOUT_MIN, p99 * LINE_PROVIDER_TIMEOUT_MULTIPLIER),
+    )
+
+
+async def attempt(operation: str, call: Callable[[float], Awaitable[Any]]) -> Any:
+    """One try at a call: an admission slot, the adaptive timeout, its latency."""
+    timeout = call_timeout(operation)
+    async with rpc_limiter.slot():
+        started_at = time.perf_counter()
+        try:
+            result = await call(timeout)
+        except TimeoutError:
+            latencies[operation].observe(timeout)
+            raise
+        latency = time.perf_counter() - started_at
+        latencies[operation].observe(latency)
+        metrics.observe(f"line_provider:{operation}", latency)
+        return result
+
+
+async def hedged(operation: str, call: Callable[[float], Awaitable[Any]]) -> Any:
+    """
+    attempt(), plus a second one if the first isn't answered by the p95
+    latency and the hedge budget allows; the first answer wins and the
+    other attempt is cancelled.
+    """
+    hedge_budget.on_call()
+    hedge_after = recent_latency(operation, 0.95)
+    if hedge_after is None:
+        return await attempt(operation, call)
+
+    first = asyncio.ensure_future(attempt(operation, call))
+    attempts = {first}
+    try:
+        done, _ = await asyncio.wait(attempts, timeout=hedge_after)
+        if done or not hedge_budget.spend():
+            return await first
+
+        attempts.add(asyncio.ensure_future(attempt(operation, call)))
+        pending = set(attempts)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+        raise first.exception()
+    finally:
+        for task in attempts:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # Marks a losing attempt's error as seen.
+                task.exception()
+
+
+def event_window(
+    starts_after: datetime | None,
+    starts_before: datetime | None,
+    limit: int | None,
+) -> dict:
+    """The time-window fields of an open-events request that are set."""
+    window = {
+        "starts_after": starts_after.isoformat() if starts_after else None,
+        "starts_before": starts_before.isoformat() if starts_before else None,
+        "limit": limit,
+    }
+    return {key: value for key, value in window.items() if value is not None}
+
+
+async def get_available_events(
+    starts_after: datetime | None = None,
+    starts_before: datetime | None = None,
+    limit: int | None = None,
+) -> Any:
+    """
+    Open events, soonest deadline first; optionally only those with a
+    deadline in [starts_after, starts_before), at most `limit` of them.
+    """
+    window = event_window(starts_after, starts_before, limit)
+    with profiling.span("line-provider", "get_available_events"):
+        async with breaker.call():
+            return await attempt(
+                "get_available_events",
+                lambda timeout: transport.get_available_events(window, timeout),
+            )
+
+
+async def stream_available_events(
+    starts_after: datetime | None = None,
+    starts_before: datetime | None = None,
+    limit: int | None = None,
+) -> AsyncIterator[Any]:
+    """
+    The events of get_available_events() as the chunks line-provider sends
+    them: lists of events, or a final {"error": ...} if the stream failed.
+    Only the wait for the first chunk holds an admission slot, as the rest
+    of the stream is paced by the client reading it.
+    """
+    chunks = transport.stream_available_events(
+        event_window(starts_after, starts_before, limit)
+    )
+    with profiling.span("line-provider", "stream_available_events"):
+        async with breaker.call(), rpc_limiter.slot():
+            first_chunk = await anext(chunks, None)
+    if first_chunk is None:
+        return
+
+    yield first_chunk
+    async for chunk in chunks:
+        yield chunk
+
+
+async def get_available_event_detail(event_id: int) -> dict:
+    def call(timeout: float) -> Awaitable[dict]:
+        return transport.get_available_event_detail(event_id, timeout)
+
+    with profiling.span("line-provider", f"get_available_event_detail {event_id}"):
+        async with breaker.call():
+            if LINE_PROVIDER_HEDGE_DETAIL:
+                return await hedged("get_available_event_detail", call)
+            return await attempt("get_available_event_detail", call)
+
+
+async def close() -> None:
+    await transport.close()
@@ -0,0 +1,101 @@
+"""
+Logging setup shared by the web app and the worker. Loggers only put records
+on an in-memory queue; a QueueListener thread formats them (as one JSON
+object per line, unless LOG_FORMAT is "text") and writes them to stdout, so
+a slow stdout never blocks the event loop. Messages logged with %-style
+arguments are only rendered on that thread, and only if they are kept.
+
+High-volume loggers can be sampled with LOG_SAMPLE_RATES: below WARNING,
+only that share of their records is kept, dropped before it is queued.
+"""
+
+import atexit
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+from .config import DB_ECHO, LOG_FORMAT, LOG_LEVEL, LOG_SAMPLE_RATES
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps `rate` of the records below WARNING from each sampled logger (and
+    its children), evenly spaced rather than at random.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        # Starting one step short of a full credit keeps the first record.
+        self._credit = {name: 1.0 - rate for name, rate in rates.items()}
+
+    def sampled_logger(self, name: str) -> str | None:
+        while name:
+            if name in self.rates:
+                return name
+            name = name.rpartition(".")[0]
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        name = self.sampled_logger(record.name)
+        if name is None:
+            return True
+
+        self._credit[name] += self.rates[name]
+        if self._credit[name] < 1:
+            return False
+        self._credit[name] -= 1
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    # QueueHandler.prepare() formats the message on the caller's thread; the
+    # queue never leaves the process, so the record is passed on as is and
+    # formatted by the listener instead.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging() -> QueueListener:
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter(TEXT_FORMAT) if LOG_FORMAT == "text" else JsonFormatter()
+    )
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(LOG_SAMPLE_RATES))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+    # uvicorn installs its own stdout handlers; route its logs through the
+    # queue as well.
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+    if DB_ECHO:
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -1,15 +1,18 @@
 import asyncio
 import logging
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
-from redis import asyncio as aioredis
 
-from .config import REDIS_HOST, REDIS_PORT
+from . import line_provider, loop_monitor, metrics, profiling, readiness
+from .config import RUN_CONSUMER_IN_APP
 from .consumers import consume
-from .routers import bets, events
+from .database import pin_reads_to_primary
+from .logging_config import setup_logging
+from .redis_client import get_redis
+from .routers import admin, bets, debug, events
 
 app = FastAPI(title="Bet Maker", root_path="/bet-maker")
 
@@ -27,33 +30,70 @@ app.add_middleware(
 
 app.include_router(bets.router, prefix="/bets", tags=["bets"])
 app.include_router(events.router, prefix="/events", tags=["events"])
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
+app.include_router(debug.router, prefix="/debug", tags=["debug"])
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()],
-)
+setup_logging()
 
 logger = logging.getLogger(__name__)
 
 
+@app.middleware("http")
+async def trace_slow_requests(request: Request, call_next):
+    trace = profiling.RequestTrace(request.method, request.url.path)
+    token = profiling.current_trace.set(trace)
+    try:
+        response = await call_next(request)
+    finally:
+        profiling.current_trace.reset(token)
+    route = getattr(request.scope.get("route"), "path", request.url.path)
+    profiling.finish_trace(trace, route, response.status_code)
+    return response
+
+
+@app.middleware("http")
+async def pin_reads_after_writes(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        pin_reads_to_primary(response)
+    return response
+
+
 @app.get("/health", tags=["health"])
 async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/ready", tags=["health"])
+async def readiness_check(response: Response):
+    if not readiness.is_ready():
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "warming up", "components": readiness.components}
+    return {"status": "ready", "components": readiness.components}
+
+
+@app.get("/metrics", tags=["health"])
+async def loop_metrics():
+    """Lag of this process's event loop and latencies of line-provider calls."""
+    return metrics.snapshot()
+
+
 @app.on_event("startup")
 async def startup_event():
-    redis = aioredis.from_url(
-        f"redis://{REDIS_HOST}:{REDIS_PORT}", encoding="utf8", decode_responses=True
-    )
-    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
+    FastAPICache.init(RedisBackend(get_redis()), prefix="fastapi-cache")
+    asyncio.create_task(loop_monitor.monitor_loop())
+
+    readiness.expect("database", "broker", "cache")
+    if RUN_CONSUMER_IN_APP:
+        readiness.expect("consumer")
+        asyncio.create_task(consume())
+        logger.info("RabbitMQ consumer started.")
 
-    asyncio.create_task(consume())
-    logger.info("RabbitMQ consumer started.")
+    asyncio.create_task(readiness.warm_up())
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await line_provider.close()
     logger.info("Application is shutting down.")
@@ -0,0 +1,112 @@
+"""
+In-process latency metrics: the event loop's lag and line-provider call
+latencies. Served by GET /metrics, and logged periodically by the
+standalone worker.
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+# Bucket upper bounds in milliseconds; quantiles are reported as the upper
+# bound of the bucket they fall in.
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, math.inf)
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        milliseconds = seconds * 1000
+        self.counts[bisect.bisect_left(BUCKETS_MS, milliseconds)] += 1
+        self.count += 1
+        self.total_ms += milliseconds
+        self.max_ms = max(self.max_ms, milliseconds)
+
+    def quantile(self, q: float) -> float:
+        rank = math.ceil(q * self.count)
+        seen = 0
+        for bound, bucket_count in zip(BUCKETS_MS, self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return round(min(bound, self.max_ms), 3)
+        return round(self.max_ms, 3)
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class RecentLatencies:
+    """
+    Exact quantiles of only the last `size` observations, so unlike a
+    LatencyHistogram they follow a change in latency. The sorted window is
+    rebuilt at most every `size // 20` observations.
+    """
+
+    def __init__(self, size: int):
+        self.samples: deque[float] = deque(maxlen=size)
+        self.refresh_every = max(1, size // 20)
+        self._sorted: list[float] = []
+        self._stale = 0
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self._stale += 1
+
+    def quantile(self, q: float) -> float | None:
+        """The q-quantile in seconds, or None before any observation."""
+        if self._stale >= self.refresh_every or self._stale > len(self._sorted):
+            self._sorted = sorted(self.samples)
+            self._stale = 0
+        if not self._sorted:
+            return None
+        rank = max(1, math.ceil(q * len(self._sorted)))
+        return self._sorted[rank - 1]
+
+
+histograms: defaultdict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+
+
+def observe(name: str, seconds: float) -> None:
+    histograms[name].observe(seconds)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started_at)
+
+
+def snapshot() -> dict[str, dict]:
+    return {name: histogram.snapshot() for name, histogram in histograms.items()}
+
+
+async def log_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        for name, stats in snapshot().items():
+            logger.info(f"Latency {name}: {stats}")
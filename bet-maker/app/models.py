@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Enum, Integer, Numeric, Table
+from sqlalchemy import Column, Enum, ForeignKey, Integer, Numeric, Table
 
 from .database import metadata
 from .schemas import BetPrediction, BetStatus
@@ -7,10 +7,53 @@ bets = Table(
     "bets",
     metadata,
     Column("id", Integer, primary_key=True),
-    Column("event_id", Integer, nullable=False),
+    Column("event_id", Integer, nullable=False, index=True),
     Column("bet_prediction", Enum(BetPrediction), nullable=False),
     Column("coefficient", Numeric(3, 2), nullable=False),
     Column("amount", Numeric(10, 2), nullable=False),
     Column("possible_winning", Numeric(15, 2), nullable=False),
     Column("status", Enum(BetStatus), default=BetStatus.NOT_PLAYED),
 )
+
+# Per-(event, status) totals over `bets`, kept up to date by the bet CRUD so
+# stats reads never have to aggregate the bets table itself.
+bet_stats = Table(
+    "bet_stats",
+    metadata,
+    Column("event_id", Integer, primary_key=True),
+    Column("status", Enum(BetStatus), primary_key=True),
+    Column("bets_count", Integer, nullable=False),
+    Column("total_amount", Numeric(20, 2), nullable=False),
+    Column("total_possible_winning", Numeric(20, 2), nullable=False),
+)
+
+# Multi-leg bets: the coefficient is the product of the legs' coefficients.
+# remaining_legs counts legs still waiting for their event's result, so a
+# result only touches the legs on that event and their parents.
+accumulators = Table(
+    "accumulators",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("coefficient", Numeric(14, 2), nullable=False),
+    Column("amount", Numeric(10, 2), nullable=False),
+    Column("possible_winning", Numeric(20, 2), nullable=False),
+    Column("remaining_legs", Integer, nullable=False),
+    Column("status", Enum(BetStatus), nullable=False, default=BetStatus.NOT_PLAYED),
+)
+
+accumulator_legs = Table(
+    "accumulator_legs",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column(
+        "accumulator_id",
+        Integer,
+        ForeignKey("accumulators.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    ),
+    Column("event_id", Integer, nullable=False, index=True),
+    Column("bet_prediction", Enum(BetPrediction), nullable=False),
+    Column("coefficient", Numeric(3, 2), nullable=False),
+    Column("status", Enum(BetStatus), nullable=False, default=BetStatus.NOT_PLAYED),
+)
@@ -0,0 +1,177 @@
+"""
+Production diagnostics behind the /debug endpoints, which are only served
+when DEBUG_TOKEN is set.
+
+profile() samples the event loop thread's stack for a few seconds from a
+background thread. Sampling is by wall clock, so time spent waiting shows
+up too. The samples come back as collapsed stacks ("frame;frame;... count"
+lines) that flamegraph.pl and speedscope read directly. Each stack is
+rooted at the asyncio task that was running, so the coroutines of
+concurrent requests stay apart.
+
+Every HTTP request also carries a RequestTrace that times its DB statements
+and outbound calls. Requests slower than SLOW_REQUEST_THRESHOLD_MS are
+logged with their trace and kept for GET /debug/slow-requests.
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from fastapi import Header, HTTPException, status
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import DEBUG_TOKEN, SLOW_REQUEST_LOG_SIZE, SLOW_REQUEST_THRESHOLD_MS
+
+logger = logging.getLogger(__name__)
+
+# Bounds the memory a single request with a runaway query loop can take.
+MAX_SPANS_PER_TRACE = 200
+
+
+def require_debug_token(x_debug_token: Optional[str] = Header(None)) -> None:
+    if not DEBUG_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if not hmac.compare_digest(x_debug_token or "", DEBUG_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid debug token."
+        )
+
+
+def frame_name(code) -> str:
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    def __init__(
+        self, thread_id: int, loop: asyncio.AbstractEventLoop, interval: float
+    ):
+        self.thread_id = thread_id
+        self.loop = loop
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+
+    def sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None:
+            stack.append(frame_name(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+
+        task = asyncio.current_task(self.loop)
+        root = f"task {task.get_coro().__qualname__}" if task else "event loop"
+        self.samples[";".join([root, *stack])] += 1
+
+    def run(self, stop: threading.Event) -> None:
+        while not stop.wait(self.interval):
+            self.sample()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+
+profile_lock = asyncio.Lock()
+
+
+async def profile(seconds: float, interval: float) -> str:
+    """Samples this process's event loop for `seconds`; returns collapsed stacks."""
+    sampler = StackSampler(threading.get_ident(), asyncio.get_running_loop(), interval)
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=sampler.run, args=(stop,), name="profiler", daemon=True
+    )
+    thread.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        stop.set()
+        await asyncio.to_thread(thread.join)
+
+    logger.info(f"Captured {sampler.samples.total()} stack samples in {seconds}s")
+    return sampler.collapsed()
+
+
+@dataclass
+class RequestTrace:
+    method: str
+    path: str
+    started_at: float = field(default_factory=time.perf_counter)
+    spans: list[dict] = field(default_factory=list)
+
+    def add_span(self, kind: str, detail: str, seconds: float) -> None:
+        if len(self.spans) < MAX_SPANS_PER_TRACE:
+            self.spans.append(
+                {"kind": kind, "detail": detail, "ms": round(seconds * 1000, 3)}
+            )
+
+
+current_trace: ContextVar[RequestTrace | None] = ContextVar(
+    "current_trace", default=None
+)
+slow_requests: deque[dict] = deque(maxlen=SLOW_REQUEST_LOG_SIZE)
+
+
+@contextmanager
+def span(kind: str, detail: str) -> Iterator[None]:
+    """Times the block into the current request's trace, if there is one."""
+    trace = current_trace.get()
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        if trace is not None:
+            trace.add_span(kind, detail, time.perf_counter() - started_at)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Times every statement run on `engine` into the current request's trace."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        started_at = conn.info["query_started_at"].pop()
+        trace = current_trace.get()
+        if trace is not None:
+            trace.add_span("db", statement[:500], time.perf_counter() - started_at)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        if context.connection is not None:
+            started_at = context.connection.info.get("query_started_at")
+            if started_at:
+                started_at.pop()
+
+
+def finish_trace(trace: RequestTrace, route: str, status_code: int) -> None:
+    duration_ms = (time.perf_counter() - trace.started_at) * 1000
+    if duration_ms < SLOW_REQUEST_THRESHOLD_MS:
+        return
+
+    slow_request = {
+        "at": datetime.now(timezone.utc).isoformat(),
+        "method": trace.method,
+        "route": route,
+        "path": trace.path,
+        "status": status_code,
+        "duration_ms": round(duration_ms, 3),
+        "spans": trace.spans,
+    }
+    slow_requests.append(slow_request)
+    logger.warning("Slow request: %s", json.dumps(slow_request))
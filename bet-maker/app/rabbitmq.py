@@ -2,14 +2,36 @@ import asyncio
 import json
 import logging
 import uuid
+from typing import Any, AsyncIterator
 
 from aio_pika import Connection, ExchangeType, Message, connect_robust
+from aio_pika.abc import AbstractChannel, AbstractQueue
 
-from .config import EXCHANGE_NAME, RABBITMQ_HOST, RABBITMQ_PASS, RABBITMQ_USER
+from .config import (
+    EXCHANGE_NAME,
+    OFFLOAD_DESERIALIZATION_MIN_BYTES,
+    RABBITMQ_HOST,
+    RABBITMQ_PASS,
+    RABBITMQ_USER,
+    RPC_STREAM_PREFETCH_COUNT,
+)
 
 RABBITMQ_URL = f"amqp://{RABBITMQ_USER}:{RABBITMQ_PASS}@{RABBITMQ_HOST}/"
 
 logger = logging.getLogger(__name__)
+# Logs every RPC round trip; sampled by default (see LOG_SAMPLE_RATES).
+rpc_logger = logging.getLogger(f"{__name__}.rpc")
+
+
+async def decode_json(body: bytes) -> Any:
+    """
+    json.loads(), on a worker thread for bodies of
+    OFFLOAD_DESERIALIZATION_MIN_BYTES or more so big event lists don't
+    stall the event loop.
+    """
+    if 0 < OFFLOAD_DESERIALIZATION_MIN_BYTES <= len(body):
+        return await asyncio.to_thread(json.loads, body)
+    return json.loads(body)
 
 
 async def get_rabbit_connection() -> Connection:
@@ -33,37 +55,65 @@ async def connect_with_retry(max_attempts: int = 10, delay: float = 3.0) -> Conn
             await asyncio.sleep(delay)
 
 
+_shared_connection: Connection | None = None
+_shared_connection_lock = asyncio.Lock()
+
+
+async def get_shared_connection() -> Connection:
+    """
+    One robust connection per process for RPC calls; each call only opens a
+    channel on it, which is far cheaper than a TCP + AMQP handshake per call.
+    """
+    global _shared_connection
+    async with _shared_connection_lock:
+        if _shared_connection is None or _shared_connection.is_closed:
+            _shared_connection = await get_rabbit_connection()
+        return _shared_connection
+
+
+async def publish_request(
+    channel: AbstractChannel, routing_key: str, queue_name: str, payload: dict
+) -> tuple[AbstractQueue, str]:
+    """
+    Publishes an RPC request with a private, auto-deleted reply queue, so
+    concurrent callers can never consume each other's responses (unlike
+    scanning one shared response queue). Returns the reply queue and the
+    request's correlation id.
+    """
+    callback_queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+
+    exchange = await channel.declare_exchange(
+        EXCHANGE_NAME, ExchangeType.DIRECT, durable=True
+    )
+    request_queue = await channel.declare_queue(queue_name, durable=True)
+    await request_queue.bind(exchange, routing_key=routing_key)
+
+    correlation_id = str(uuid.uuid4())
+    await exchange.publish(
+        Message(
+            body=json.dumps(payload).encode(),
+            correlation_id=correlation_id,
+            reply_to=callback_queue.name,
+        ),
+        routing_key=routing_key,
+    )
+    rpc_logger.info(
+        "Sent RPC request '%s' (correlation_id=%s)", routing_key, correlation_id
+    )
+    return callback_queue, correlation_id
+
+
 async def rpc_call(
     routing_key: str, queue_name: str, payload: dict, timeout: float = 10.0
 ) -> dict:
     """
-    Request/response over RabbitMQ using a private, auto-deleted reply queue
-    per call, so concurrent callers can never consume each other's responses
-    (unlike scanning one shared response queue), and a timeout so a caller
-    can't hang forever if nothing ever replies.
+    Request/response over RabbitMQ, with a timeout so a caller can't hang
+    forever if nothing ever replies.
     """
-    connection = await get_rabbit_connection()
-    async with connection:
-        channel = await connection.channel()
-        callback_queue = await channel.declare_queue(exclusive=True, auto_delete=True)
-
-        exchange = await channel.declare_exchange(
-            EXCHANGE_NAME, ExchangeType.DIRECT, durable=True
-        )
-        request_queue = await channel.declare_queue(queue_name, durable=True)
-        await request_queue.bind(exchange, routing_key=routing_key)
-
-        correlation_id = str(uuid.uuid4())
-        await exchange.publish(
-            Message(
-                body=json.dumps(payload).encode(),
-                correlation_id=correlation_id,
-                reply_to=callback_queue.name,
-            ),
-            routing_key=routing_key,
-        )
-        logger.info(
-            f"Sent RPC request '{routing_key}' (correlation_id={correlation_id})"
+    connection = await get_shared_connection()
+    async with connection.channel() as channel:
+        callback_queue, correlation_id = await publish_request(
+            channel, routing_key, queue_name, payload
         )
 
         try:
@@ -72,10 +122,11 @@ async def rpc_call(
                     async for message in queue_iter:
                         async with message.process():
                             if message.correlation_id == correlation_id:
-                                logger.info(
-                                    f"Received RPC response (correlation_id={correlation_id})"
+                                rpc_logger.info(
+                                    "Received RPC response (correlation_id=%s)",
+                                    correlation_id,
                                 )
-                                return json.loads(message.body.decode())
+                                return await decode_json(message.body)
         except TimeoutError:
             logger.error(
                 f"RPC call '{routing_key}' timed out after {timeout}s "
@@ -84,3 +135,57 @@ async def rpc_call(
             raise TimeoutError(
                 f"No response received for '{routing_key}' within {timeout}s"
             )
+
+
+async def rpc_stream(
+    routing_key: str, queue_name: str, payload: dict, timeout: float = 10.0
+) -> AsyncIterator[Any]:
+    """
+    Like rpc_call(), for a reply sent as a sequence of messages numbered by
+    a "seq" header: yields each decoded chunk as it arrives, up to and
+    including the one marked "end". `timeout` applies to each chunk. The
+    reply queue's prefetch of RPC_STREAM_PREFETCH_COUNT keeps the chunks
+    not yet consumed on the broker rather than in this process.
+    """
+    connection = await get_shared_connection()
+    async with connection.channel() as channel:
+        await channel.set_qos(prefetch_count=RPC_STREAM_PREFETCH_COUNT)
+        callback_queue, correlation_id = await publish_request(
+            channel, routing_key, queue_name, payload
+        )
+
+        expected_seq = 0
+        async with callback_queue.iterator() as queue_iter:
+            while True:
+                try:
+                    async with asyncio.timeout(timeout):
+                        message = await anext(queue_iter)
+                except TimeoutError:
+                    logger.error(
+                        f"RPC stream '{routing_key}' stalled after chunk "
+                        f"{expected_seq - 1} (correlation_id={correlation_id})"
+                    )
+                    raise TimeoutError(
+                        f"No chunk received for '{routing_key}' within {timeout}s"
+                    )
+
+                async with message.process():
+                    if message.correlation_id != correlation_id:
+                        continue
+                    headers = message.headers or {}
+                    if headers.get("seq") != expected_seq:
+                        raise RuntimeError(
+                            f"RPC stream '{routing_key}' sent chunk "
+                            f"{headers.get('seq')}, expected {expected_seq}"
+                        )
+                    chunk = json.loads(message.body)
+
+                expected_seq += 1
+                yield chunk
+                if headers.get("end"):
+                    rpc_logger.info(
+                        "Received RPC stream of %d chunks (correlation_id=%s)",
+                        expected_seq,
+                        correlation_id,
+                    )
+                    return
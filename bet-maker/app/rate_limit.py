@@ -0,0 +1,74 @@
+import logging
+import math
+import time
+
+from fastapi import HTTPException, Request, status
+from redis.exceptions import RedisError
+
+from .config import RATE_LIMIT_BURST, RATE_LIMIT_PER_SECOND
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Token bucket kept in a Redis hash so the limit holds across every
+# bet-maker instance; refill and take happen atomically inside the script.
+# Returns {allowed, retry_after_ms}.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate / 1000)
+
+local allowed = 0
+local retry_after_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after_ms = math.ceil((1 - tokens) * 1000 / rate)
+end
+
+redis.call("HSET", KEYS[1], "tokens", tokens, "updated_at", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil(capacity * 1000 / rate))
+return {allowed, retry_after_ms}
+"""
+
+
+def client_id(request: Request) -> str:
+    """
+    There is no authentication, so a client is whatever it says it is in
+    X-Client-Id, falling back to the peer address.
+    """
+    if header := request.headers.get("x-client-id"):
+        return header
+    return request.client.host if request.client else "unknown"
+
+
+async def enforce_bet_rate_limit(request: Request) -> None:
+    if RATE_LIMIT_PER_SECOND <= 0:
+        return
+
+    try:
+        allowed, retry_after_ms = await get_redis().eval(
+            TOKEN_BUCKET_SCRIPT,
+            1,
+            f"ratelimit:bets:{client_id(request)}",
+            RATE_LIMIT_PER_SECOND,
+            RATE_LIMIT_BURST,
+            int(time.time() * 1000),
+        )
+    except RedisError as e:
+        logger.error(f"Rate limiter unavailable, admitting request: {e}")
+        return
+
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after_ms / 1000)))},
+        )
@@ -0,0 +1,80 @@
+"""
+Readiness state behind GET /ready. Startup registers the components an
+instance needs warm before it should take traffic; /ready reports 503 until
+each of them has been marked ready, while /health stays a plain liveness probe.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from .config import EVENT_LIST_REQUEST_QUEUE_NAME, REQUEST_QUEUE_NAME
+from .database import warm_up_pools
+from .rabbitmq import get_shared_connection
+from .routers.events import request_available_events
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY = 2.0
+CACHE_WARM_UP_ATTEMPTS = 5
+
+components: dict[str, bool] = {}
+
+
+def expect(*names: str) -> None:
+    for name in names:
+        components.setdefault(name, False)
+
+
+def mark_ready(name: str) -> None:
+    components[name] = True
+    logger.info(f"{name} is ready")
+
+
+def is_ready() -> bool:
+    return all(components.values())
+
+
+async def warm_up_component(name: str, warm_up: Callable[[], Awaitable[None]]) -> None:
+    """Retries `warm_up` until it succeeds, then marks `name` ready."""
+    while True:
+        try:
+            await warm_up()
+            break
+        except Exception as e:
+            logger.warning(f"Warming up {name} failed, retrying: {e}")
+            await asyncio.sleep(RETRY_DELAY)
+    mark_ready(name)
+
+
+async def warm_up_rpc_client() -> None:
+    connection = await get_shared_connection()
+    async with connection.channel() as channel:
+        for queue_name in (REQUEST_QUEUE_NAME, EVENT_LIST_REQUEST_QUEUE_NAME):
+            await channel.declare_queue(queue_name, durable=True)
+
+
+async def warm_up_events_cache() -> None:
+    """
+    Preloads the open-events cache that GET /events/ serves from. Only line-
+    provider can answer this, so it is best-effort: an instance doesn't stay
+    unready because the other service is down.
+    """
+    for attempt in range(1, CACHE_WARM_UP_ATTEMPTS + 1):
+        try:
+            await request_available_events()
+            return
+        except Exception as e:
+            logger.warning(
+                f"Preloading open events failed "
+                f"(attempt {attempt}/{CACHE_WARM_UP_ATTEMPTS}): {e}"
+            )
+            await asyncio.sleep(RETRY_DELAY)
+
+
+async def warm_up() -> None:
+    await asyncio.gather(
+        warm_up_component("database", warm_up_pools),
+        warm_up_component("broker", warm_up_rpc_client),
+    )
+    await warm_up_component("cache", warm_up_events_cache)
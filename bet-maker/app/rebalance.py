@@ -0,0 +1,108 @@
+"""
+Moves bets to the shard that owns their event after DB_SHARD_HOSTS changed,
+started with `python -m app.rebalance [--dry-run]`.
+
+Run it once every instance uses the new shard list, with the settlement
+consumer stopped: until an event's bets are moved, settling it on its new
+shard would miss them.
+
+Events are moved one at a time. An event's bets are copied to its owning
+shard, skipping ids already there, and then deleted from the old shard,
+and the event's stats rows are rebuilt on both shards. If the tool dies
+part-way, at worst one event has bets on both shards; running it again
+finishes the move.
+"""
+
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import delete
+from sqlalchemy.future import select
+
+from . import sharding
+from .bet_ingestion import row_for_copy
+from .crud import copy_bets_to_shard, refresh_bet_stats
+from .logging_config import setup_logging
+from .models import bets
+from .schemas import BetResponse, BetStatus
+
+logger = logging.getLogger(__name__)
+
+
+async def misplaced_events(shard: int) -> list[int]:
+    """Events with bets on `shard` that another shard owns."""
+    async with sharding.shard_session_makers[shard]() as session:
+        event_ids = (
+            await session.execute(select(bets.c.event_id).distinct())
+        ).scalars()
+        return [
+            event_id
+            for event_id in event_ids
+            if sharding.shard_for_event(event_id) != shard
+        ]
+
+
+async def move_event(source: int, event_id: int) -> int:
+    """Moves an event's bets from `source` to their owning shard; returns how many."""
+    target = sharding.shard_for_event(event_id)
+    async with sharding.shard_session_makers[source]() as source_session:
+        result = await source_session.execute(
+            select(bets).where(bets.c.event_id == event_id)
+        )
+        event_bets = result.mappings().fetchall()
+        rows = [
+            row_for_copy(
+                BetResponse(**{**bet, "status": bet["status"] or BetStatus.NOT_PLAYED})
+            )
+            for bet in event_bets
+        ]
+
+        async with sharding.shard_session_makers[target]() as target_session:
+            await copy_bets_to_shard(target_session, rows)
+            await refresh_bet_stats(target_session, [event_id])
+            await target_session.commit()
+
+        await source_session.execute(delete(bets).where(bets.c.event_id == event_id))
+        await refresh_bet_stats(source_session, [event_id])
+        await source_session.commit()
+
+    logger.info(
+        f"Moved {len(event_bets)} bets of event_id {event_id} "
+        f"from shard {source} to shard {target}"
+    )
+    return len(event_bets)
+
+
+async def rebalance(dry_run: bool = False) -> dict[int, list[int]]:
+    """
+    Moves every misplaced event; returns them by the shard they were on.
+    With `dry_run`, only finds them.
+    """
+    moves = {}
+    for shard in range(len(sharding.shard_session_makers)):
+        event_ids = await misplaced_events(shard)
+        if event_ids:
+            moves[shard] = event_ids
+        logger.info(f"Shard {shard}: {len(event_ids)} events to move")
+
+        if not dry_run:
+            for event_id in event_ids:
+                await move_event(shard, event_id)
+
+    return moves
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only report what would move"
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    asyncio.run(rebalance(dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
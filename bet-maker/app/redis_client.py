@@ -0,0 +1,13 @@
+from redis import asyncio as aioredis
+
+from .config import REDIS_HOST, REDIS_PORT
+
+# One lazily-connecting client (and so one connection pool) per process,
+# shared by the response cache and everything else that talks to Redis.
+redis = aioredis.from_url(
+    f"redis://{REDIS_HOST}:{REDIS_PORT}", encoding="utf8", decode_responses=True
+)
+
+
+def get_redis() -> aioredis.Redis:
+    return redis
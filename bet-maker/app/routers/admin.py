@@ -0,0 +1,123 @@
+import logging
+from typing import AsyncIterator, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import exposure, profiling
+from ..analytics import EXPORT_MEDIA_TYPES, export_bets
+from ..database import get_async_session, get_replica_session
+from ..schemas import (
+    BetStatus,
+    DeadLetterReplayResponse,
+    DeadLettersResponse,
+    ExposureLimits,
+    ExposureResponse,
+)
+from ..settlement_retry import count_dead_letters, replay_dead_letters
+
+# Admin endpoints change limits, replay settlements and dump every bet, so they
+# take the same X-Debug-Token as /debug and are off while DEBUG_TOKEN is unset.
+router = APIRouter(dependencies=[Depends(profiling.require_debug_token)])
+
+logger = logging.getLogger(__name__)
+
+
+@router.get("/dead-letters", response_model=DeadLettersResponse)
+async def dead_letters():
+    try:
+        return DeadLettersResponse(count=await count_dead_letters())
+    except Exception as e:
+        logger.error(f"Error while counting dead letters: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Message broker is unavailable.",
+        )
+
+
+@router.post("/dead-letters/replay", response_model=DeadLetterReplayResponse)
+async def replay(limit: int = Query(1000, gt=0, le=100_000)):
+    try:
+        return DeadLetterReplayResponse(replayed=await replay_dead_letters(limit))
+    except Exception as e:
+        logger.error(f"Error while replaying dead letters: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Message broker is unavailable.",
+        )
+
+
+def exposure_store_unavailable(e: RedisError) -> HTTPException:
+    logger.error(f"Exposure store error: {e}", exc_info=True)
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Exposure store is unavailable.",
+    )
+
+
+@router.get("/exposure/{event_id}", response_model=ExposureResponse)
+async def get_exposure(event_id: int):
+    try:
+        return await exposure.get_exposure(event_id)
+    except RedisError as e:
+        raise exposure_store_unavailable(e)
+
+
+@router.put("/exposure/{event_id}/limits", response_model=ExposureResponse)
+async def set_exposure_limits(event_id: int, limits: ExposureLimits):
+    try:
+        return await exposure.set_limits(event_id, limits)
+    except RedisError as e:
+        raise exposure_store_unavailable(e)
+
+
+@router.post("/exposure/{event_id}/reconcile", response_model=ExposureResponse)
+async def reconcile_exposure(
+    event_id: int, session: AsyncSession = Depends(get_async_session)
+):
+    try:
+        return await exposure.reconcile(session, event_id)
+    except RedisError as e:
+        raise exposure_store_unavailable(e)
+
+
+@router.get("/bets/export", response_class=StreamingResponse)
+async def export_bets_route(
+    format: Literal["arrow", "parquet"] = "parquet",
+    event_id: Optional[int] = None,
+    bet_status: Optional[BetStatus] = Query(None, alias="status"),
+):
+    """
+    Bets, optionally of one event and status, as an Arrow IPC stream or a
+    Parquet file for analytics, streamed a record batch at a time.
+    """
+
+    async def export() -> AsyncIterator[bytes]:
+        # Opened here rather than as a dependency, which would be closed
+        # once the route returns, before the body is sent.
+        async for session in get_replica_session():
+            async for data in export_bets(session, format, event_id, bet_status):
+                yield data
+
+    chunks = export()
+    try:
+        first_chunk = await anext(chunks)
+    except Exception as e:
+        logger.error(f"Error while exporting bets: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Bets database is unavailable.",
+        )
+
+    async def body() -> AsyncIterator[bytes]:
+        yield first_chunk
+        async for data in chunks:
+            yield data
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="bets.{format}"'},
+    )
@@ -1,21 +1,52 @@
 import logging
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import crud
-from ..database import get_async_session
-from ..schemas import BetCreate, BetResponse
+from ..database import get_async_session, get_read_session
+from ..idempotency import request_fingerprint, run_idempotent
+from ..rate_limit import enforce_bet_rate_limit
+from ..schemas import (
+    AccumulatorCreate,
+    AccumulatorResponse,
+    BetCreate,
+    BetResponse,
+    BetStatsReconcileResponse,
+    BetStatsResponse,
+    CashoutQuoteResponse,
+)
 
 router = APIRouter()
 
 logger = logging.getLogger(__name__)
 
 
-@router.post("/", response_model=BetResponse, status_code=status.HTTP_201_CREATED)
-async def place_bet(bet: BetCreate, session: AsyncSession = Depends(get_async_session)):
+@router.post(
+    "/",
+    response_model=BetResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(enforce_bet_rate_limit)],
+)
+async def place_bet(
+    bet: BetCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    session: AsyncSession = Depends(get_async_session),
+):
     try:
-        return await crud.create_bet(bet, session)
+        if idempotency_key is None:
+            return await crud.create_bet(bet, session)
+
+        created_bet, replayed = await run_idempotent(
+            idempotency_key,
+            request_fingerprint(bet.model_dump_json()),
+            lambda: crud.create_bet(bet, session),
+        )
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return created_bet
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -28,7 +59,7 @@ async def place_bet(bet: BetCreate, session: AsyncSession = Depends(get_async_se
 
 @router.get("/", response_model=list[BetResponse])
 async def list_bets(
-    offset: int = 0, limit: int = 10, session: AsyncSession = Depends(get_async_session)
+    offset: int = 0, limit: int = 10, session: AsyncSession = Depends(get_read_session)
 ):
     try:
         return await crud.get_all_bets(session, offset, limit)
@@ -40,3 +71,110 @@ async def list_bets(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error occurred",
         )
+
+
+@router.get("/stats", response_model=BetStatsResponse)
+async def bet_stats(
+    event_id: Optional[int] = None,
+    offset: int = 0,
+    limit: int = 10,
+    session: AsyncSession = Depends(get_read_session),
+):
+    try:
+        return await crud.get_bet_stats(session, event_id, offset, limit)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Unexpected error while getting bet stats: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred",
+        )
+
+
+@router.post("/stats/reconcile", response_model=BetStatsReconcileResponse)
+async def reconcile_bet_stats(
+    event_id: Optional[int] = None,
+    session: AsyncSession = Depends(get_async_session),
+):
+    try:
+        reconciled_events = await crud.reconcile_bet_stats(session, event_id)
+        return BetStatsReconcileResponse(reconciled_events=reconciled_events)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(
+            f"Unexpected error while reconciling bet stats: {e}", exc_info=True
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred",
+        )
+
+
+@router.post(
+    "/accumulators",
+    response_model=AccumulatorResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(enforce_bet_rate_limit)],
+)
+async def place_accumulator(
+    accumulator: AccumulatorCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    session: AsyncSession = Depends(get_async_session),
+):
+    try:
+        if idempotency_key is None:
+            return await crud.create_accumulator(accumulator, session)
+
+        created_accumulator, replayed = await run_idempotent(
+            idempotency_key,
+            request_fingerprint(accumulator.model_dump_json()),
+            lambda: crud.create_accumulator(accumulator, session),
+        )
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return created_accumulator
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Unexpected error while placing accumulator: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred",
+        )
+
+
+@router.get("/accumulators", response_model=list[AccumulatorResponse])
+async def list_accumulators(
+    offset: int = 0, limit: int = 10, session: AsyncSession = Depends(get_read_session)
+):
+    try:
+        return await crud.get_all_accumulators(session, offset, limit)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(
+            f"Unexpected error while getting all accumulators: {e}", exc_info=True
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred",
+        )
+
+
+@router.get("/{bet_id}/cashout", response_model=CashoutQuoteResponse)
+async def cashout_quote(
+    bet_id: int, session: AsyncSession = Depends(get_async_session)
+):
+    try:
+        return await crud.get_cashout_quote(session, bet_id)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Unexpected error while quoting cash-out: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred",
+        )
@@ -0,0 +1,40 @@
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from .. import profiling
+from ..config import PROFILE_MAX_SECONDS
+
+router = APIRouter(dependencies=[Depends(profiling.require_debug_token)])
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def capture_profile(
+    seconds: float = Query(10, gt=0, le=PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=1000),
+):
+    """
+    Samples this process's event loop for `seconds` and returns collapsed
+    stacks, for flamegraph.pl or speedscope.
+    """
+    if profiling.profile_lock.locked():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already being captured.",
+        )
+
+    async with profiling.profile_lock:
+        collapsed = await profiling.profile(seconds, interval_ms / 1000)
+
+    filename = f"profile-{int(time.time())}.folded"
+    return PlainTextResponse(
+        collapsed,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/slow-requests")
+async def slow_requests():
+    """The most recent requests over SLOW_REQUEST_THRESHOLD_MS, newest last."""
+    return list(profiling.slow_requests)
@@ -1,10 +1,13 @@
 import logging
+from datetime import datetime
+from typing import Annotated, Any, AsyncIterator, Optional
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from fastapi_cache.decorator import cache
 
-from ..config import REQUEST_QUEUE_NAME
-from ..rabbitmq import rpc_call
+from .. import line_provider
+from ..admission import AdmissionRejected, service_unavailable
 from ..schemas import EventResponse
 
 router = APIRouter()
@@ -12,29 +15,45 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-@router.get("/", response_model=list[EventResponse])
-@cache(expire=30)
-async def request_available_events():
-    try:
-        response_data = await rpc_call(
-            routing_key="bet-request",
-            queue_name=REQUEST_QUEUE_NAME,
-            payload={"request": "get_available_events"},
-        )
-    except TimeoutError as e:
+def line_provider_error(e: Exception) -> HTTPException:
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, AdmissionRejected):
+        logger.warning(f"Shedding available events request. {e}")
+        return service_unavailable(e)
+    if isinstance(e, TimeoutError):
         logger.error(f"Timed out waiting for available events: {e}")
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
             detail="Line provider service did not respond in time.",
         )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error during request: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Unexpected error has occurred.",
+    if isinstance(e, ConnectionError):
+        logger.error(f"Line provider unavailable for available events: {e}")
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Line provider service is unavailable, retry later.",
         )
+    logger.error(f"Error during request: {e}", exc_info=True)
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail="Unexpected error has occurred.",
+    )
+
+
+@router.get("/", response_model=list[EventResponse])
+@cache(expire=30)
+async def request_available_events(
+    starts_after: Optional[datetime] = None,
+    starts_before: Optional[datetime] = None,
+    # Annotated, so the default stays None when readiness calls this directly.
+    limit: Annotated[Optional[int], Query(gt=0, le=1000)] = None,
+):
+    try:
+        response_data = await line_provider.get_available_events(
+            starts_after, starts_before, limit
+        )
+    except Exception as e:
+        raise line_provider_error(e)
 
     if "error" in response_data:
         logger.error(
@@ -45,5 +64,60 @@ async def request_available_events():
             detail="Error while getting available events has occurred.",
         )
 
-    logger.info(f"Received {len(response_data)} available events")
+    logger.info("Received %d available events", len(response_data))
     return response_data
+
+
+async def json_array(
+    first_chunk: list, chunks: AsyncIterator[Any]
+) -> AsyncIterator[bytes]:
+    """Writes streamed chunks of events out as one JSON array, chunk by chunk."""
+    yield b"["
+    separator = b""
+    chunk = first_chunk
+    while True:
+        if "error" in chunk:
+            # The status line is long gone; cutting the body short is the
+            # only way left to tell the client the list is incomplete.
+            raise RuntimeError(f"Event stream failed part-way: {chunk['error']}")
+        if chunk:
+            yield separator + b",".join(
+                EventResponse.model_validate(event).model_dump_json().encode()
+                for event in chunk
+            )
+            separator = b","
+        chunk = await anext(chunks, None)
+        if chunk is None:
+            break
+    yield b"]"
+
+
+@router.get("/stream", response_model=list[EventResponse])
+async def stream_available_events(
+    starts_after: Optional[datetime] = None,
+    starts_before: Optional[datetime] = None,
+    limit: Annotated[Optional[int], Query(gt=0, le=1000)] = None,
+):
+    """
+    The list of GET /events/, uncached and streamed through from
+    line-provider chunk by chunk, so memory use doesn't grow with the
+    number of open events.
+    """
+    chunks = line_provider.stream_available_events(starts_after, starts_before, limit)
+    try:
+        first_chunk = await anext(chunks, [])
+    except Exception as e:
+        raise line_provider_error(e)
+
+    if "error" in first_chunk:
+        logger.error(
+            f"Error response while streaming available events: {first_chunk['error']}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error while getting available events has occurred.",
+        )
+
+    return StreamingResponse(
+        json_array(first_chunk, chunks), media_type="application/json"
+    )
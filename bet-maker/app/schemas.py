@@ -3,7 +3,7 @@ from decimal import Decimal
 from enum import Enum
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class BetStatus(str, Enum):
@@ -48,3 +48,93 @@ class EventResponse(BaseModel):
     timestamp: datetime
     deadline: datetime
     status: EventStatus
+
+
+class BetStatusStats(BaseModel):
+    bets_count: int
+    total_amount: Decimal
+    total_possible_winning: Decimal
+
+
+class BetStats(BetStatusStats):
+    by_status: dict[BetStatus, BetStatusStats]
+
+
+class EventBetStats(BetStats):
+    event_id: int
+
+
+class BetStatsResponse(BaseModel):
+    total: BetStats
+    events: list[EventBetStats]
+
+
+class BetStatsReconcileResponse(BaseModel):
+    reconciled_events: int
+
+
+class DeadLettersResponse(BaseModel):
+    count: int
+
+
+class DeadLetterReplayResponse(BaseModel):
+    replayed: int
+
+
+class AccumulatorLegCreate(BaseModel):
+    event_id: int
+    bet_prediction: BetPrediction
+
+
+class AccumulatorCreate(BaseModel):
+    legs: list[AccumulatorLegCreate] = Field(..., min_length=2, max_length=10)
+    amount: Decimal = Field(..., gt=0, decimal_places=2)
+
+    @field_validator("legs")
+    @classmethod
+    def legs_on_distinct_events(
+        cls, legs: list[AccumulatorLegCreate]
+    ) -> list[AccumulatorLegCreate]:
+        if len({leg.event_id for leg in legs}) != len(legs):
+            raise ValueError("Each leg must be on a different event")
+        return legs
+
+
+class AccumulatorLegResponse(BaseModel):
+    event_id: int
+    bet_prediction: BetPrediction
+    coefficient: Decimal
+    status: BetStatus
+
+
+class AccumulatorResponse(BaseModel):
+    id: int
+    coefficient: Decimal
+    amount: Decimal
+    possible_winning: Decimal
+    remaining_legs: int
+    status: BetStatus
+    legs: list[AccumulatorLegResponse]
+
+
+class CashoutQuoteResponse(BaseModel):
+    bet_id: int
+    event_id: int
+    amount: Decimal
+    coefficient: Decimal
+    current_coefficient: Decimal
+    cashout_value: Decimal
+    priced_at: datetime
+
+
+class ExposureLimits(BaseModel):
+    max_stake: Optional[Decimal] = Field(None, ge=0, decimal_places=2)
+    max_liability: Optional[Decimal] = Field(None, ge=0, decimal_places=2)
+
+
+class ExposureResponse(BaseModel):
+    event_id: int
+    stake: Decimal
+    liability: dict[BetPrediction, Decimal]
+    max_stake: Decimal
+    max_liability: Decimal
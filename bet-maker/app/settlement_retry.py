@@ -0,0 +1,131 @@
+"""
+Retry topology for settlement messages. A message whose processing fails is
+acked on the hot queue and republished to a delay queue for its attempt
+number; each delay queue has a fixed TTL (SETTLEMENT_RETRY_BASE_DELAY
+doubled per attempt) and dead-letters expired messages back onto the event
+updates queue. After SETTLEMENT_MAX_ATTEMPTS failures a message is parked on
+the dead-letter queue until it is replayed through the admin API.
+"""
+
+import logging
+
+from aio_pika import DeliveryMode, IncomingMessage, Message
+from aio_pika.abc import AbstractChannel, AbstractQueue
+
+from .config import (
+    EVENT_UPDATE_QUEUE_NAME,
+    SETTLEMENT_MAX_ATTEMPTS,
+    SETTLEMENT_RETRY_BASE_DELAY,
+)
+from .rabbitmq import get_shared_connection
+
+logger = logging.getLogger(__name__)
+
+ATTEMPTS_HEADER = "x-settlement-attempts"
+ERROR_HEADER = "x-settlement-error"
+DEAD_LETTER_QUEUE_NAME = f"{EVENT_UPDATE_QUEUE_NAME}.dead"
+
+
+def retry_queue_name(attempt: int) -> str:
+    return f"{EVENT_UPDATE_QUEUE_NAME}.retry.{attempt}"
+
+
+def retry_delay_ms(attempt: int) -> int:
+    return int(SETTLEMENT_RETRY_BASE_DELAY * 1000 * 2 ** (attempt - 1))
+
+
+async def declare_settlement_queues(channel: AbstractChannel) -> AbstractQueue:
+    """Declares the event updates queue with its delay and dead-letter queues."""
+    for attempt in range(1, SETTLEMENT_MAX_ATTEMPTS + 1):
+        # One queue per delay: RabbitMQ only expires messages at the head of
+        # a queue, so mixed per-message TTLs would hold short retries back.
+        await channel.declare_queue(
+            retry_queue_name(attempt),
+            durable=True,
+            arguments={
+                "x-message-ttl": retry_delay_ms(attempt),
+                "x-dead-letter-exchange": "",
+                "x-dead-letter-routing-key": EVENT_UPDATE_QUEUE_NAME,
+            },
+        )
+    await channel.declare_queue(DEAD_LETTER_QUEUE_NAME, durable=True)
+    return await channel.declare_queue(EVENT_UPDATE_QUEUE_NAME, durable=True)
+
+
+async def schedule_retry(
+    channel: AbstractChannel,
+    message: IncomingMessage,
+    error: Exception,
+    retryable: bool = True,
+) -> None:
+    """
+    Republishes a failed message to its next delay queue, or to the
+    dead-letter queue once it is out of attempts (or the failure can't be
+    fixed by retrying). The caller acks the original afterwards.
+    """
+    headers = dict(message.headers or {})
+    attempt = int(headers.get(ATTEMPTS_HEADER, 0)) + 1
+    headers[ATTEMPTS_HEADER] = attempt
+    headers[ERROR_HEADER] = str(error)[:1000]
+
+    if retryable and attempt <= SETTLEMENT_MAX_ATTEMPTS:
+        routing_key = retry_queue_name(attempt)
+        logger.warning(
+            f"Settlement attempt {attempt} failed, retrying in "
+            f"{retry_delay_ms(attempt)}ms: {error}"
+        )
+    else:
+        routing_key = DEAD_LETTER_QUEUE_NAME
+        logger.error(
+            f"Settlement failed after {attempt} attempts, dead-lettered: {error}"
+        )
+
+    await channel.default_exchange.publish(
+        Message(
+            body=message.body,
+            headers=headers,
+            correlation_id=message.correlation_id,
+            delivery_mode=DeliveryMode.PERSISTENT,
+        ),
+        routing_key=routing_key,
+    )
+
+
+async def count_dead_letters() -> int:
+    connection = await get_shared_connection()
+    async with connection.channel() as channel:
+        queue = await channel.declare_queue(DEAD_LETTER_QUEUE_NAME, durable=True)
+        return queue.declaration_result.message_count
+
+
+async def replay_dead_letters(limit: int) -> int:
+    """
+    Moves up to `limit` dead letters back onto the event updates queue with
+    a fresh attempt budget; returns how many were moved.
+    """
+    connection = await get_shared_connection()
+    replayed = 0
+    async with connection.channel() as channel:
+        queue = await channel.declare_queue(DEAD_LETTER_QUEUE_NAME, durable=True)
+        while replayed < limit:
+            message = await queue.get(fail=False)
+            if message is None:
+                break
+
+            headers = dict(message.headers or {})
+            headers.pop(ATTEMPTS_HEADER, None)
+            headers.pop(ERROR_HEADER, None)
+            await channel.default_exchange.publish(
+                Message(
+                    body=message.body,
+                    headers=headers,
+                    correlation_id=message.correlation_id,
+                    delivery_mode=DeliveryMode.PERSISTENT,
+                ),
+                routing_key=EVENT_UPDATE_QUEUE_NAME,
+            )
+            await message.ack()
+            replayed += 1
+
+    logger.info(f"Replayed {replayed} dead-lettered settlement messages")
+    return replayed
@@ -0,0 +1,179 @@
+"""
+Hash sharding of the event-keyed tables, bets and bet_stats, across the
+primary database (shard 0) and the DB_SHARD_HOSTS databases. All of an
+event's bets live on shard_for_event(event_id), so placing, settling and
+pricing bets only ever touch one database. Accumulators span events and
+stay on shard 0. Without DB_SHARD_HOSTS there is a single shard and none of
+this changes anything.
+
+Data-access functions take the caller's session, which is on shard 0, and
+open sessions on the other shards themselves through session_for(). Bet ids
+come from shard 0's bets sequence (bet_ingestion.IdAllocator) so they stay
+unique across shards; reads over every shard merge the shards' results by
+key.
+"""
+
+import asyncio
+import heapq
+import itertools
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator, Iterable
+
+from sqlalchemy import Select
+from sqlalchemy.engine import Row, RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from .config import DB_SHARD_HOSTS
+from .database import DATABASE_URL, async_session_maker, create_engine, database_url
+
+
+def shard_urls() -> list[str]:
+    """Every shard's database URL, shard 0 first; migrations run on each."""
+    return [DATABASE_URL, *(database_url(host) for host in DB_SHARD_HOSTS)]
+
+
+def shard_session_maker(host: str) -> sessionmaker:
+    engine = create_engine(database_url(host))
+    return sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+
+shard_session_makers: list[sessionmaker] = [
+    async_session_maker,
+    *(shard_session_maker(host) for host in DB_SHARD_HOSTS),
+]
+
+
+def is_sharded() -> bool:
+    return len(shard_session_makers) > 1
+
+
+def shard_for_event(event_id: int, shard_count: int | None = None) -> int:
+    """
+    The shard owning an event's bets, by jump consistent hashing of its id
+    (Lamping & Veach): adding an Nth shard moves only about 1/N of the
+    events, all of them onto the new shard.
+    """
+    if shard_count is None:
+        shard_count = len(shard_session_makers)
+    key = event_id & 0xFFFFFFFFFFFFFFFF
+    shard, candidate = -1, 0
+    while candidate < shard_count:
+        shard = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((shard + 1) * (1 << 31) / ((key >> 33) + 1))
+    return shard
+
+
+def group_by_shard(event_ids: Iterable[int]) -> dict[int, list[int]]:
+    shards: dict[int, list[int]] = {}
+    for event_id in event_ids:
+        shards.setdefault(shard_for_event(event_id), []).append(event_id)
+    return shards
+
+
+@asynccontextmanager
+async def session_for(session: AsyncSession, shard: int) -> AsyncIterator[AsyncSession]:
+    """
+    A session on `shard`: the caller's own session for shard 0, which the
+    caller commits as usual, or a new one on another shard, committed when
+    the block exits without an error.
+    """
+    if shard == 0:
+        yield session
+        return
+
+    async with shard_session_makers[shard]() as shard_session:
+        yield shard_session
+        await shard_session.commit()
+
+
+def session_for_event(session: AsyncSession, event_id: int):
+    return session_for(session, shard_for_event(event_id))
+
+
+async def query_shards(session: AsyncSession, query: Select) -> list[list[RowMapping]]:
+    """Runs `query` on every shard at once; returns each shard's rows."""
+
+    async def run(shard: int) -> list[RowMapping]:
+        async with session_for(session, shard) as shard_session:
+            return (await shard_session.execute(query)).mappings().fetchall()
+
+    return await asyncio.gather(
+        *(run(shard) for shard in range(len(shard_session_makers)))
+    )
+
+
+async def merged_page(
+    session: AsyncSession, query: Select, key: str, offset: int, limit: int
+) -> list[RowMapping]:
+    """
+    Rows offset..offset+limit of `query` over all shards in `key` order. Each
+    shard returns its first offset+limit rows and the shards' rows are
+    merged k-way, so a page costs one query per shard.
+    """
+    query = query.order_by(query.selected_columns[key])
+    if not is_sharded():
+        result = await session.execute(query.offset(offset).limit(limit))
+        return result.mappings().fetchall()
+
+    pages = await query_shards(session, query.limit(offset + limit))
+    merged = heapq.merge(*pages, key=lambda row: row[key])
+    return list(itertools.islice(merged, offset, offset + limit))
+
+
+async def stream_shards(
+    session: AsyncSession, query: Select, key: str, batch_size: int
+) -> AsyncIterator[list[Row]]:
+    """
+    All rows of `query` over every shard in `key` order, in batches of up to
+    `batch_size`. Each shard is read through a server-side cursor and the
+    shards' streams are merged k-way, so memory use stays at about one
+    batch per shard however many rows there are.
+    """
+    query = query.order_by(query.selected_columns[key]).execution_options(
+        yield_per=batch_size
+    )
+    if not is_sharded():
+        result = await session.stream(query)
+        async for partition in result.partitions():
+            yield partition
+        return
+
+    async with AsyncExitStack() as stack:
+        partitions = []
+        for shard in range(len(shard_session_makers)):
+            shard_session = await stack.enter_async_context(session_for(session, shard))
+            partitions.append((await shard_session.stream(query)).partitions())
+
+        # Each shard's current partition and position in it, and a heap of
+        # the shards by the key of their next row.
+        current: list[list[Row]] = [[] for _ in partitions]
+        positions = [0] * len(partitions)
+        heap = []
+        for shard, shard_partitions in enumerate(partitions):
+            current[shard] = await anext(shard_partitions, [])
+            if current[shard]:
+                heap.append((getattr(current[shard][0], key), shard))
+        heapq.heapify(heap)
+
+        batch = []
+        while heap:
+            _, shard = heap[0]
+            batch.append(current[shard][positions[shard]])
+            positions[shard] += 1
+            if positions[shard] == len(current[shard]):
+                current[shard] = await anext(partitions[shard], [])
+                positions[shard] = 0
+            if current[shard]:
+                heapq.heapreplace(
+                    heap, (getattr(current[shard][positions[shard]], key), shard)
+                )
+            else:
+                heapq.heappop(heap)
+
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
@@ -0,0 +1,94 @@
+"""
+Compares the RabbitMQ RPC and HTTP transports to line-provider on event
+detail lookups (the bet placement path). Run it inside the bet-maker
+container against a running stack, after creating an open event:
+
+    docker compose exec bet_maker python -m benchmarks.line_provider_transports \
+        --event-id 1 --requests 5000 --concurrency 50
+
+The admission limiter is bypassed so each transport is measured on its own.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.line_provider import HTTPTransport, RabbitMQTransport, create_http_client
+
+WARM_UP_REQUESTS = 20
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run(
+    transport: RabbitMQTransport | HTTPTransport,
+    event_id: int,
+    requests: int,
+    concurrency: int,
+) -> None:
+    for _ in range(WARM_UP_REQUESTS):
+        await transport.get_available_event_detail(event_id)
+
+    latencies = []
+    errors = 0
+    slots = asyncio.Semaphore(concurrency)
+
+    async def lookup() -> None:
+        nonlocal errors
+        async with slots:
+            started_at = time.perf_counter()
+            try:
+                response = await transport.get_available_event_detail(event_id)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started_at)
+            if "error" in response:
+                errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(lookup() for _ in range(requests)))
+    elapsed = time.perf_counter() - started_at
+
+    latencies.sort()
+    print(
+        f"{type(transport).__name__:>18}: {requests / elapsed:8.0f} req/s, "
+        f"errors {errors}, "
+        f"mean {statistics.fmean(latencies) * 1000:.2f} ms, "
+        f"p50 {percentile(latencies, 0.50) * 1000:.2f} ms, "
+        f"p95 {percentile(latencies, 0.95) * 1000:.2f} ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark line-provider transports.")
+    parser.add_argument("--event-id", type=int, required=True)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument(
+        "--transports",
+        nargs="+",
+        choices=["rabbitmq", "http"],
+        default=["rabbitmq", "http"],
+    )
+    args = parser.parse_args()
+
+    for name in args.transports:
+        transport = (
+            HTTPTransport(create_http_client())
+            if name == "http"
+            else RabbitMQTransport()
+        )
+        try:
+            await run(transport, args.event_id, args.requests, args.concurrency)
+        finally:
+            await transport.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,6 +3,7 @@ from logging.config import fileConfig
 from alembic import context
 from sqlalchemy import engine_from_config, pool
 
+from app import sharding
 from app.config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER
 from app.models import metadata
 
@@ -65,17 +66,24 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
-
-    with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
-
-        with context.begin_transaction():
-            context.run_migrations()
+    # Every shard holds the same tables, so each is migrated in turn: the
+    # primary (shard 0) first, then the DB_SHARD_HOSTS databases.
+    for url in sharding.shard_urls():
+        connectable = engine_from_config(
+            {
+                **config.get_section(config.config_ini_section, {}),
+                "sqlalchemy.url": f"{url}?async_fallback=True",
+            },
+            prefix="sqlalchemy.",
+            poolclass=pool.NullPool,
+        )
+
+        with connectable.connect() as connection:
+            context.configure(connection=connection, target_metadata=target_metadata)
+
+            with context.begin_transaction():
+                context.run_migrations()
+        connectable.dispose()
 
 
 if context.is_offline_mode():
@@ -0,0 +1,83 @@
+"""Accumulators
+
+Revision ID: 5d2a8e3f6b71
+Revises: c4e1f7a9b2d3
+Create Date: 2026-10-19 14:03:18.274410
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2a8e3f6b71"
+down_revision: Union[str, None] = "c4e1f7a9b2d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def bet_status() -> postgresql.ENUM:
+    return postgresql.ENUM(
+        "NOT_PLAYED", "WON", "LOST", name="betstatus", create_type=False
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "accumulators",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("coefficient", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column("amount", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column(
+            "possible_winning", sa.Numeric(precision=20, scale=2), nullable=False
+        ),
+        sa.Column("remaining_legs", sa.Integer(), nullable=False),
+        sa.Column("status", bet_status(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "accumulator_legs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("accumulator_id", sa.Integer(), nullable=False),
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "bet_prediction",
+            postgresql.ENUM(
+                "FIRST_TEAM_WIN",
+                "SECOND_TEAM_WIN",
+                name="betprediction",
+                create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column("coefficient", sa.Numeric(precision=3, scale=2), nullable=False),
+        sa.Column("status", bet_status(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["accumulator_id"], ["accumulators.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_accumulator_legs_accumulator_id"),
+        "accumulator_legs",
+        ["accumulator_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_accumulator_legs_event_id"),
+        "accumulator_legs",
+        ["event_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_accumulator_legs_event_id"), table_name="accumulator_legs")
+    op.drop_index(
+        op.f("ix_accumulator_legs_accumulator_id"), table_name="accumulator_legs"
+    )
+    op.drop_table("accumulator_legs")
+    op.drop_table("accumulators")
@@ -0,0 +1,59 @@
+"""Bet stats
+
+Revision ID: c4e1f7a9b2d3
+Revises: 88088d8facc7
+Create Date: 2026-10-19 10:12:41.508213
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e1f7a9b2d3"
+down_revision: Union[str, None] = "88088d8facc7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_bets_event_id"), "bets", ["event_id"], unique=False)
+    op.create_table(
+        "bet_stats",
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "NOT_PLAYED", "WON", "LOST", name="betstatus", create_type=False
+            ),
+            nullable=False,
+        ),
+        sa.Column("bets_count", sa.Integer(), nullable=False),
+        sa.Column("total_amount", sa.Numeric(precision=20, scale=2), nullable=False),
+        sa.Column(
+            "total_possible_winning",
+            sa.Numeric(precision=20, scale=2),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("event_id", "status"),
+    )
+    # Backfill from the bets placed so far; from here on the application
+    # keeps the table current.
+    op.execute(
+        """
+        INSERT INTO bet_stats
+            (event_id, status, bets_count, total_amount, total_possible_winning)
+        SELECT event_id, COALESCE(status, 'NOT_PLAYED'), count(*),
+               sum(amount), sum(possible_winning)
+        FROM bets
+        GROUP BY event_id, COALESCE(status, 'NOT_PLAYED')
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("bet_stats")
+    op.drop_index(op.f("ix_bets_event_id"), table_name="bets")
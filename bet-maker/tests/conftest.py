@@ -1,13 +1,19 @@
+from collections import defaultdict
 from typing import AsyncGenerator
 
+import pytest
 import pytest_asyncio
+from fakeredis import FakeAsyncRedis
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.inmemory import InMemoryBackend
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import NullPool
 
-from app.database import DATABASE_URL, get_async_session, metadata
+from app import line_provider
+from app.circuit_breaker import CircuitBreaker
+from app.config import LINE_PROVIDER_BREAKER_FAILURES, LINE_PROVIDER_BREAKER_RESET
+from app.database import DATABASE_URL, get_async_session, get_read_session, metadata
 from app.main import app
 
 
@@ -36,6 +42,30 @@ async def clear_cache(_cache_backend):
     await FastAPICache.clear()
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def redis(monkeypatch) -> AsyncGenerator[FakeAsyncRedis, None]:
+    # Redis-backed features (idempotency keys, ...) run against an in-memory
+    # fake instead of a real server.
+    fake_redis = FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr("app.redis_client.redis", fake_redis)
+    yield fake_redis
+    await fake_redis.flushall()
+
+
+@pytest.fixture(autouse=True)
+def line_provider_state(monkeypatch):
+    # The circuit breaker and latency history are per process; every test
+    # starts with a closed circuit and no latencies seen.
+    monkeypatch.setattr(
+        line_provider,
+        "breaker",
+        CircuitBreaker(LINE_PROVIDER_BREAKER_FAILURES, LINE_PROVIDER_BREAKER_RESET),
+    )
+    monkeypatch.setattr(
+        line_provider, "latencies", defaultdict(line_provider.latencies.default_factory)
+    )
+
+
 @pytest_asyncio.fixture
 async def session(engine) -> AsyncGenerator[AsyncSession, None]:
     async with engine.connect() as conn:
@@ -52,6 +82,7 @@ async def client(session) -> AsyncGenerator[AsyncClient, None]:
         yield session
 
     app.dependency_overrides[get_async_session] = override_get_async_session
+    app.dependency_overrides[get_read_session] = override_get_async_session
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
@@ -0,0 +1,142 @@
+from decimal import Decimal
+
+from app import crud
+from app.schemas import EventStatus
+
+ODDS = {
+    21: {"coef_1st_team_win": "1.50", "coef_2nd_team_win": "2.50"},
+    22: {"coef_1st_team_win": "2.10", "coef_2nd_team_win": "1.70"},
+    23: {"coef_1st_team_win": "1.30", "coef_2nd_team_win": "3.40"},
+}
+
+
+def mock_event_odds(monkeypatch):
+    async def event_detail(routing_key, queue_name, payload, timeout=10.0):
+        event_id = payload["event_id"]
+        if event_id not in ODDS:
+            return {"error": "Event not found or deadline has passed"}
+        return {"id": event_id, **ODDS[event_id]}
+
+    monkeypatch.setattr("app.line_provider.rpc_call", event_detail)
+
+
+async def place(client, legs, amount="10.00"):
+    return await client.post(
+        "/bets/accumulators",
+        json={
+            "legs": [
+                {"event_id": event_id, "bet_prediction": prediction}
+                for event_id, prediction in legs
+            ],
+            "amount": amount,
+        },
+    )
+
+
+async def get_accumulator(client, accumulator_id):
+    response = await client.get("/bets/accumulators", params={"limit": 100})
+    return next(acc for acc in response.json() if acc["id"] == accumulator_id)
+
+
+async def test_place_accumulator_multiplies_leg_coefficients(client, monkeypatch):
+    mock_event_odds(monkeypatch)
+
+    response = await place(client, [(21, "FIRST_TEAM_WIN"), (22, "FIRST_TEAM_WIN")])
+
+    assert response.status_code == 201
+    data = response.json()
+    assert Decimal(data["coefficient"]) == Decimal("3.15")
+    assert Decimal(data["possible_winning"]) == Decimal("31.50")
+    assert data["remaining_legs"] == 2
+    assert data["status"] == "NOT_PLAYED"
+    assert [Decimal(leg["coefficient"]) for leg in data["legs"]] == [
+        Decimal("1.50"),
+        Decimal("2.10"),
+    ]
+
+
+async def test_place_accumulator_rejects_repeated_event(client, monkeypatch):
+    mock_event_odds(monkeypatch)
+
+    response = await place(client, [(21, "FIRST_TEAM_WIN"), (21, "SECOND_TEAM_WIN")])
+
+    assert response.status_code == 422
+
+
+async def test_place_accumulator_unknown_leg_event(client, monkeypatch):
+    mock_event_odds(monkeypatch)
+
+    response = await place(client, [(21, "FIRST_TEAM_WIN"), (999, "FIRST_TEAM_WIN")])
+
+    assert response.status_code == 404
+
+
+async def test_accumulator_settles_leg_by_leg(client, session, monkeypatch):
+    mock_event_odds(monkeypatch)
+    winner = (
+        await place(
+            client,
+            [(21, "FIRST_TEAM_WIN"), (22, "SECOND_TEAM_WIN"), (23, "FIRST_TEAM_WIN")],
+        )
+    ).json()["id"]
+    loser = (
+        await place(client, [(21, "SECOND_TEAM_WIN"), (22, "SECOND_TEAM_WIN")])
+    ).json()["id"]
+
+    await crud.update_bets_status(session, 21, EventStatus.FIRST_TEAM_WON)
+
+    assert (await get_accumulator(client, winner))["remaining_legs"] == 2
+    lost = await get_accumulator(client, loser)
+    assert lost["status"] == "LOST"
+    assert lost["remaining_legs"] == 1
+
+    # A redelivered result recomputes the same counts.
+    await crud.update_bets_status(session, 21, EventStatus.FIRST_TEAM_WON)
+    assert (await get_accumulator(client, winner))["remaining_legs"] == 2
+
+    await crud.update_bets_status_bulk(
+        session,
+        {22: EventStatus.SECOND_TEAM_WON, 23: EventStatus.FIRST_TEAM_WON},
+    )
+
+    won = await get_accumulator(client, winner)
+    assert won["status"] == "WON"
+    assert won["remaining_legs"] == 0
+    assert [leg["status"] for leg in won["legs"]] == ["WON", "WON", "WON"]
+    assert (await get_accumulator(client, loser))["status"] == "LOST"
+
+
+async def test_corrected_result_resettles_accumulators(client, session, monkeypatch):
+    mock_event_odds(monkeypatch)
+    first_team = (
+        await place(client, [(21, "FIRST_TEAM_WIN"), (22, "FIRST_TEAM_WIN")])
+    ).json()["id"]
+    second_team = (
+        await place(client, [(21, "SECOND_TEAM_WIN"), (22, "FIRST_TEAM_WIN")])
+    ).json()["id"]
+    await crud.update_bets_status_bulk(
+        session, {21: EventStatus.FIRST_TEAM_WON, 22: EventStatus.FIRST_TEAM_WON}
+    )
+    assert (await get_accumulator(client, first_team))["status"] == "WON"
+    assert (await get_accumulator(client, second_team))["status"] == "LOST"
+
+    await crud.update_bets_status(session, 21, EventStatus.SECOND_TEAM_WON)
+
+    assert (await get_accumulator(client, first_team))["status"] == "LOST"
+    corrected = await get_accumulator(client, second_team)
+    assert corrected["status"] == "WON"
+    assert corrected["remaining_legs"] == 0
+
+
+async def test_not_finished_is_not_a_result(client, session, monkeypatch):
+    mock_event_odds(monkeypatch)
+    accumulator_id = (
+        await place(client, [(21, "FIRST_TEAM_WIN"), (22, "FIRST_TEAM_WIN")])
+    ).json()["id"]
+
+    await crud.update_bets_status(session, 21, EventStatus.NOT_FINISHED)
+
+    accumulator = await get_accumulator(client, accumulator_id)
+    assert accumulator["status"] == "NOT_PLAYED"
+    assert accumulator["remaining_legs"] == 2
+    assert [leg["status"] for leg in accumulator["legs"]] == ["NOT_PLAYED"] * 2
@@ -0,0 +1,108 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.admission import AdaptiveConcurrencyLimiter, AdmissionRejected
+
+
+def make_limiter(**overrides) -> AdaptiveConcurrencyLimiter:
+    settings = {
+        "initial_limit": 1,
+        "min_limit": 1,
+        "max_limit": 10,
+        "latency_target": 0.5,
+        "max_queue": 10,
+        "max_queue_wait": 0.05,
+    }
+    return AdaptiveConcurrencyLimiter(**(settings | overrides))
+
+
+async def test_limiter_queues_then_rejects_when_saturated():
+    limiter = make_limiter()
+    release = asyncio.Event()
+
+    async def hold_slot():
+        async with limiter.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold_slot())
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected):
+        async with limiter.slot():
+            pass
+
+    release.set()
+    await holder
+    assert limiter.in_flight == 0
+
+
+async def test_limiter_hands_slot_to_queued_caller():
+    limiter = make_limiter(max_queue_wait=1.0)
+    order = []
+
+    async def call(name):
+        async with limiter.slot():
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(call("first"), call("second"))
+
+    assert order == ["first", "second"]
+    assert limiter.in_flight == 0
+
+
+async def test_limiter_aimd_adjustments():
+    limiter = make_limiter(initial_limit=8, max_limit=20)
+
+    async with limiter.slot():
+        pass
+    assert limiter.limit == pytest.approx(8 + 1 / 8)
+
+    with pytest.raises(TimeoutError):
+        async with limiter.slot():
+            raise TimeoutError
+    assert limiter.limit == pytest.approx((8 + 1 / 8) / 2)
+
+
+async def test_place_bet_sheds_load_with_retry_after(client, monkeypatch):
+    rpc_mock = AsyncMock()
+    monkeypatch.setattr("app.line_provider.rpc_call", rpc_mock)
+    saturated = make_limiter(max_queue=0)
+    saturated.in_flight = 1
+    monkeypatch.setattr("app.line_provider.rpc_limiter", saturated)
+
+    response = await client.post(
+        "/bets/",
+        json={"event_id": 1, "bet_prediction": "FIRST_TEAM_WIN", "amount": "10.00"},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    rpc_mock.assert_not_awaited()
+
+
+async def test_place_bet_rate_limited_per_client(client, monkeypatch):
+    monkeypatch.setattr(
+        "app.line_provider.rpc_call",
+        AsyncMock(
+            return_value={
+                "id": 1,
+                "coef_1st_team_win": "1.50",
+                "coef_2nd_team_win": "2.10",
+            }
+        ),
+    )
+    monkeypatch.setattr("app.rate_limit.RATE_LIMIT_PER_SECOND", 1)
+    monkeypatch.setattr("app.rate_limit.RATE_LIMIT_BURST", 1)
+    bet = {"event_id": 1, "bet_prediction": "FIRST_TEAM_WIN", "amount": "10.00"}
+
+    first = await client.post("/bets/", json=bet, headers={"X-Client-Id": "a"})
+    second = await client.post("/bets/", json=bet, headers={"X-Client-Id": "a"})
+    other_client = await client.post("/bets/", json=bet, headers={"X-Client-Id": "b"})
+
+    assert first.status_code == 201
+    assert second.status_code == 429
+    assert second.headers["Retry-After"] == "1"
+    assert other_client.status_code == 201
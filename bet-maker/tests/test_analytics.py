@@ -0,0 +1,83 @@
+import io
+from decimal import Decimal
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import insert
+
+from app.analytics import BET_SCHEMA
+from app.models import bets
+
+ADMIN_HEADERS = {"X-Debug-Token": "secret"}
+
+
+@pytest.fixture(autouse=True)
+def debug_token(monkeypatch):
+    monkeypatch.setattr("app.profiling.DEBUG_TOKEN", "secret")
+
+
+@pytest.fixture(autouse=True)
+def replica_session(session, monkeypatch):
+    async def override_get_replica_session():
+        yield session
+
+    monkeypatch.setattr(
+        "app.routers.admin.get_replica_session", override_get_replica_session
+    )
+
+
+async def insert_bets(session):
+    await session.execute(
+        insert(bets),
+        [
+            {
+                "event_id": event_id,
+                "bet_prediction": prediction,
+                "coefficient": Decimal("1.50"),
+                "amount": Decimal("10.00"),
+                "possible_winning": Decimal("15.00"),
+                "status": bet_status,
+            }
+            for event_id, prediction, bet_status in [
+                (1, "FIRST_TEAM_WIN", "WON"),
+                (1, "SECOND_TEAM_WIN", "LOST"),
+                (2, "FIRST_TEAM_WIN", "NOT_PLAYED"),
+            ]
+        ],
+    )
+
+
+async def test_export_bets_as_arrow_stream(client, session, monkeypatch):
+    monkeypatch.setattr("app.analytics.EXPORT_BATCH_SIZE", 2)
+    await insert_bets(session)
+
+    response = await client.get(
+        "/admin/bets/export", params={"format": "arrow"}, headers=ADMIN_HEADERS
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    reader = pa.ipc.open_stream(response.content)
+    assert reader.schema == BET_SCHEMA
+    table = reader.read_all()
+    assert table.num_rows == 3
+    assert table.column("event_id").to_pylist() == [1, 1, 2]
+    assert table.column("status").to_pylist() == ["WON", "LOST", "NOT_PLAYED"]
+    assert table.column("possible_winning").to_pylist() == [Decimal("15.00")] * 3
+
+
+async def test_export_bets_as_parquet_filtered(client, session):
+    await insert_bets(session)
+
+    response = await client.get(
+        "/admin/bets/export",
+        params={"event_id": 1, "status": "LOST"},
+        headers=ADMIN_HEADERS,
+    )
+
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.schema.field("amount").type == pa.decimal128(10, 2)
+    assert pa.types.is_dictionary(table.schema.field("bet_prediction").type)
+    assert table.column("bet_prediction").to_pylist() == ["SECOND_TEAM_WIN"]
@@ -0,0 +1,80 @@
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app import bet_ingestion, bet_writer, crud
+
+
+@pytest.fixture
+def stream_mode(monkeypatch, session):
+    async def override_get_async_session():
+        yield session
+
+    monkeypatch.setattr("app.crud.BET_INGESTION_MODE", "stream")
+    monkeypatch.setattr("app.bet_writer.get_async_session", override_get_async_session)
+    monkeypatch.setattr(
+        "app.line_provider.rpc_call",
+        AsyncMock(
+            return_value={
+                "id": 51,
+                "coef_1st_team_win": "1.50",
+                "coef_2nd_team_win": "2.25",
+            }
+        ),
+    )
+
+
+async def place_bet(client, prediction, amount):
+    return await client.post(
+        "/bets/",
+        json={"event_id": 51, "bet_prediction": prediction, "amount": amount},
+    )
+
+
+async def test_queued_bets_are_written_in_a_batch(client, stream_mode):
+    first = await place_bet(client, "FIRST_TEAM_WIN", "10.00")
+    second = await place_bet(client, "SECOND_TEAM_WIN", "3.33")
+
+    assert first.status_code == 201
+    assert Decimal(second.json()["possible_winning"]) == Decimal("7.49")
+    assert (await client.get("/bets/")).json() == []
+
+    await bet_writer.drain()
+
+    stored = (await client.get("/bets/")).json()
+    assert stored == [first.json(), second.json()]
+    stats = (await client.get("/bets/stats", params={"event_id": 51})).json()
+    assert stats["total"]["bets_count"] == 2
+
+
+async def test_pending_batch_is_written_once(client, session, stream_mode):
+    await place_bet(client, "FIRST_TEAM_WIN", "10.00")
+    await bet_ingestion.ensure_writer_group()
+    # Delivered to this writer but never acknowledged, as after a crash.
+    entries = await bet_ingestion.read_queued_bets(pending=False, block_ms=None)
+    rows = [row for _, row in entries]
+    assert await crud.copy_bets(session, rows) == 1
+
+    assert await bet_writer.flush_once(pending=True) == 1
+
+    assert len((await client.get("/bets/")).json()) == 1
+    assert await bet_ingestion.read_queued_bets(pending=True) == []
+
+
+async def test_drain_takes_over_entries_held_by_another_writer(
+    client, redis, stream_mode
+):
+    await place_bet(client, "FIRST_TEAM_WIN", "10.00")
+    await bet_ingestion.ensure_writer_group()
+    # Delivered to another writer replica, which hasn't written it yet.
+    await redis.xreadgroup(
+        bet_ingestion.WRITER_GROUP,
+        "other-writer",
+        {bet_ingestion.BET_STREAM_NAME: ">"},
+    )
+
+    await bet_writer.drain()
+
+    assert len((await client.get("/bets/")).json()) == 1
+    assert await bet_ingestion.count_pending_entries() == 0
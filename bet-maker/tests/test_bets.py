@@ -1,9 +1,17 @@
+import asyncio
 from decimal import Decimal
 from unittest.mock import AsyncMock
 
+import pytest
+
+from app import crud
+from app.idempotency import run_idempotent
+from app.models import bet_stats
+from app.schemas import EventStatus
+
 
 def mock_event_detail(monkeypatch, payload):
-    monkeypatch.setattr("app.crud.rpc_call", AsyncMock(return_value=payload))
+    monkeypatch.setattr("app.line_provider.rpc_call", AsyncMock(return_value=payload))
 
 
 async def test_place_bet_success(client, monkeypatch):
@@ -57,7 +65,7 @@ async def test_place_bet_upstream_timeout(client, monkeypatch):
     async def _raise(*args, **kwargs):
         raise TimeoutError("no response")
 
-    monkeypatch.setattr("app.crud.rpc_call", _raise)
+    monkeypatch.setattr("app.line_provider.rpc_call", _raise)
 
     response = await client.post(
         "/bets/",
@@ -67,6 +75,20 @@ async def test_place_bet_upstream_timeout(client, monkeypatch):
     assert response.status_code == 504
 
 
+async def test_place_bet_line_provider_unreachable(client, monkeypatch):
+    async def _raise(*args, **kwargs):
+        raise ConnectionError("broker unreachable")
+
+    monkeypatch.setattr("app.line_provider.rpc_call", _raise)
+
+    response = await client.post(
+        "/bets/",
+        json={"event_id": 1, "bet_prediction": "FIRST_TEAM_WIN", "amount": "10.00"},
+    )
+
+    assert response.status_code == 503
+
+
 async def test_list_bets(client, monkeypatch):
     mock_event_detail(
         monkeypatch,
@@ -83,3 +105,192 @@ async def test_list_bets(client, monkeypatch):
     bets = response.json()
     assert len(bets) == 1
     assert bets[0]["event_id"] == 3
+
+
+async def test_update_bets_status_bulk_settles_every_event(
+    client, session, monkeypatch
+):
+    mock_event_detail(
+        monkeypatch,
+        {"id": 4, "coef_1st_team_win": "1.10", "coef_2nd_team_win": "1.90"},
+    )
+    for event_id in (4, 5, 6):
+        for prediction in ("FIRST_TEAM_WIN", "SECOND_TEAM_WIN"):
+            await client.post(
+                "/bets/",
+                json={
+                    "event_id": event_id,
+                    "bet_prediction": prediction,
+                    "amount": "5.00",
+                },
+            )
+
+    await crud.update_bets_status_bulk(
+        session, {4: EventStatus.FIRST_TEAM_WON, 5: EventStatus.SECOND_TEAM_WON}
+    )
+
+    response = await client.get("/bets/", params={"limit": 10})
+    statuses = {
+        (bet["event_id"], bet["bet_prediction"]): bet["status"]
+        for bet in response.json()
+    }
+    assert statuses == {
+        (4, "FIRST_TEAM_WIN"): "WON",
+        (4, "SECOND_TEAM_WIN"): "LOST",
+        (5, "FIRST_TEAM_WIN"): "LOST",
+        (5, "SECOND_TEAM_WIN"): "WON",
+        (6, "FIRST_TEAM_WIN"): "NOT_PLAYED",
+        (6, "SECOND_TEAM_WIN"): "NOT_PLAYED",
+    }
+
+
+async def test_place_bet_idempotent_retry_replays_response(client, monkeypatch):
+    rpc_mock = AsyncMock(
+        return_value={"id": 7, "coef_1st_team_win": "1.50", "coef_2nd_team_win": "2.10"}
+    )
+    monkeypatch.setattr("app.line_provider.rpc_call", rpc_mock)
+    request = {
+        "json": {"event_id": 7, "bet_prediction": "FIRST_TEAM_WIN", "amount": "10.00"},
+        "headers": {"Idempotency-Key": "retry-1"},
+    }
+
+    first = await client.post("/bets/", **request)
+    retry = await client.post("/bets/", **request)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    rpc_mock.assert_awaited_once()
+
+
+async def test_place_bet_concurrent_duplicates_wait_for_first(client, monkeypatch):
+    calls = 0
+
+    async def slow_event_detail(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.1)
+        return {"id": 8, "coef_1st_team_win": "1.50", "coef_2nd_team_win": "2.10"}
+
+    monkeypatch.setattr("app.line_provider.rpc_call", slow_event_detail)
+    request = {
+        "json": {"event_id": 8, "bet_prediction": "FIRST_TEAM_WIN", "amount": "10.00"},
+        "headers": {"Idempotency-Key": "concurrent-1"},
+    }
+
+    responses = await asyncio.gather(
+        client.post("/bets/", **request), client.post("/bets/", **request)
+    )
+
+    assert [response.status_code for response in responses] == [201, 201]
+    assert responses[0].json() == responses[1].json()
+    assert calls == 1
+
+
+async def test_place_bet_idempotency_key_reused_with_other_body(client, monkeypatch):
+    mock_event_detail(
+        monkeypatch,
+        {"id": 9, "coef_1st_team_win": "1.50", "coef_2nd_team_win": "2.10"},
+    )
+    headers = {"Idempotency-Key": "reused-1"}
+
+    await client.post(
+        "/bets/",
+        json={"event_id": 9, "bet_prediction": "FIRST_TEAM_WIN", "amount": "10.00"},
+        headers=headers,
+    )
+    response = await client.post(
+        "/bets/",
+        json={"event_id": 9, "bet_prediction": "FIRST_TEAM_WIN", "amount": "99.00"},
+        headers=headers,
+    )
+
+    assert response.status_code == 422
+
+
+async def test_bet_stats_follow_placement_and_settlement(client, session, monkeypatch):
+    mock_event_detail(
+        monkeypatch,
+        {"id": 10, "coef_1st_team_win": "1.50", "coef_2nd_team_win": "2.00"},
+    )
+    for event_id, prediction, amount in (
+        (10, "FIRST_TEAM_WIN", "10.00"),
+        (10, "SECOND_TEAM_WIN", "20.00"),
+        (11, "FIRST_TEAM_WIN", "5.00"),
+    ):
+        await client.post(
+            "/bets/",
+            json={"event_id": event_id, "bet_prediction": prediction, "amount": amount},
+        )
+
+    await crud.update_bets_status(session, 10, EventStatus.FIRST_TEAM_WON)
+
+    response = await client.get("/bets/stats")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"]["bets_count"] == 3
+    assert Decimal(data["total"]["total_amount"]) == Decimal("35.00")
+    assert data["total"]["by_status"]["NOT_PLAYED"]["bets_count"] == 1
+
+    event_10 = next(event for event in data["events"] if event["event_id"] == 10)
+    assert set(event_10["by_status"]) == {"WON", "LOST"}
+    assert Decimal(event_10["by_status"]["WON"]["total_possible_winning"]) == Decimal(
+        "15.00"
+    )
+    assert Decimal(event_10["by_status"]["LOST"]["total_amount"]) == Decimal("20.00")
+
+    response = await client.get("/bets/stats", params={"event_id": 11})
+    data = response.json()
+    assert [event["event_id"] for event in data["events"]] == [11]
+    assert data["total"]["bets_count"] == 1
+
+
+async def test_reconcile_bet_stats_repairs_drift(client, session, monkeypatch):
+    mock_event_detail(
+        monkeypatch,
+        {"id": 12, "coef_1st_team_win": "1.50", "coef_2nd_team_win": "2.00"},
+    )
+    await client.post(
+        "/bets/",
+        json={"event_id": 12, "bet_prediction": "FIRST_TEAM_WIN", "amount": "10.00"},
+    )
+    await session.execute(
+        bet_stats.update()
+        .where(bet_stats.c.event_id == 12)
+        .values(bets_count=99, total_amount=0)
+    )
+
+    response = await client.post("/bets/stats/reconcile", params={"event_id": 12})
+
+    assert response.status_code == 200
+    assert response.json() == {"reconciled_events": 1}
+    stats = (await client.get("/bets/stats", params={"event_id": 12})).json()
+    assert stats["total"]["bets_count"] == 1
+    assert Decimal(stats["total"]["total_amount"]) == Decimal("10.00")
+
+
+async def test_expired_idempotency_claim_is_left_to_its_new_owner(redis):
+    redis_key = "idempotency:bets:expired-1"
+    other_claim = '{"fingerprint": "fp", "token": "other"}'
+
+    async def outlive_claim():
+        # Our claim expires mid-request and another request claims the key.
+        await redis.set(redis_key, other_claim)
+
+    async def fail():
+        await outlive_claim()
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await run_idempotent("expired-1", "fp", fail)
+    assert await redis.get(redis_key) == other_claim
+
+    await redis.delete(redis_key)
+
+    async def succeed():
+        await outlive_claim()
+        return {"id": 1}
+
+    assert await run_idempotent("expired-1", "fp", succeed) == ({"id": 1}, False)
+    assert await redis.get(redis_key) == other_claim
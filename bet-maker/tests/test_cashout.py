@@ -0,0 +1,106 @@
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import numpy as np
+
+from app import cashout, crud
+from app.schemas import EventStatus
+
+
+def mock_event_detail(monkeypatch, payload):
+    monkeypatch.setattr("app.line_provider.rpc_call", AsyncMock(return_value=payload))
+
+
+async def place_bet(client, event_id, prediction, amount):
+    response = await client.post(
+        "/bets/",
+        json={"event_id": event_id, "bet_prediction": prediction, "amount": amount},
+    )
+    return response.json()["id"]
+
+
+def test_price_cashouts_is_vectorized_and_capped():
+    values = cashout.price_cashouts(
+        amounts=np.array([10000, 10000, 1000, 1000]),
+        coefficients=np.array([200, 200, 150, 150]),
+        current_coefficients=np.array([250, 150, 100, 50]),
+        margin=0.05,
+    )
+
+    assert values.tolist() == [7600, 12666, 1425, 1500]
+
+
+def test_price_cashouts_rounds_down_at_a_cent_boundary():
+    # 63.31 * 2.87 / 1.01 * 0.9667 = 173.909999..., a hair under 173.91.
+    values = cashout.price_cashouts(
+        amounts=np.array([6331]),
+        coefficients=np.array([287]),
+        current_coefficients=np.array([101]),
+        margin=0.0333,
+    )
+
+    assert values.tolist() == [17390]
+
+
+async def test_odds_update_reprices_open_bets(client, session, monkeypatch):
+    mock_event_detail(
+        monkeypatch,
+        {"id": 31, "coef_1st_team_win": "2.00", "coef_2nd_team_win": "1.80"},
+    )
+    first = await place_bet(client, 31, "FIRST_TEAM_WIN", "100.00")
+    second = await place_bet(client, 31, "SECOND_TEAM_WIN", "50.00")
+
+    quotes = await cashout.reprice_event(session, 31, Decimal("2.50"), Decimal("1.50"))
+
+    assert set(quotes) == {first, second}
+    response = await client.get(f"/bets/{first}/cashout")
+    assert response.status_code == 200
+    data = response.json()
+    assert Decimal(data["current_coefficient"]) == Decimal("2.50")
+    assert Decimal(data["cashout_value"]) == Decimal("76.00")
+    second_quote = (await client.get(f"/bets/{second}/cashout")).json()
+    assert Decimal(second_quote["cashout_value"]) == Decimal("57.00")
+
+
+async def test_cashout_quote_priced_on_demand(client, monkeypatch):
+    mock_event_detail(
+        monkeypatch,
+        {"id": 32, "coef_1st_team_win": "1.50", "coef_2nd_team_win": "2.50"},
+    )
+    bet_id = await place_bet(client, 32, "FIRST_TEAM_WIN", "10.00")
+
+    response = await client.get(f"/bets/{bet_id}/cashout")
+
+    assert response.status_code == 200
+    # Unchanged odds: the stake back, minus the margin.
+    assert Decimal(response.json()["cashout_value"]) == Decimal("9.50")
+    assert await cashout.get_quote(32, bet_id) is not None
+
+
+async def test_cashout_unavailable_for_settled_or_unknown_bet(
+    client, session, monkeypatch
+):
+    mock_event_detail(
+        monkeypatch,
+        {"id": 33, "coef_1st_team_win": "1.50", "coef_2nd_team_win": "2.50"},
+    )
+    bet_id = await place_bet(client, 33, "FIRST_TEAM_WIN", "10.00")
+    await crud.update_bets_status(session, 33, EventStatus.FIRST_TEAM_WON)
+
+    assert (await client.get(f"/bets/{bet_id}/cashout")).status_code == 409
+    assert (await client.get("/bets/999999/cashout")).status_code == 404
+
+
+async def test_cashout_conflicts_when_bet_settles_during_pricing(client, monkeypatch):
+    mock_event_detail(
+        monkeypatch,
+        {"id": 34, "coef_1st_team_win": "1.50", "coef_2nd_team_win": "2.50"},
+    )
+    bet_id = await place_bet(client, 34, "FIRST_TEAM_WIN", "10.00")
+    # Settled between the status check and the on-demand pricing.
+    monkeypatch.setattr("app.cashout.reprice_event", AsyncMock(return_value={}))
+
+    response = await client.get(f"/bets/{bet_id}/cashout")
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Bet is no longer open for cash-out."
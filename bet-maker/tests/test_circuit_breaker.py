@@ -0,0 +1,135 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app import line_provider
+from app.admission import AdmissionRejected
+from app.circuit_breaker import CircuitBreaker, CircuitOpen
+from app.metrics import RecentLatencies
+
+
+async def fail(breaker: CircuitBreaker, error: Exception = TimeoutError()) -> None:
+    with pytest.raises(type(error)):
+        async with breaker.call():
+            raise error
+
+
+async def test_breaker_opens_after_consecutive_failures_and_fails_fast():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    await fail(breaker)
+    async with breaker.call():
+        pass
+    await fail(breaker)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    await fail(breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpen) as rejected:
+        async with breaker.call():
+            pytest.fail("an open circuit must not let calls through")
+    assert rejected.value.retry_after == 30
+
+
+async def test_breaker_ignores_calls_shed_by_admission():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+
+    await fail(breaker, AdmissionRejected(1))
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_half_open_breaker_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    await fail(breaker)
+    await asyncio.sleep(0.02)
+
+    probe_started = asyncio.Event()
+    finish_probe = asyncio.Event()
+
+    async def probe():
+        async with breaker.call():
+            probe_started.set()
+            await finish_probe.wait()
+
+    probe_task = asyncio.create_task(probe())
+    await probe_started.wait()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        async with breaker.call():
+            pass
+
+    finish_probe.set()
+    await probe_task
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_failed_probe_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.01)
+    for _ in range(3):
+        await fail(breaker)
+    await asyncio.sleep(0.02)
+
+    await fail(breaker)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_recent_latencies_follow_the_last_calls():
+    recent = RecentLatencies(size=100)
+    for _ in range(100):
+        recent.observe(0.01)
+    assert recent.quantile(0.99) == 0.01
+
+    for _ in range(100):
+        recent.observe(0.2)
+    assert recent.quantile(0.5) == 0.2
+
+
+async def test_call_timeout_adapts_to_recent_latency(monkeypatch):
+    monkeypatch.setattr("app.line_provider.LINE_PROVIDER_LATENCY_MIN_SAMPLES", 10)
+    rpc_call = AsyncMock(return_value={"id": 1})
+    monkeypatch.setattr("app.line_provider.rpc_call", rpc_call)
+
+    assert line_provider.call_timeout("get_available_event_detail") == 10
+    for _ in range(10):
+        line_provider.latencies["get_available_event_detail"].observe(0.4)
+
+    await line_provider.get_available_event_detail(1)
+
+    assert rpc_call.call_args.kwargs["timeout"] == pytest.approx(1.2)
+
+
+async def test_bet_placement_fails_fast_while_circuit_is_open(client, monkeypatch):
+    rpc_call = AsyncMock(side_effect=TimeoutError("no reply"))
+    monkeypatch.setattr("app.line_provider.rpc_call", rpc_call)
+    bet = {"event_id": 1, "bet_prediction": "FIRST_TEAM_WIN", "amount": "10.00"}
+
+    for _ in range(5):
+        response = await client.post("/bets/", json=bet)
+        assert response.status_code == 504
+
+    response = await client.post("/bets/", json=bet)
+    assert response.status_code == 503
+    assert response.json()["detail"] == CircuitOpen.detail
+    assert "Retry-After" in response.headers
+    assert rpc_call.await_count == 5
+
+
+async def test_slow_detail_lookup_is_hedged(monkeypatch):
+    monkeypatch.setattr("app.line_provider.LINE_PROVIDER_LATENCY_MIN_SAMPLES", 10)
+    monkeypatch.setattr("app.line_provider.LINE_PROVIDER_HEDGE_DETAIL", True)
+    for _ in range(10):
+        line_provider.latencies["get_available_event_detail"].observe(0.01)
+
+    replies = [asyncio.sleep(10, {"id": 1}), asyncio.sleep(0, {"id": 1})]
+
+    async def rpc_call(**kwargs):
+        return await replies.pop(0)
+
+    monkeypatch.setattr("app.line_provider.rpc_call", rpc_call)
+
+    async with asyncio.timeout(1):
+        assert await line_provider.get_available_event_detail(1) == {"id": 1}
+    assert replies == []
@@ -0,0 +1,150 @@
+import json
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.config import EVENT_UPDATE_QUEUE_NAME, SETTLEMENT_MAX_ATTEMPTS
+from app.consumers import process_event_update_message
+from app.settlement_retry import (
+    ATTEMPTS_HEADER,
+    DEAD_LETTER_QUEUE_NAME,
+    retry_queue_name,
+)
+
+UPDATE = {"event_id": 1, "new_status": "FIRST_TEAM_WON"}
+
+ADMIN_HEADERS = {"X-Debug-Token": "secret"}
+
+
+@pytest.fixture
+def debug_token(monkeypatch):
+    monkeypatch.setattr("app.profiling.DEBUG_TOKEN", "secret")
+
+
+class FakeExchange:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, message, routing_key):
+        self.published.append((routing_key, message))
+
+
+class FakeChannel:
+    def __init__(self, queue=None):
+        self.default_exchange = FakeExchange()
+        self.queue = queue
+
+    async def declare_queue(self, name, **kwargs):
+        return self.queue
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+
+class FakeMessage:
+    def __init__(self, body: bytes, headers: dict | None = None):
+        self.body = body
+        self.headers = headers or {}
+        self.correlation_id = None
+        self.acked = False
+
+    @asynccontextmanager
+    async def process(self, requeue=False):
+        yield
+        self.acked = True
+
+    async def ack(self):
+        self.acked = True
+
+
+def patch_settlement(monkeypatch, settle) -> None:
+    async def fake_session():
+        yield None
+
+    monkeypatch.setattr("app.consumers.get_async_session", fake_session)
+    monkeypatch.setattr("app.consumers.update_bets_status_bulk", settle)
+
+
+async def test_settlement_success_acks_without_retry(monkeypatch):
+    settle = AsyncMock()
+    patch_settlement(monkeypatch, settle)
+    channel = FakeChannel()
+    message = FakeMessage(json.dumps(UPDATE).encode())
+
+    await process_event_update_message(message, channel)
+
+    settle.assert_awaited_once_with(None, {1: "FIRST_TEAM_WON"})
+    assert message.acked
+    assert channel.default_exchange.published == []
+
+
+async def test_failed_settlement_goes_to_first_delay_queue(monkeypatch):
+    patch_settlement(monkeypatch, AsyncMock(side_effect=RuntimeError("db down")))
+    channel = FakeChannel()
+    message = FakeMessage(json.dumps(UPDATE).encode())
+
+    await process_event_update_message(message, channel)
+
+    assert message.acked
+    [(routing_key, retry)] = channel.default_exchange.published
+    assert routing_key == retry_queue_name(1)
+    assert retry.headers[ATTEMPTS_HEADER] == 1
+    assert retry.body == message.body
+
+
+async def test_settlement_out_of_attempts_is_dead_lettered(monkeypatch):
+    patch_settlement(monkeypatch, AsyncMock(side_effect=RuntimeError("db down")))
+    channel = FakeChannel()
+    message = FakeMessage(
+        json.dumps(UPDATE).encode(), {ATTEMPTS_HEADER: SETTLEMENT_MAX_ATTEMPTS}
+    )
+
+    await process_event_update_message(message, channel)
+
+    [(routing_key, _)] = channel.default_exchange.published
+    assert routing_key == DEAD_LETTER_QUEUE_NAME
+
+
+async def test_malformed_message_is_dead_lettered_immediately(monkeypatch):
+    settle = AsyncMock()
+    patch_settlement(monkeypatch, settle)
+    channel = FakeChannel()
+
+    await process_event_update_message(FakeMessage(b"not json"), channel)
+
+    [(routing_key, _)] = channel.default_exchange.published
+    assert routing_key == DEAD_LETTER_QUEUE_NAME
+    settle.assert_not_awaited()
+
+
+async def test_replay_dead_letters_endpoint(client, monkeypatch, debug_token):
+    dead_letters = [
+        FakeMessage(json.dumps(UPDATE).encode(), {ATTEMPTS_HEADER: 6}),
+        FakeMessage(json.dumps(UPDATE).encode(), {ATTEMPTS_HEADER: 6}),
+    ]
+    queue = AsyncMock()
+    queue.get.side_effect = [*dead_letters, None]
+    channel = FakeChannel(queue)
+    connection = AsyncMock()
+    connection.channel = lambda: channel
+    monkeypatch.setattr(
+        "app.settlement_retry.get_shared_connection",
+        AsyncMock(return_value=connection),
+    )
+
+    response = await client.post("/admin/dead-letters/replay", headers=ADMIN_HEADERS)
+
+    assert response.status_code == 200
+    assert response.json() == {"replayed": 2}
+    assert all(message.acked for message in dead_letters)
+    assert [key for key, _ in channel.default_exchange.published] == [
+        EVENT_UPDATE_QUEUE_NAME
+    ] * 2
+    assert all(
+        ATTEMPTS_HEADER not in message.headers
+        for _, message in channel.default_exchange.published
+    )
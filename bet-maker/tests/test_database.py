@@ -0,0 +1,65 @@
+import math
+from unittest.mock import AsyncMock
+
+from app.config import DB_HOST
+from app.database import (
+    READ_PRIMARY_COOKIE,
+    Replica,
+    async_session_maker,
+    choose_read_session_maker,
+)
+
+
+class FakeReplica:
+    def __init__(self, lag: float):
+        self.lag = lag
+        self.session_maker = object()
+
+    async def current_lag(self) -> float:
+        return self.lag
+
+
+async def test_reads_skip_lagging_replicas(monkeypatch):
+    fresh, lagging = FakeReplica(0.2), FakeReplica(60)
+    monkeypatch.setattr("app.database.replicas", [lagging, fresh])
+
+    assert await choose_read_session_maker() is fresh.session_maker
+    assert await choose_read_session_maker() is fresh.session_maker
+
+
+async def test_reads_fall_back_to_primary_when_all_replicas_lag(monkeypatch):
+    monkeypatch.setattr(
+        "app.database.replicas", [FakeReplica(60), FakeReplica(math.inf)]
+    )
+
+    assert await choose_read_session_maker() is async_session_maker
+
+
+async def test_replica_lag_query_reports_no_lag_on_a_primary():
+    replica = Replica(DB_HOST)
+    try:
+        assert await replica.current_lag() == 0
+    finally:
+        await replica.engine.dispose()
+
+
+async def test_writes_pin_client_reads_to_primary(client, monkeypatch):
+    monkeypatch.setattr("app.database.replicas", [FakeReplica(0)])
+    monkeypatch.setattr(
+        "app.line_provider.rpc_call",
+        AsyncMock(
+            return_value={
+                "id": 1,
+                "coef_1st_team_win": "1.50",
+                "coef_2nd_team_win": "2.10",
+            }
+        ),
+    )
+
+    response = await client.post(
+        "/bets/",
+        json={"event_id": 1, "bet_prediction": "FIRST_TEAM_WIN", "amount": "10.00"},
+    )
+
+    assert response.status_code == 201
+    assert READ_PRIMARY_COOKIE in response.cookies
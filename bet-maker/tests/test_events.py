@@ -1,5 +1,8 @@
 from unittest.mock import AsyncMock
 
+from app.config import EVENT_LIST_REQUEST_QUEUE_NAME
+from app.line_provider import LineProviderUnavailable
+
 SAMPLE_EVENT = {
     "id": 1,
     "name": "Team A vs Team B",
@@ -13,9 +16,8 @@ SAMPLE_EVENT = {
 
 
 async def test_list_available_events(client, monkeypatch):
-    monkeypatch.setattr(
-        "app.routers.events.rpc_call", AsyncMock(return_value=[SAMPLE_EVENT])
-    )
+    rpc_mock = AsyncMock(return_value=[SAMPLE_EVENT])
+    monkeypatch.setattr("app.line_provider.rpc_call", rpc_mock)
 
     response = await client.get("/events/")
 
@@ -23,11 +25,13 @@ async def test_list_available_events(client, monkeypatch):
     data = response.json()
     assert len(data) == 1
     assert data[0]["id"] == 1
+    # The list goes to its own queue, never ahead of bet-placement lookups.
+    assert rpc_mock.await_args.kwargs["queue_name"] == EVENT_LIST_REQUEST_QUEUE_NAME
 
 
 async def test_list_available_events_upstream_error(client, monkeypatch):
     monkeypatch.setattr(
-        "app.routers.events.rpc_call",
+        "app.line_provider.rpc_call",
         AsyncMock(return_value={"error": "line-provider failure"}),
     )
 
@@ -40,8 +44,67 @@ async def test_list_available_events_timeout(client, monkeypatch):
     async def _raise(*args, **kwargs):
         raise TimeoutError("no response")
 
-    monkeypatch.setattr("app.routers.events.rpc_call", _raise)
+    monkeypatch.setattr("app.line_provider.rpc_call", _raise)
 
     response = await client.get("/events/")
 
     assert response.status_code == 504
+
+
+async def test_list_available_events_line_provider_unavailable(client, monkeypatch):
+    async def _raise(*args, **kwargs):
+        raise LineProviderUnavailable("GET /internal/events/available answered 502")
+
+    monkeypatch.setattr("app.line_provider.rpc_call", _raise)
+
+    response = await client.get("/events/")
+
+    assert response.status_code == 503
+
+
+async def test_list_available_events_time_window(client, monkeypatch):
+    rpc_mock = AsyncMock(return_value=[SAMPLE_EVENT])
+    monkeypatch.setattr("app.line_provider.rpc_call", rpc_mock)
+
+    response = await client.get(
+        "/events/", params={"starts_before": "2026-01-02T06:00:00", "limit": 20}
+    )
+
+    assert response.status_code == 200
+    assert rpc_mock.await_args.kwargs["payload"] == {
+        "request": "get_available_events",
+        "starts_before": "2026-01-02T06:00:00",
+        "limit": 20,
+    }
+
+    response = await client.get("/events/", params={"limit": 0})
+    assert response.status_code == 422
+
+
+async def test_stream_available_events(client, monkeypatch):
+    payloads = []
+
+    async def rpc_stream(routing_key, queue_name, payload):
+        payloads.append(payload)
+        yield [SAMPLE_EVENT, {**SAMPLE_EVENT, "id": 2}]
+        yield [{**SAMPLE_EVENT, "id": 3}]
+        yield []
+
+    monkeypatch.setattr("app.line_provider.rpc_stream", rpc_stream)
+
+    response = await client.get("/events/stream", params={"limit": 3})
+
+    assert response.status_code == 200
+    assert [event["id"] for event in response.json()] == [1, 2, 3]
+    assert payloads == [{"request": "get_available_events", "stream": True, "limit": 3}]
+
+
+async def test_stream_available_events_upstream_error(client, monkeypatch):
+    async def rpc_stream(routing_key, queue_name, payload):
+        yield {"error": "line-provider failure"}
+
+    monkeypatch.setattr("app.line_provider.rpc_stream", rpc_stream)
+
+    response = await client.get("/events/stream")
+
+    assert response.status_code == 500
@@ -0,0 +1,134 @@
+import asyncio
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import crud, exposure
+from app.schemas import BetCreate
+
+ADMIN_HEADERS = {"X-Debug-Token": "secret"}
+
+
+@pytest.fixture
+def debug_token(monkeypatch):
+    monkeypatch.setattr("app.profiling.DEBUG_TOKEN", "secret")
+
+
+def mock_event_detail(monkeypatch, event_id, coef_1st="2.00", coef_2nd="1.50"):
+    monkeypatch.setattr(
+        "app.line_provider.rpc_call",
+        AsyncMock(
+            return_value={
+                "id": event_id,
+                "coef_1st_team_win": coef_1st,
+                "coef_2nd_team_win": coef_2nd,
+            }
+        ),
+    )
+
+
+async def place_bet(client, event_id, prediction, amount):
+    return await client.post(
+        "/bets/",
+        json={"event_id": event_id, "bet_prediction": prediction, "amount": amount},
+    )
+
+
+async def test_outcome_liability_limit_rejects_bet(client, monkeypatch, debug_token):
+    mock_event_detail(monkeypatch, 41)
+    monkeypatch.setattr("app.exposure.MAX_OUTCOME_LIABILITY", 300.0)
+
+    assert (await place_bet(client, 41, "FIRST_TEAM_WIN", "100.00")).status_code == 201
+    rejected = await place_bet(client, 41, "FIRST_TEAM_WIN", "100.00")
+    assert rejected.status_code == 409
+    assert "liability" in rejected.json()["detail"]
+    # The other outcome has its own liability counter.
+    assert (await place_bet(client, 41, "SECOND_TEAM_WIN", "100.00")).status_code == 201
+
+    data = (await client.get("/admin/exposure/41", headers=ADMIN_HEADERS)).json()
+    assert Decimal(data["stake"]) == Decimal("200.00")
+    assert Decimal(data["liability"]["FIRST_TEAM_WIN"]) == Decimal("200.00")
+    assert Decimal(data["liability"]["SECOND_TEAM_WIN"]) == Decimal("150.00")
+
+
+async def test_per_event_stake_limit_override(client, monkeypatch, debug_token):
+    mock_event_detail(monkeypatch, 42)
+
+    response = await client.put(
+        "/admin/exposure/42/limits", json={"max_stake": "50"}, headers=ADMIN_HEADERS
+    )
+    assert response.status_code == 200
+    assert Decimal(response.json()["max_stake"]) == Decimal("50")
+
+    assert (await place_bet(client, 42, "FIRST_TEAM_WIN", "30.00")).status_code == 201
+    rejected = await place_bet(client, 42, "SECOND_TEAM_WIN", "30.00")
+    assert rejected.status_code == 409
+    assert "stake" in rejected.json()["detail"]
+
+    # Clearing the override falls back to the unlimited default.
+    await client.put(
+        "/admin/exposure/42/limits", json={"max_stake": None}, headers=ADMIN_HEADERS
+    )
+    assert (await place_bet(client, 42, "SECOND_TEAM_WIN", "30.00")).status_code == 201
+
+
+async def test_admin_endpoints_are_guarded(client, monkeypatch):
+    limits = {"url": "/admin/exposure/46/limits", "json": {"max_stake": "1000"}}
+
+    monkeypatch.setattr("app.profiling.DEBUG_TOKEN", "")
+    assert (await client.put(**limits)).status_code == 404
+
+    monkeypatch.setattr("app.profiling.DEBUG_TOKEN", "secret")
+    assert (await client.put(**limits)).status_code == 403
+    response = await client.put(**limits, headers={"X-Debug-Token": "wrong"})
+    assert response.status_code == 403
+    assert (await client.get("/admin/bets/export")).status_code == 403
+    assert (await client.post("/admin/dead-letters/replay")).status_code == 403
+
+
+async def test_reservation_released_when_insert_fails(client, monkeypatch):
+    mock_event_detail(monkeypatch, 43)
+    monkeypatch.setattr(
+        "app.crud.add_to_bet_stats", AsyncMock(side_effect=SQLAlchemyError("boom"))
+    )
+
+    response = await place_bet(client, 43, "FIRST_TEAM_WIN", "10.00")
+
+    assert response.status_code == 500
+    data = (await exposure.get_exposure(43)).model_dump()
+    assert data["stake"] == 0
+    assert data["liability"]["FIRST_TEAM_WIN"] == 0
+
+
+async def test_reservation_released_when_placement_is_cancelled(session, monkeypatch):
+    mock_event_detail(monkeypatch, 45)
+    monkeypatch.setattr(
+        "app.crud.store_bet", AsyncMock(side_effect=asyncio.CancelledError())
+    )
+    bet = BetCreate(event_id=45, bet_prediction="FIRST_TEAM_WIN", amount="10.00")
+
+    with pytest.raises(asyncio.CancelledError):
+        await crud.create_bet(bet, session)
+
+    data = (await exposure.get_exposure(45)).model_dump()
+    assert data["stake"] == 0
+    assert data["liability"]["FIRST_TEAM_WIN"] == 0
+
+
+async def test_reconcile_rebuilds_counters_from_open_bets(
+    client, redis, monkeypatch, debug_token
+):
+    mock_event_detail(monkeypatch, 44)
+    await place_bet(client, 44, "FIRST_TEAM_WIN", "10.00")
+    await place_bet(client, 44, "SECOND_TEAM_WIN", "20.00")
+    await redis.delete(exposure.counters_key(44))
+
+    response = await client.post("/admin/exposure/44/reconcile", headers=ADMIN_HEADERS)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert Decimal(data["stake"]) == Decimal("30.00")
+    assert Decimal(data["liability"]["FIRST_TEAM_WIN"]) == Decimal("20.00")
+    assert Decimal(data["liability"]["SECOND_TEAM_WIN"]) == Decimal("30.00")
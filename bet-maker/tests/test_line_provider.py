@@ -0,0 +1,104 @@
+import json
+
+import httpx
+import pytest
+
+from app.line_provider import HTTPTransport, LineProviderUnavailable
+
+EVENT = {"id": 1, "coef_1st_team_win": "1.50", "coef_2nd_team_win": "2.10"}
+
+
+def make_transport(handler) -> HTTPTransport:
+    return HTTPTransport(
+        httpx.AsyncClient(
+            base_url="http://line-provider", transport=httpx.MockTransport(handler)
+        )
+    )
+
+
+async def test_http_transport_revalidates_with_etag():
+    seen_etags = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_etags.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, json=EVENT, headers={"ETag": '"v1"'})
+
+    transport = make_transport(handler)
+
+    assert await transport.get_available_event_detail(1) == EVENT
+    assert await transport.get_available_event_detail(1) == EVENT
+    assert seen_etags == [None, '"v1"']
+
+
+async def test_http_transport_maps_not_found_to_error_payload():
+    transport = make_transport(
+        lambda request: httpx.Response(
+            404, json={"detail": "Event not found or deadline has passed"}
+        )
+    )
+
+    assert await transport.get_available_event_detail(2) == {
+        "error": "Event not found or deadline has passed"
+    }
+
+
+async def test_http_transport_raises_timeout_error():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout("slow", request=request)
+
+    transport = make_transport(handler)
+
+    with pytest.raises(TimeoutError):
+        await transport.get_available_events({})
+
+
+async def test_http_transport_raises_unavailable_on_server_error():
+    transport = make_transport(lambda request: httpx.Response(502))
+
+    with pytest.raises(LineProviderUnavailable):
+        await transport.get_available_event_detail(1)
+
+
+async def test_http_transport_raises_unavailable_when_unreachable():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("refused", request=request)
+
+    transport = make_transport(handler)
+
+    with pytest.raises(LineProviderUnavailable):
+        await transport.get_available_events({})
+
+
+async def test_http_transport_sends_time_window_as_query():
+    seen_urls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_urls.append(str(request.url))
+        return httpx.Response(200, json=[EVENT])
+
+    transport = make_transport(handler)
+
+    await transport.get_available_events(
+        {"starts_before": "2026-01-01T06:00:00", "limit": 5}
+    )
+
+    assert seen_urls == [
+        "http://line-provider/internal/events/available"
+        "?starts_before=2026-01-01T06%3A00%3A00&limit=5"
+    ]
+
+
+async def test_http_transport_streams_ndjson_chunks():
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/internal/events/stream"
+        return httpx.Response(
+            200, content=json.dumps([EVENT]) + "\n" + json.dumps([]) + "\n"
+        )
+
+    transport = make_transport(handler)
+
+    chunks = [chunk async for chunk in transport.stream_available_events({})]
+
+    assert chunks == [[EVENT], []]
@@ -0,0 +1,33 @@
+import json
+import logging
+import queue
+
+from app.logging_config import DeferredQueueHandler, JsonFormatter, SamplingFilter
+
+
+def make_record(name, level=logging.INFO, msg="message", args=()):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_sampling_filter_keeps_share_of_sampled_loggers():
+    sampling = SamplingFilter({"app.rabbitmq.rpc": 0.25})
+
+    kept = [sampling.filter(make_record("app.rabbitmq.rpc")) for _ in range(8)]
+
+    assert kept.count(True) == 2
+    assert all(sampling.filter(make_record("app.crud")) for _ in range(8))
+    assert sampling.filter(make_record("app.rabbitmq.rpc", logging.ERROR))
+
+
+def test_queued_records_are_formatted_by_the_listener():
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+
+    handler.handle(make_record("app.rabbitmq.rpc", msg="Sent %s", args=("bet",)))
+
+    record = log_queue.get_nowait()
+    assert record.msg == "Sent %s"
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Sent bet"
+    assert entry["logger"] == "app.rabbitmq.rpc"
+    assert entry["level"] == "INFO"
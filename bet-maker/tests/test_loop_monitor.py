@@ -0,0 +1,24 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+
+from app import loop_monitor, metrics
+
+
+async def test_blocking_call_is_reported_with_its_stack(caplog, monkeypatch):
+    monkeypatch.setattr(metrics, "histograms", defaultdict(metrics.LatencyHistogram))
+    caplog.set_level(logging.WARNING, logger="app.loop_monitor")
+    watchdog = asyncio.create_task(
+        loop_monitor.monitor_loop(interval=0.01, block_threshold=0.05)
+    )
+    await asyncio.sleep(0.05)
+
+    time.sleep(0.2)
+    await asyncio.sleep(0.05)
+    watchdog.cancel()
+
+    reports = [r.getMessage() for r in caplog.records if "blocked" in r.getMessage()]
+    assert len(reports) == 1
+    assert "test_blocking_call_is_reported_with_its_stack" in reports[0]
+    assert metrics.histograms["event_loop_lag"].max_ms >= 150
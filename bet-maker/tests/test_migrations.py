@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest_asyncio
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import sharding
+from app.config import DB_NAME
+from app.database import DATABASE_URL
+
+SHARD_DATABASES = ["bet_maker_migrations_0", "bet_maker_migrations_1"]
+
+
+def url_of(database: str) -> str:
+    return DATABASE_URL.removesuffix(DB_NAME) + database
+
+
+@pytest_asyncio.fixture
+async def shard_databases(monkeypatch):
+    server = create_async_engine(
+        DATABASE_URL, poolclass=NullPool, isolation_level="AUTOCOMMIT"
+    )
+    async with server.connect() as conn:
+        for database in SHARD_DATABASES:
+            await conn.execute(text(f"DROP DATABASE IF EXISTS {database}"))
+            await conn.execute(text(f"CREATE DATABASE {database}"))
+
+    urls = [url_of(database) for database in SHARD_DATABASES]
+    monkeypatch.setattr(sharding, "shard_urls", lambda: urls)
+    yield urls
+
+    async with server.connect() as conn:
+        for database in SHARD_DATABASES:
+            await conn.execute(text(f"DROP DATABASE IF EXISTS {database}"))
+    await server.dispose()
+
+
+async def test_upgrade_migrates_every_shard(shard_databases):
+    # No config file: alembic.ini's logging setup would replace pytest's.
+    config = Config()
+    config.set_main_option("script_location", "migrations")
+
+    def upgrade() -> None:
+        # async_fallback drives asyncpg on the thread's own event loop.
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            command.upgrade(config, "head")
+        finally:
+            loop.close()
+
+    await asyncio.to_thread(upgrade)
+
+    for url in shard_databases:
+        shard = create_async_engine(url, poolclass=NullPool)
+        async with shard.connect() as conn:
+            tables = await conn.execute(
+                text("SELECT tablename FROM pg_tables WHERE schemaname = 'public'")
+            )
+            assert {"alembic_version", "bets", "bet_stats"} <= set(tables.scalars())
+        await shard.dispose()
@@ -0,0 +1,55 @@
+import re
+
+import pytest
+
+from app import profiling
+
+DEBUG_HEADERS = {"X-Debug-Token": "secret"}
+
+
+@pytest.fixture
+def debug_token(monkeypatch):
+    monkeypatch.setattr("app.profiling.DEBUG_TOKEN", "secret")
+
+
+async def test_debug_endpoints_are_guarded(client, monkeypatch):
+    monkeypatch.setattr("app.profiling.DEBUG_TOKEN", "")
+    assert (await client.get("/debug/slow-requests")).status_code == 404
+
+    monkeypatch.setattr("app.profiling.DEBUG_TOKEN", "secret")
+    response = await client.get(
+        "/debug/slow-requests", headers={"X-Debug-Token": "wrong"}
+    )
+    assert response.status_code == 403
+
+
+async def test_profile_returns_collapsed_stacks(client, debug_token):
+    response = await client.get(
+        "/debug/profile",
+        params={"seconds": 0.2, "interval_ms": 1},
+        headers=DEBUG_HEADERS,
+    )
+
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+    lines = response.text.splitlines()
+    assert lines
+    assert all(re.fullmatch(r"\S.* \d+", line) for line in lines)
+
+
+async def test_slow_requests_record_db_statements(
+    client, engine, debug_token, monkeypatch
+):
+    profiling.instrument_engine(engine.sync_engine)
+    monkeypatch.setattr("app.profiling.SLOW_REQUEST_THRESHOLD_MS", 0)
+    profiling.slow_requests.clear()
+
+    await client.get("/bets/")
+
+    slow = (await client.get("/debug/slow-requests", headers=DEBUG_HEADERS)).json()
+    listing = next(request for request in slow if request["route"] == "/bets/")
+    assert listing["status"] == 200
+    assert any(
+        span["kind"] == "db" and "FROM bets" in span["detail"]
+        for span in listing["spans"]
+    )
@@ -0,0 +1,178 @@
+from unittest.mock import AsyncMock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.future import select
+
+from app import rebalance, sharding
+from app.crud import get_bet_stats, update_bets_status_bulk
+from app.database import metadata
+from app.models import bet_stats, bets
+
+# Events owned by shard 0 and by shard 1 of two.
+EVENT_ON_SHARD_0 = next(e for e in range(1, 100) if sharding.shard_for_event(e, 2) == 0)
+EVENT_ON_SHARD_1 = next(e for e in range(1, 100) if sharding.shard_for_event(e, 2) == 1)
+
+
+@pytest.fixture(autouse=True)
+def event_odds(monkeypatch):
+    monkeypatch.setattr(
+        "app.line_provider.rpc_call",
+        AsyncMock(
+            return_value={"coef_1st_team_win": "1.50", "coef_2nd_team_win": "2.00"}
+        ),
+    )
+
+
+@pytest_asyncio.fixture
+async def shards(engine, session, monkeypatch):
+    """
+    Shard 0 is the test session's connection. Shard 1 is a second connection
+    whose search_path points at a schema of its own holding the same tables;
+    its transaction is rolled back after the test.
+    """
+    shard_0 = async_sessionmaker(
+        bind=await session.connection(), expire_on_commit=False
+    )
+    monkeypatch.setattr(sharding, "shard_session_makers", [shard_0])
+
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        await conn.execute(text("CREATE SCHEMA shard_1"))
+        await conn.execute(text("SET LOCAL search_path TO shard_1"))
+        await conn.run_sync(metadata.create_all)
+        shard_1 = async_sessionmaker(bind=conn, expire_on_commit=False)
+
+        yield [shard_0, shard_1]
+        await trans.rollback()
+
+
+def use_shards(monkeypatch, session_makers):
+    monkeypatch.setattr(sharding, "shard_session_makers", session_makers)
+
+
+async def place_bet(client, event_id, prediction="FIRST_TEAM_WIN"):
+    response = await client.post(
+        "/bets/",
+        json={"event_id": event_id, "bet_prediction": prediction, "amount": "10.00"},
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+async def event_ids_on(session_maker) -> list[int]:
+    async with session_maker() as session:
+        return sorted((await session.execute(select(bets.c.event_id))).scalars())
+
+
+async def stats_count_on(session_maker, event_id) -> int:
+    async with session_maker() as session:
+        count = await session.execute(
+            select(func.sum(bet_stats.c.bets_count)).where(
+                bet_stats.c.event_id == event_id
+            )
+        )
+        return count.scalar() or 0
+
+
+def test_shard_for_event_is_stable():
+    assert sharding.shard_for_event(EVENT_ON_SHARD_1, 2) == 1
+    assert {sharding.shard_for_event(e, 4) for e in range(100)} == {0, 1, 2, 3}
+
+
+def test_adding_a_shard_only_moves_events_onto_it():
+    moved = [
+        event_id
+        for event_id in range(10_000)
+        if sharding.shard_for_event(event_id, 4)
+        != sharding.shard_for_event(event_id, 5)
+    ]
+
+    assert {sharding.shard_for_event(event_id, 5) for event_id in moved} == {4}
+    assert 1500 < len(moved) < 2500
+
+
+async def test_bets_are_stored_on_their_events_shard(client, shards, monkeypatch):
+    use_shards(monkeypatch, shards)
+
+    first_id = await place_bet(client, EVENT_ON_SHARD_1)
+    second_id = await place_bet(client, EVENT_ON_SHARD_0)
+    third_id = await place_bet(client, EVENT_ON_SHARD_1)
+
+    assert await event_ids_on(shards[0]) == [EVENT_ON_SHARD_0]
+    assert await event_ids_on(shards[1]) == [EVENT_ON_SHARD_1] * 2
+    assert await stats_count_on(shards[1], EVENT_ON_SHARD_1) == 2
+
+    response = await client.get("/bets/", params={"limit": 10})
+    assert [bet["id"] for bet in response.json()] == [first_id, second_id, third_id]
+    response = await client.get("/bets/", params={"offset": 1, "limit": 1})
+    assert [bet["id"] for bet in response.json()] == [second_id]
+
+
+async def test_settlement_touches_each_events_shard(
+    client, session, shards, monkeypatch
+):
+    use_shards(monkeypatch, shards)
+    await place_bet(client, EVENT_ON_SHARD_0, "FIRST_TEAM_WIN")
+    await place_bet(client, EVENT_ON_SHARD_1, "FIRST_TEAM_WIN")
+
+    await update_bets_status_bulk(
+        session,
+        {EVENT_ON_SHARD_0: "FIRST_TEAM_WON", EVENT_ON_SHARD_1: "SECOND_TEAM_WON"},
+    )
+
+    response = await client.get("/bets/")
+    assert {bet["event_id"]: bet["status"] for bet in response.json()} == {
+        EVENT_ON_SHARD_0: "WON",
+        EVENT_ON_SHARD_1: "LOST",
+    }
+    stats = await get_bet_stats(session)
+    assert stats.total.bets_count == 2
+    assert {status: s.bets_count for status, s in stats.total.by_status.items()} == {
+        "WON": 1,
+        "LOST": 1,
+    }
+    assert [event.event_id for event in stats.events] == sorted(
+        [EVENT_ON_SHARD_0, EVENT_ON_SHARD_1]
+    )
+
+
+async def test_rebalance_moves_bets_to_their_new_shard(client, shards, monkeypatch):
+    # Placed while there is a single shard, then a second one is added.
+    await place_bet(client, EVENT_ON_SHARD_0)
+    await place_bet(client, EVENT_ON_SHARD_1)
+    await place_bet(client, EVENT_ON_SHARD_1)
+    use_shards(monkeypatch, shards)
+
+    assert await rebalance.rebalance(dry_run=True) == {0: [EVENT_ON_SHARD_1]}
+    assert await event_ids_on(shards[1]) == []
+
+    await rebalance.rebalance()
+
+    assert await event_ids_on(shards[0]) == [EVENT_ON_SHARD_0]
+    assert await event_ids_on(shards[1]) == [EVENT_ON_SHARD_1] * 2
+    assert await stats_count_on(shards[0], EVENT_ON_SHARD_1) == 0
+    assert await stats_count_on(shards[1], EVENT_ON_SHARD_1) == 2
+    assert await rebalance.rebalance() == {}
+
+
+async def test_export_merges_shards_in_id_order(client, session, shards, monkeypatch):
+    use_shards(monkeypatch, shards)
+    bet_ids = [
+        await place_bet(client, event_id)
+        for event_id in (EVENT_ON_SHARD_1, EVENT_ON_SHARD_0, EVENT_ON_SHARD_1)
+    ]
+
+    batches = [
+        batch
+        async for batch in sharding.stream_shards(
+            session, select(bets.c.id, bets.c.event_id), "id", batch_size=2
+        )
+    ]
+
+    assert [[row.id for row in batch] for batch in batches] == [
+        bet_ids[:2],
+        bet_ids[2:],
+    ]
@@ -0,0 +1,79 @@
+"""
+Type-ahead for GET /events/autocomplete, served from memory. The open
+events are indexed by every word position in their name ("real madrid" is
+found by "real m" and by "mad"), as a sorted list searched by bisection.
+The index is rebuilt from the database once it is AUTOCOMPLETE_INDEX_TTL
+seconds old, or on the next request after this process changes an event.
+"""
+
+import asyncio
+import bisect
+import logging
+import re
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import AUTOCOMPLETE_INDEX_TTL
+from .crud import get_available_events
+from .rabbitmq import offload_if_large
+from .schemas import EventResponse
+
+logger = logging.getLogger(__name__)
+
+
+class PrefixIndex:
+    def __init__(self, events: list[EventResponse]):
+        entries = []
+        for event in events:
+            name = event.name.lower()
+            for word in re.finditer(r"[^\W_]+", name):
+                entries.append((name[word.start() :], event.id))
+        entries.sort()
+
+        self.keys = [key for key, _ in entries]
+        self.event_ids = [event_id for _, event_id in entries]
+        self.events = {event.id: event for event in events}
+
+    def complete(self, prefix: str, limit: int) -> list[EventResponse]:
+        prefix = prefix.strip().lower()
+        now = datetime.now(timezone.utc)
+        found: dict[int, EventResponse] = {}
+
+        position = bisect.bisect_left(self.keys, prefix)
+        while (
+            len(found) < limit
+            and position < len(self.keys)
+            and self.keys[position].startswith(prefix)
+        ):
+            event = self.events[self.event_ids[position]]
+            # Events whose deadline passed since the last rebuild are skipped.
+            if event.deadline > now:
+                found.setdefault(event.id, event)
+            position += 1
+
+        return list(found.values())
+
+
+_index: PrefixIndex | None = None
+_built_at = -float("inf")
+_rebuild_lock = asyncio.Lock()
+
+
+def invalidate() -> None:
+    global _built_at
+    _built_at = -float("inf")
+
+
+async def get_index(session: AsyncSession) -> PrefixIndex:
+    global _index, _built_at
+    async with _rebuild_lock:
+        if _index is None or time.monotonic() - _built_at > AUTOCOMPLETE_INDEX_TTL:
+            events = await get_available_events(session)
+            if events is None:
+                raise RuntimeError("Error during getting available events occurred.")
+            _index = await offload_if_large(events, PrefixIndex, events)
+            _built_at = time.monotonic()
+            logger.info(f"Rebuilt autocomplete index of {len(events)} open events")
+        return _index
@@ -10,10 +10,108 @@ DB_NAME = os.environ.get("DB_NAME")
 DB_USER = os.environ.get("DB_USER")
 DB_PASS = os.environ.get("DB_PASS")
 
+# DB_POOL_SIZE=0 disables pooling (a fresh connection per session).
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+
+# Optional streaming replicas ("host" or "host:port", comma separated) that
+# take read-only queries; same credentials and database name as the primary.
+DB_REPLICA_HOSTS = [
+    host.strip()
+    for host in os.environ.get("DB_REPLICA_HOSTS", "").split(",")
+    if host.strip()
+]
+DB_REPLICA_MAX_LAG = float(os.environ.get("DB_REPLICA_MAX_LAG", 5))
+DB_REPLICA_LAG_CHECK_INTERVAL = float(
+    os.environ.get("DB_REPLICA_LAG_CHECK_INTERVAL", 1)
+)
+
 RABBITMQ_USER = os.environ.get("RABBITMQ_USER")
 RABBITMQ_PASS = os.environ.get("RABBITMQ_PASS")
 RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST")
 
 EXCHANGE_NAME = os.environ.get("EXCHANGE_NAME")
 EVENT_UPDATE_QUEUE_NAME = os.environ.get("EVENT_UPDATE_QUEUE_NAME")
+# Odds changes on open events, consumed by bet-maker to re-price cash-outs.
+EVENT_ODDS_QUEUE_NAME = os.environ.get("EVENT_ODDS_QUEUE_NAME", "event_odds_queue")
+# Bet-placement event-detail lookups and the heavy full event list travel on
+# separate queues, so list traffic never queues ahead of a detail lookup.
 REQUEST_QUEUE_NAME = os.environ.get("REQUEST_QUEUE_NAME")
+EVENT_LIST_REQUEST_QUEUE_NAME = os.environ.get(
+    "EVENT_LIST_REQUEST_QUEUE_NAME", "event_list_request_queue"
+)
+
+BULK_INSERT_CHUNK_SIZE = int(os.environ.get("BULK_INSERT_CHUNK_SIZE", 1000))
+
+# Web containers scaled to several uvicorn workers should set this to false
+# and run the consumer separately with `python -m app.worker`.
+RUN_CONSUMER_IN_APP = os.environ.get("RUN_CONSUMER_IN_APP", "true").lower() == "true"
+CONSUMER_PREFETCH_COUNT = int(os.environ.get("CONSUMER_PREFETCH_COUNT", 10))
+# Each RPC queue is consumed on its own channel, so these also cap how many
+# requests of each kind are handled concurrently.
+DETAIL_REQUEST_PREFETCH_COUNT = int(
+    os.environ.get("DETAIL_REQUEST_PREFETCH_COUNT", CONSUMER_PREFETCH_COUNT)
+)
+LIST_REQUEST_PREFETCH_COUNT = int(os.environ.get("LIST_REQUEST_PREFETCH_COUNT", 2))
+
+# The RPC server streams at most RPC_STREAM_CONCURRENCY event lists at once,
+# each holding a connection for its server-side cursor, and runs at most
+# RPC_HANDLER_CONCURRENCY other database lookups at once (by default, what
+# the connection pool can serve besides the streams without waiting). It
+# answers event-detail lookups arriving within RPC_DETAIL_BATCH_WINDOW_MS of
+# each other with one query of up to RPC_DETAIL_BATCH_MAX_SIZE ids.
+RPC_STREAM_CONCURRENCY = int(os.environ.get("RPC_STREAM_CONCURRENCY", 2))
+RPC_HANDLER_CONCURRENCY = int(
+    os.environ.get(
+        "RPC_HANDLER_CONCURRENCY",
+        max(DB_POOL_SIZE + DB_MAX_OVERFLOW - RPC_STREAM_CONCURRENCY, 1),
+    )
+)
+RPC_DETAIL_BATCH_WINDOW_MS = float(os.environ.get("RPC_DETAIL_BATCH_WINDOW_MS", 2))
+RPC_DETAIL_BATCH_MAX_SIZE = int(os.environ.get("RPC_DETAIL_BATCH_MAX_SIZE", 200))
+
+# How often the worker logs latency metrics; 0 disables it.
+METRICS_LOG_INTERVAL = float(os.environ.get("METRICS_LOG_INTERVAL", 60))
+
+# The loop watchdog measures event-loop lag every LOOP_LAG_CHECK_INTERVAL
+# seconds and logs the blocking stack when the loop stalls for longer than
+# LOOP_BLOCK_THRESHOLD seconds (0 disables the stack dumps).
+LOOP_LAG_CHECK_INTERVAL = float(os.environ.get("LOOP_LAG_CHECK_INTERVAL", 0.5))
+LOOP_BLOCK_THRESHOLD = float(os.environ.get("LOOP_BLOCK_THRESHOLD", 0.1))
+# Event lists at least this long are serialized on a worker thread instead
+# of the event loop; 0 keeps serialization on the loop.
+OFFLOAD_SERIALIZATION_MIN_ITEMS = int(
+    os.environ.get("OFFLOAD_SERIALIZATION_MIN_ITEMS", 1000)
+)
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# "json" (one object per line) or "text".
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json").lower()
+# Share of INFO/DEBUG records kept for high-volume loggers ("logger=rate",
+# comma separated); a logger's rate also covers its children.
+LOG_SAMPLE_RATES = {
+    name.strip(): float(rate)
+    for name, rate in (
+        item.split("=", 1)
+        for item in os.environ.get("LOG_SAMPLE_RATES", "").split(",")
+        if "=" in item
+    )
+}
+# Logs every SQL statement when true.
+DB_ECHO = os.environ.get("DB_ECHO", "false").lower() == "true"
+
+# /debug endpoints (profiling, slow requests) are only served when this is set,
+# to clients sending it in X-Debug-Token.
+DEBUG_TOKEN = os.environ.get("DEBUG_TOKEN", "")
+PROFILE_MAX_SECONDS = float(os.environ.get("PROFILE_MAX_SECONDS", 60))
+# Requests slower than this are logged with their DB statements and calls.
+SLOW_REQUEST_THRESHOLD_MS = float(os.environ.get("SLOW_REQUEST_THRESHOLD_MS", 500))
+SLOW_REQUEST_LOG_SIZE = int(os.environ.get("SLOW_REQUEST_LOG_SIZE", 100))
+
+# GET /events/autocomplete serves from an in-memory index of open events,
+# rebuilt after this many seconds (or when this process changes an event).
+AUTOCOMPLETE_INDEX_TTL = float(os.environ.get("AUTOCOMPLETE_INDEX_TTL", 30))
+
+# Streamed open-events replies (RPC "stream" requests and
+# GET /internal/events/stream) carry at most this many events per chunk.
+EVENT_STREAM_CHUNK_SIZE = int(os.environ.get("EVENT_STREAM_CHUNK_SIZE", 500))
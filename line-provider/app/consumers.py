@@ -1,17 +1,208 @@
 import asyncio
+import contextlib
 import json
 import logging
 
 from aio_pika import IncomingMessage, Message
-from aio_pika.abc import AbstractChannel
+from aio_pika.abc import AbstractChannel, AbstractConnection
+from pamqp.commands import Basic
+from pydantic import ValidationError
 
-from .config import REQUEST_QUEUE_NAME
-from .crud import get_available_event_detail, get_available_events
-from .database import get_async_session
-from .rabbitmq import connect_with_retry, custom_json_serializer
+from . import metrics, readiness
+from .config import (
+    DETAIL_REQUEST_PREFETCH_COUNT,
+    EVENT_LIST_REQUEST_QUEUE_NAME,
+    EVENT_STREAM_CHUNK_SIZE,
+    LIST_REQUEST_PREFETCH_COUNT,
+    REQUEST_QUEUE_NAME,
+    RPC_DETAIL_BATCH_MAX_SIZE,
+    RPC_DETAIL_BATCH_WINDOW_MS,
+    RPC_HANDLER_CONCURRENCY,
+    RPC_STREAM_CONCURRENCY,
+)
+from .crud import (
+    get_available_event_details,
+    get_available_events,
+    iter_available_events,
+)
+from .database import get_async_session, get_replica_session
+from .rabbitmq import connect_with_retry, dump_models, encode_json, offload_if_large
+from .schemas import EventResponse, EventWindow
 
 logger = logging.getLogger(__name__)
 
+# Caps the database work of the RPC server across both request queues, so a
+# burst of deliveries queues here instead of on the connection pool.
+handler_slots = asyncio.Semaphore(RPC_HANDLER_CONCURRENCY)
+# Streamed event lists hold their cursor for as long as the requester takes
+# to read them, so they get slots of their own instead of holding one of the
+# ordinary lookups' for the whole stream.
+stream_slots = asyncio.Semaphore(RPC_STREAM_CONCURRENCY)
+
+# Request types with a latency histogram of their own. Anything else a
+# client sends is timed as "unknown", so the set of histograms stays bounded.
+REQUEST_TYPES = ("get_available_events", "get_available_event_detail")
+
+
+class ReplyQueueGone(Exception):
+    """A stream chunk couldn't be delivered to the requester's reply queue."""
+
+
+class DetailLookupBatcher:
+    """
+    Collects event-detail lookups that arrive within `window` seconds of the
+    first one (or until `max_size` distinct ids are pending) and answers them
+    all with a single query on one pooled session.
+    """
+
+    def __init__(self, window: float, max_size: int):
+        self.window = window
+        self.max_size = max_size
+        self._pending: dict[int, list[asyncio.Future]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def lookup(self, event_id: int) -> EventResponse | None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(event_id, []).append(future)
+
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, {}
+        task = asyncio.create_task(self._run_batch(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _run_batch(self, batch: dict[int, list[asyncio.Future]]) -> None:
+        try:
+            async with handler_slots:
+                with metrics.timed("get_available_event_detail.batch_query"):
+                    async for session in get_async_session():
+                        found = await get_available_event_details(session, list(batch))
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for event_id, futures in batch.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(found.get(event_id))
+
+
+detail_batcher = DetailLookupBatcher(
+    window=RPC_DETAIL_BATCH_WINDOW_MS / 1000, max_size=RPC_DETAIL_BATCH_MAX_SIZE
+)
+
+
+async def handle_request(request_data: dict) -> dict | list | None:
+    """Builds the reply for an RPC request, or returns None for unknown types."""
+    request_type = request_data.get("request")
+
+    if request_type == "get_available_events":
+        # The event list tolerates replica lag; the detail lookup prices a
+        # bet, so it has to see the latest odds on the primary.
+        try:
+            window = EventWindow.model_validate(request_data)
+        except ValidationError as e:
+            logger.error(f"Invalid event window in request: {e}")
+            return {"error": "Invalid event window."}
+
+        async with handler_slots:
+            async for session in get_replica_session():
+                events = await get_available_events(session, **dict(window))
+        if events is None:
+            return {"error": "Error during getting available events occurred."}
+        return await offload_if_large(events, dump_models, events)
+
+    if request_type == "get_available_event_detail":
+        event_id = request_data.get("event_id")
+        event = None
+        if isinstance(event_id, int):
+            event = await detail_batcher.lookup(event_id)
+        if event is None:
+            return {"error": "Event not found or deadline has passed"}
+        return event.model_dump()
+
+    logger.error(f"Unsupported request type: {request_type}")
+    return None
+
+
+async def stream_available_events(
+    request_data: dict, message: IncomingMessage, channel: AbstractChannel
+) -> None:
+    """
+    Answers a get_available_events request sent with "stream": true as a
+    sequence of replies numbered by a "seq" header, each a JSON array of at
+    most EVENT_STREAM_CHUNK_SIZE events. The last reply carries an "end"
+    header and is an empty array, or an {"error": ...} object if the stream
+    failed part-way.
+
+    Each chunk is published mandatory and its confirm awaited before the
+    next one is read, and the stream stops as soon as a chunk is returned
+    or fails to publish: the requester has gone, or timed out and deleted
+    its reply queue.
+    """
+    seq = 0
+
+    async def publish_chunk(body: bytes, end: bool = False) -> None:
+        nonlocal seq
+        try:
+            confirmation = await channel.default_exchange.publish(
+                Message(
+                    body=body,
+                    correlation_id=message.correlation_id,
+                    headers={"seq": seq, "end": end},
+                ),
+                routing_key=message.reply_to,
+                mandatory=True,
+            )
+        except Exception as e:
+            raise ReplyQueueGone(f"publishing chunk {seq} failed: {e!r}") from e
+        if not isinstance(confirmation, Basic.Ack):
+            raise ReplyQueueGone(f"chunk {seq} was not delivered: {confirmation!r}")
+        seq += 1
+
+    try:
+        window = EventWindow.model_validate(request_data)
+        async with stream_slots:
+            # Closed at once when the stream stops early, which releases the
+            # server-side cursor and its connection.
+            async with contextlib.aclosing(get_replica_session()) as sessions:
+                async for session in sessions:
+                    async with contextlib.aclosing(
+                        iter_available_events(
+                            session, EVENT_STREAM_CHUNK_SIZE, **dict(window)
+                        )
+                    ) as chunks:
+                        async for chunk in chunks:
+                            await publish_chunk(encode_json(dump_models(chunk)))
+        await publish_chunk(b"[]", end=True)
+    except ReplyQueueGone as e:
+        logger.warning(f"Stopped streaming available events to {message.reply_to}: {e}")
+    except Exception as e:
+        logger.error(f"Error while streaming available events: {e}", exc_info=True)
+        with contextlib.suppress(ReplyQueueGone):
+            await publish_chunk(
+                encode_json(
+                    {"error": "Error during getting available events occurred."}
+                ),
+                end=True,
+            )
+
 
 async def process_request_message(
     message: IncomingMessage, channel: AbstractChannel
@@ -19,64 +210,70 @@ async def process_request_message(
     async with message.process():
         try:
             request_data = json.loads(message.body.decode())
+
+            if message.reply_to is None:
+                logger.error("Request message has no reply_to, cannot send response")
+                return
+
+            if request_data.get("request") == "get_available_events" and (
+                request_data.get("stream")
+            ):
+                with metrics.timed("get_available_events.stream"):
+                    await stream_available_events(request_data, message, channel)
+                return
+
             request_type = request_data.get("request")
+            metric_name = request_type if request_type in REQUEST_TYPES else "unknown"
+            with metrics.timed(metric_name):
+                response_data = await handle_request(request_data)
+            if response_data is None:
+                return
 
-            async for session in get_async_session():
-                if request_type == "get_available_events":
-                    events = await get_available_events(session)
-                    if events is None:
-                        response_data = {
-                            "error": "Error during getting available events occurred."
-                        }
-                    else:
-                        response_data = [event.model_dump() for event in events]
-
-                elif request_type == "get_available_event_detail":
-                    event_id = request_data.get("event_id")
-                    event = await get_available_event_detail(session, event_id)
-                    if event is None:
-                        response_data = {
-                            "error": "Event not found or deadline has passed"
-                        }
-                    else:
-                        response_data = event.model_dump()
-
-                else:
-                    logger.error(f"Unsupported request type: {request_type}")
-                    return
-
-                if message.reply_to is None:
-                    logger.error(
-                        "Request message has no reply_to, cannot send response"
-                    )
-                    return
-
-                response_body = json.dumps(
-                    response_data, default=custom_json_serializer
-                )
-
-                await channel.default_exchange.publish(
-                    Message(
-                        body=response_body.encode(),
-                        correlation_id=message.correlation_id,
-                    ),
-                    routing_key=message.reply_to,
-                )
+            response_body = await offload_if_large(
+                response_data, encode_json, response_data
+            )
+
+            await channel.default_exchange.publish(
+                Message(
+                    body=response_body,
+                    correlation_id=message.correlation_id,
+                ),
+                routing_key=message.reply_to,
+            )
 
         except Exception as e:
             logger.error(f"Error processing request: {e}", exc_info=True)
 
 
+async def consume_queue(
+    connection: AbstractConnection, queue_name: str, prefetch_count: int
+) -> None:
+    """
+    Consumes `queue_name` on a channel of its own: prefetch is per channel,
+    so each queue gets an independent window of in-flight requests.
+    """
+    channel = await connection.channel()
+    await channel.set_qos(prefetch_count=prefetch_count)
+    queue = await channel.declare_queue(queue_name, durable=True)
+
+    async def handler(message: IncomingMessage) -> None:
+        await process_request_message(message, channel)
+
+    await queue.consume(handler)
+    logger.info(f"Consuming messages from {queue_name} (prefetch {prefetch_count})...")
+
+
 async def consume() -> None:
     connection = await connect_with_retry()
     async with connection:
-        channel = await connection.channel()
-        queue = await channel.declare_queue(REQUEST_QUEUE_NAME, durable=True)
-
-        async def handler(message: IncomingMessage) -> None:
-            await process_request_message(message, channel)
-
-        await queue.consume(handler)
-        logger.info("Consuming messages from queue...")
+        # Both queues accept either request type, so bet-maker instances that
+        # still send everything to REQUEST_QUEUE_NAME keep working.
+        await consume_queue(
+            connection, REQUEST_QUEUE_NAME, DETAIL_REQUEST_PREFETCH_COUNT
+        )
+        await consume_queue(
+            connection, EVENT_LIST_REQUEST_QUEUE_NAME, LIST_REQUEST_PREFETCH_COUNT
+        )
+        readiness.mark_ready("consumer")
 
         await asyncio.Future()
@@ -1,17 +1,19 @@
 import json
 import logging
+import re
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict
 
 from fastapi import HTTPException, status
-from sqlalchemy import and_, update
+from sqlalchemy import and_, case, cast, func, literal_column, update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from .models import events
+from .config import EVENT_ODDS_QUEUE_NAME
+from .models import events, not_finished, search_document
 from .rabbitmq import send_message
-from .schemas import EventCreate, EventResponse, EventStatus, EventUpdate
+from .schemas import EventCreate, EventResponse, EventResult, EventStatus, EventUpdate
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +55,41 @@ async def create_event_crud(session: AsyncSession, event: EventCreate) -> EventR
         )
 
 
+async def bulk_create_events_crud(
+    session: AsyncSession, event_batches: AsyncIterator[list[EventCreate]]
+) -> list[int]:
+    """
+    Inserts every batch with one multi-row INSERT, all inside a single
+    transaction, so an import either lands completely or not at all.
+    """
+    created_ids = []
+
+    try:
+        async for batch in event_batches:
+            result = await session.execute(
+                events.insert().returning(events.c.id, sort_by_parameter_order=True),
+                [event.model_dump(exclude={"timestamp"}) for event in batch],
+            )
+            created_ids.extend(result.scalars().all())
+
+        await session.commit()
+        logger.info("Bulk import created %d events", len(created_ids))
+        return created_ids
+
+    except SQLAlchemyError as e:
+        await session.rollback()
+        logger.error(f"Failed to bulk create events. Error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred",
+        )
+
+    except Exception:
+        # A record rejected mid-stream aborts the whole import.
+        await session.rollback()
+        raise
+
+
 async def get_all_events_crud(
     session: AsyncSession, offset: int = 0, limit: int = 10
 ) -> list[EventResponse]:
@@ -71,10 +108,85 @@ async def get_all_events_crud(
         )
 
 
-async def get_available_events(session: AsyncSession) -> list[EventResponse] | None:
+def prefix_tsquery(text: str) -> str | None:
+    """
+    "real madr" -> "real:* & madr:*": every word of the query, as a prefix,
+    so results narrow as the user types. None if there are no words.
+    """
+    words = re.findall(r"[^\W_]+", text.lower())
+    return " & ".join(f"{word}:*" for word in words) or None
+
+
+async def search_events_crud(
+    session: AsyncSession,
+    q: str,
+    open_only: bool = False,
+    offset: int = 0,
+    limit: int = 10,
+) -> list[EventResponse]:
+    """
+    Events whose name or description contain every word of `q` as a word
+    prefix, best matches first, through the ix_events_search GIN index.
+    """
+    tsquery = prefix_tsquery(q)
+    if tsquery is None:
+        return []
+
+    search_query = func.to_tsquery(literal_column("'simple'::regconfig"), tsquery)
+    query = (
+        select(events)
+        .where(search_document.op("@@")(search_query))
+        .order_by(func.ts_rank(search_document, search_query).desc(), events.c.id)
+        .offset(offset)
+        .limit(limit)
+    )
+    if open_only:
+        query = query.where(events.c.deadline > datetime.now())
+
+    try:
+        result = await session.execute(query)
+        return [EventResponse(**event) for event in result.mappings().fetchall()]
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while searching events: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred",
+        )
+
+
+def available_events_query(
+    starts_after: datetime | None = None,
+    starts_before: datetime | None = None,
+    limit: int | None = None,
+):
+    """
+    Open events, soonest deadline first, optionally only those with a
+    deadline in [starts_after, starts_before) and at most `limit` of them.
+    Served by the partial ix_events_open_deadline index.
+    """
     current_time = datetime.now()
 
-    query = select(events).where(events.c.deadline > current_time).order_by(events.c.id)
+    query = (
+        select(events)
+        .where(not_finished, events.c.deadline > current_time)
+        .order_by(events.c.deadline, events.c.id)
+        .limit(limit)
+    )
+    if starts_after is not None:
+        query = query.where(events.c.deadline >= starts_after)
+    if starts_before is not None:
+        query = query.where(events.c.deadline < starts_before)
+    return query
+
+
+async def get_available_events(
+    session: AsyncSession,
+    starts_after: datetime | None = None,
+    starts_before: datetime | None = None,
+    limit: int | None = None,
+) -> list[EventResponse] | None:
+    query = available_events_query(starts_after, starts_before, limit)
 
     try:
         result = await session.execute(query)
@@ -88,30 +200,44 @@ async def get_available_events(session: AsyncSession) -> list[EventResponse] | N
         return None
 
 
-async def get_available_event_detail(
-    session: AsyncSession, event_id: int
-) -> EventResponse | None:
+async def iter_available_events(
+    session: AsyncSession,
+    chunk_size: int,
+    starts_after: datetime | None = None,
+    starts_before: datetime | None = None,
+    limit: int | None = None,
+) -> AsyncIterator[list[EventResponse]]:
+    """
+    The events of get_available_events(), read through a server-side cursor
+    `chunk_size` rows at a time, so only one chunk is ever held in memory.
+    """
+    query = available_events_query(starts_after, starts_before, limit)
+    result = await session.stream(query.execution_options(yield_per=chunk_size))
+    async for rows in result.mappings().partitions():
+        yield [EventResponse(**event) for event in rows]
+
+
+async def get_available_event_details(
+    session: AsyncSession, event_ids: list[int]
+) -> dict[int, EventResponse]:
+    """
+    Open events (deadline not yet passed) by id, in one query for the whole
+    batch of RPC detail lookups; ids that don't match are left out.
+    """
     current_time = datetime.now()
 
     query = select(events).where(
-        and_(events.c.id == event_id, events.c.deadline > current_time)
+        and_(events.c.id.in_(event_ids), events.c.deadline > current_time)
     )
 
     try:
         result = await session.execute(query)
-        event = result.mappings().fetchone()
-
-        if event is None:
-            logger.warning(
-                f"Event with ID {event_id} not found or deadline has passed."
-            )
-            return None
-
-        return EventResponse(**event)
+        return {event["id"]: EventResponse(**event) for event in result.mappings()}
 
     except SQLAlchemyError as e:
         logger.error(
-            f"Database error while fetching available event detail: {e}", exc_info=True
+            f"Database error while fetching available event details: {e}",
+            exc_info=True,
         )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -119,6 +245,21 @@ async def get_available_event_detail(
         )
 
 
+async def send_odds_update(event: Dict[str, Any]) -> None:
+    """Tells bet-maker an open event's odds moved, so it re-prices cash-outs."""
+    odds_data = {
+        "event_id": event["id"],
+        "coef_1st_team_win": str(event["coef_1st_team_win"]),
+        "coef_2nd_team_win": str(event["coef_2nd_team_win"]),
+    }
+    try:
+        await send_message(
+            "event-odds-update", json.dumps(odds_data), EVENT_ODDS_QUEUE_NAME
+        )
+    except Exception as e:
+        logger.error(f"Failed to send odds update message: {e}", exc_info=True)
+
+
 async def update_event_crud(
     session: AsyncSession, event_id: int, event_update: EventUpdate
 ) -> EventResponse:
@@ -133,6 +274,10 @@ async def update_event_crud(
         )
 
     old_status = updating_event["status"]
+    old_odds = (
+        updating_event["coef_1st_team_win"],
+        updating_event["coef_2nd_team_win"],
+    )
     update_data = event_update.model_dump(exclude_unset=True)
 
     if "status" in update_data and update_data["status"] in (
@@ -181,6 +326,13 @@ async def update_event_crud(
                         f"Failed to send status update message: {e}", exc_info=True
                     )
 
+        new_odds = (
+            updated_event["coef_1st_team_win"],
+            updated_event["coef_2nd_team_win"],
+        )
+        if new_odds != old_odds and updated_event["status"] == EventStatus.NOT_FINISHED:
+            await send_odds_update(updated_event)
+
         return EventResponse(**updated_event)
 
     except SQLAlchemyError as e:
@@ -190,3 +342,87 @@ async def update_event_crud(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Database error occurred",
         )
+
+
+async def settle_events_crud(
+    session: AsyncSession, results: list[EventResult]
+) -> list[EventResponse]:
+    """
+    Applies a whole round of results with one UPDATE in one transaction and
+    announces every status change in a single combined broker message, so
+    bet-maker can settle the round together instead of event by event.
+    """
+    new_statuses = {result.event_id: result.status for result in results}
+    if not new_statuses:
+        return []
+
+    lock_query = (
+        select(events.c.id, events.c.status)
+        .where(events.c.id.in_(new_statuses))
+        .with_for_update()
+    )
+    result = await session.execute(lock_query)
+    old_statuses = dict(result.all())
+
+    missing_ids = sorted(set(new_statuses) - set(old_statuses))
+    if missing_ids:
+        logger.error(f"Events with ids {missing_ids} not found")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Events not found: {missing_ids}",
+        )
+
+    finished_deadlines = {
+        event_id: datetime.now()
+        for event_id, new_status in new_statuses.items()
+        if new_status in (EventStatus.FIRST_TEAM_WON, EventStatus.SECOND_TEAM_WON)
+    }
+
+    values = {
+        "status": cast(case(new_statuses, value=events.c.id), events.c.status.type)
+    }
+    if finished_deadlines:
+        values["deadline"] = case(
+            finished_deadlines, value=events.c.id, else_=events.c.deadline
+        )
+
+    try:
+        update_query = (
+            update(events)
+            .where(events.c.id.in_(new_statuses))
+            .values(**values)
+            .returning(events)
+        )
+
+        result = await session.execute(update_query)
+        await session.commit()
+        updated_events = sorted(result.mappings().fetchall(), key=lambda e: e["id"])
+
+    except SQLAlchemyError as e:
+        await session.rollback()
+        logger.error(f"Database error while settling events: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred",
+        )
+
+    changed_events = [
+        {"event_id": event["id"], "new_status": event["status"]}
+        for event in updated_events
+        if old_statuses[event["id"]] != event["status"]
+    ]
+
+    if changed_events:
+        logger.info(
+            "Sending batched status update message for %d events", len(changed_events)
+        )
+        try:
+            await send_message(
+                "bet-status-update",
+                json.dumps({"events": changed_events}),
+                "event_updates_queue",
+            )
+        except Exception as e:
+            logger.error(f"Failed to send status update message: {e}", exc_info=True)
+
+    return [EventResponse(**event) for event in updated_events]
@@ -0,0 +1,80 @@
+"""
+Event-loop watchdog. A task on the loop sleeps LOOP_LAG_CHECK_INTERVAL at a
+time and records how late it wakes up as the "event_loop_lag" histogram in
+GET /metrics. A thread watches that task's heartbeat. When the loop hasn't
+come round for LOOP_BLOCK_THRESHOLD seconds, the thread logs the loop
+thread's stack as it is at that moment, which is the code blocking the loop.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from . import metrics
+from .config import LOOP_BLOCK_THRESHOLD, LOOP_LAG_CHECK_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+class LoopWatchdog:
+    def __init__(self, interval: float, block_threshold: float):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self.blocked_count = 0
+
+    async def measure_lag(self) -> None:
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - started_at - self.interval
+            self.heartbeat = time.monotonic()
+            metrics.observe("event_loop_lag", max(lag, 0.0))
+
+    def blocked_for(self) -> float:
+        return time.monotonic() - self.heartbeat - self.interval
+
+    def report_blocking(self, blocked_for: float) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        self.blocked_count += 1
+        logger.warning(
+            "Event loop blocked for %.0fms, at:\n%s",
+            blocked_for * 1000,
+            "".join(traceback.format_stack(frame)),
+        )
+
+    def watch(self, stop: threading.Event) -> None:
+        # One report per stall: the heartbeat it was seen at is remembered.
+        reported_heartbeat = None
+        while not stop.wait(self.block_threshold / 2):
+            blocked_for = self.blocked_for()
+            if (
+                blocked_for >= self.block_threshold
+                and reported_heartbeat != self.heartbeat
+            ):
+                reported_heartbeat = self.heartbeat
+                self.report_blocking(blocked_for)
+
+
+async def monitor_loop(
+    interval: float = LOOP_LAG_CHECK_INTERVAL,
+    block_threshold: float = LOOP_BLOCK_THRESHOLD,
+) -> None:
+    """Runs the watchdog on the current loop until cancelled."""
+    watchdog = LoopWatchdog(interval, block_threshold)
+    stop = threading.Event()
+    if block_threshold > 0:
+        threading.Thread(
+            target=watchdog.watch, args=(stop,), name="loop-watchdog", daemon=True
+        ).start()
+
+    try:
+        await watchdog.measure_lag()
+    finally:
+        stop.set()
@@ -1,11 +1,15 @@
 import asyncio
 import logging
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 
+from . import loop_monitor, metrics, profiling, readiness
+from .config import RUN_CONSUMER_IN_APP
 from .consumers import consume
-from .router import events_router
+from .database import pin_reads_to_primary
+from .logging_config import setup_logging
+from .router import debug_router, events_router, internal_router
 
 app = FastAPI(title="Line Provider", root_path="/line-provider")
 
@@ -22,25 +26,67 @@ app.add_middleware(
 )
 
 app.include_router(events_router, prefix="/events", tags=["events"])
+app.include_router(internal_router, prefix="/internal", tags=["internal"])
+app.include_router(debug_router, prefix="/debug", tags=["debug"])
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()],
-)
+setup_logging()
 
 logger = logging.getLogger(__name__)
 
 
+@app.middleware("http")
+async def trace_slow_requests(request: Request, call_next):
+    trace = profiling.RequestTrace(request.method, request.url.path)
+    token = profiling.current_trace.set(trace)
+    try:
+        response = await call_next(request)
+    finally:
+        profiling.current_trace.reset(token)
+    route = getattr(request.scope.get("route"), "path", request.url.path)
+    profiling.finish_trace(trace, route, response.status_code)
+    return response
+
+
+@app.middleware("http")
+async def pin_reads_after_writes(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        pin_reads_to_primary(response)
+    return response
+
+
 @app.get("/health", tags=["health"])
 async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/ready", tags=["health"])
+async def readiness_check(response: Response):
+    if not readiness.is_ready():
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "warming up", "components": readiness.components}
+    return {"status": "ready", "components": readiness.components}
+
+
+@app.get("/metrics", tags=["health"])
+async def rpc_metrics():
+    """
+    Latency of the RPC requests served by this process's consumer, and of
+    its event loop.
+    """
+    return metrics.snapshot()
+
+
 @app.on_event("startup")
 async def startup_event():
-    asyncio.create_task(consume())
-    logger.info("RabbitMQ consumer started.")
+    readiness.expect("database", "broker", "events")
+    asyncio.create_task(loop_monitor.monitor_loop())
+    if RUN_CONSUMER_IN_APP:
+        readiness.expect("consumer")
+        asyncio.create_task(consume())
+        logger.info("RabbitMQ consumer started.")
+
+    asyncio.create_task(readiness.warm_up())
 
 
 @app.on_event("shutdown")
@@ -0,0 +1,81 @@
+"""
+In-process latency metrics: one histogram per RPC request type, plus the
+event loop's lag. Served by GET /metrics, and logged periodically by the
+standalone worker.
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+# Bucket upper bounds in milliseconds; quantiles are reported as the upper
+# bound of the bucket they fall in.
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, math.inf)
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        milliseconds = seconds * 1000
+        self.counts[bisect.bisect_left(BUCKETS_MS, milliseconds)] += 1
+        self.count += 1
+        self.total_ms += milliseconds
+        self.max_ms = max(self.max_ms, milliseconds)
+
+    def quantile(self, q: float) -> float:
+        rank = math.ceil(q * self.count)
+        seen = 0
+        for bound, bucket_count in zip(BUCKETS_MS, self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return round(min(bound, self.max_ms), 3)
+        return round(self.max_ms, 3)
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+histograms: defaultdict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+
+
+def observe(name: str, seconds: float) -> None:
+    histograms[name].observe(seconds)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started_at)
+
+
+def snapshot() -> dict[str, dict]:
+    return {name: histogram.snapshot() for name, histogram in histograms.items()}
+
+
+async def log_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        for name, stats in snapshot().items():
+            logger.info(f"Latency {name}: {stats}")
@@ -1,11 +1,33 @@
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import TIMESTAMP, Column, Enum, Integer, Numeric, String, Table
+from sqlalchemy import (
+    TIMESTAMP,
+    Column,
+    Enum,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Table,
+    literal_column,
+    text,
+)
 
 from .database import metadata
 from .schemas import EventStatus
 
+# Full-text document searched by GET /events/search. Queries use this exact
+# expression (search_document below) so the planner matches it to the index.
+SEARCH_DOCUMENT_SQL = (
+    "to_tsvector('simple'::regconfig, name || ' ' || coalesce(description, ''))"
+)
+
+# Predicate of the partial ix_events_open_deadline index. Queries use it as
+# a literal (not_finished below): with a bound parameter, a generic plan
+# couldn't prove it matches the index.
+NOT_FINISHED_SQL = "status = 'NOT_FINISHED'"
+
 events = Table(
     "events",
     metadata,
@@ -17,4 +39,15 @@ events = Table(
     Column("timestamp", TIMESTAMP(timezone=True), default=datetime.now, nullable=False),
     Column("deadline", TIMESTAMP(timezone=True), nullable=False),
     Column("status", Enum(EventStatus), default=EventStatus.NOT_FINISHED),
+    Index("ix_events_search", text(SEARCH_DOCUMENT_SQL), postgresql_using="gin"),
+    # Open events by deadline. Finished events, the bulk of the table, are
+    # left out, so the index stays the size of the upcoming schedule.
+    Index(
+        "ix_events_open_deadline",
+        "deadline",
+        postgresql_where=text(NOT_FINISHED_SQL),
+    ),
 )
+
+search_document = literal_column(SEARCH_DOCUMENT_SQL)
+not_finished = text(NOT_FINISHED_SQL)
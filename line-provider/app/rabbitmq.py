@@ -1,12 +1,19 @@
 import asyncio
+import json
 import logging
 from datetime import datetime
 from decimal import Decimal
-from typing import Union
+from typing import Any, Union
 
 from aio_pika import Connection, ExchangeType, Message, connect_robust
 
-from .config import EXCHANGE_NAME, RABBITMQ_HOST, RABBITMQ_PASS, RABBITMQ_USER
+from .config import (
+    EXCHANGE_NAME,
+    OFFLOAD_SERIALIZATION_MIN_ITEMS,
+    RABBITMQ_HOST,
+    RABBITMQ_PASS,
+    RABBITMQ_USER,
+)
 
 RABBITMQ_URL = f"amqp://{RABBITMQ_USER}:{RABBITMQ_PASS}@{RABBITMQ_HOST}/"
 
@@ -34,6 +41,22 @@ async def connect_with_retry(max_attempts: int = 10, delay: float = 3.0) -> Conn
             await asyncio.sleep(delay)
 
 
+_shared_connection: Connection | None = None
+_shared_connection_lock = asyncio.Lock()
+
+
+async def get_shared_connection() -> Connection:
+    """
+    One robust connection per process for publishing; each message only
+    opens a channel on it instead of a whole new connection.
+    """
+    global _shared_connection
+    async with _shared_connection_lock:
+        if _shared_connection is None or _shared_connection.is_closed:
+            _shared_connection = await get_rabbit_connection()
+        return _shared_connection
+
+
 def custom_json_serializer(obj):
     if isinstance(obj, Decimal):
         return str(obj)
@@ -43,26 +66,49 @@ def custom_json_serializer(obj):
     raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
 
 
+def is_large(payload: Any) -> bool:
+    """Whether serializing `payload` is worth moving off the event loop."""
+    return (
+        isinstance(payload, list)
+        and OFFLOAD_SERIALIZATION_MIN_ITEMS > 0
+        and len(payload) >= OFFLOAD_SERIALIZATION_MIN_ITEMS
+    )
+
+
+def dump_models(models: list) -> list[dict]:
+    return [model.model_dump() for model in models]
+
+
+def encode_json(payload: Any) -> bytes:
+    return json.dumps(payload, default=custom_json_serializer).encode()
+
+
+async def offload_if_large(payload: list, func, *args):
+    """Runs func(*args) on a worker thread if `payload` is large, inline otherwise."""
+    if is_large(payload):
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
+
+
 async def send_message(
     routing_key: str,
     message: Union[str, bytes],
     queue_name: str,
     correlation_id: str = None,
 ) -> None:
-    connection = await get_rabbit_connection()
-    async with connection:
-        async with connection.channel() as channel:
-            exchange = await channel.declare_exchange(
-                EXCHANGE_NAME, ExchangeType.DIRECT, durable=True
-            )
+    connection = await get_shared_connection()
+    async with connection.channel() as channel:
+        exchange = await channel.declare_exchange(
+            EXCHANGE_NAME, ExchangeType.DIRECT, durable=True
+        )
 
-            queue = await channel.declare_queue(queue_name, durable=True)
-            await queue.bind(exchange, routing_key=routing_key)
+        queue = await channel.declare_queue(queue_name, durable=True)
+        await queue.bind(exchange, routing_key=routing_key)
 
-            await exchange.publish(
-                Message(
-                    body=message.encode() if isinstance(message, str) else message,
-                    correlation_id=correlation_id,
-                ),
-                routing_key=routing_key,
-            )
+        await exchange.publish(
+            Message(
+                body=message.encode() if isinstance(message, str) else message,
+                correlation_id=correlation_id,
+            ),
+            routing_key=routing_key,
+        )
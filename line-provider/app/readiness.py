@@ -0,0 +1,72 @@
+"""
+Readiness state behind GET /ready. Startup registers the components an
+instance needs warm before it should take traffic; /ready reports 503 until
+each of them has been marked ready, while /health stays a plain liveness probe.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from aio_pika import ExchangeType
+
+from .config import EXCHANGE_NAME
+from .crud import get_available_events
+from .database import get_replica_session, warm_up_pools
+from .rabbitmq import get_shared_connection
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY = 2.0
+
+components: dict[str, bool] = {}
+
+
+def expect(*names: str) -> None:
+    for name in names:
+        components.setdefault(name, False)
+
+
+def mark_ready(name: str) -> None:
+    components[name] = True
+    logger.info(f"{name} is ready")
+
+
+def is_ready() -> bool:
+    return all(components.values())
+
+
+async def warm_up_component(name: str, warm_up: Callable[[], Awaitable[None]]) -> None:
+    """Retries `warm_up` until it succeeds, then marks `name` ready."""
+    while True:
+        try:
+            await warm_up()
+            break
+        except Exception as e:
+            logger.warning(f"Warming up {name} failed, retrying: {e}")
+            await asyncio.sleep(RETRY_DELAY)
+    mark_ready(name)
+
+
+async def warm_up_publisher() -> None:
+    connection = await get_shared_connection()
+    async with connection.channel() as channel:
+        await channel.declare_exchange(EXCHANGE_NAME, ExchangeType.DIRECT, durable=True)
+
+
+async def warm_up_open_events() -> None:
+    """
+    Runs the open-events query once, so the pages it reads are in Postgres'
+    buffer cache and its prepared statement exists before the first RPC.
+    """
+    async for session in get_replica_session():
+        if await get_available_events(session) is None:
+            raise RuntimeError("Failed to load available events")
+
+
+async def warm_up() -> None:
+    await asyncio.gather(
+        warm_up_component("database", warm_up_pools),
+        warm_up_component("broker", warm_up_publisher),
+    )
+    await warm_up_component("events", warm_up_open_events)
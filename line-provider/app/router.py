@@ -1,16 +1,97 @@
+import hashlib
 import logging
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .crud import create_event_crud, get_all_events_crud, update_event_crud
-from .database import get_async_session
-from .schemas import EventCreate, EventResponse, EventUpdate
+from . import autocomplete, metrics, profiling
+from .config import BULK_INSERT_CHUNK_SIZE, EVENT_STREAM_CHUNK_SIZE, PROFILE_MAX_SECONDS
+from .crud import (
+    bulk_create_events_crud,
+    create_event_crud,
+    get_all_events_crud,
+    get_available_event_details,
+    get_available_events,
+    iter_available_events,
+    search_events_crud,
+    settle_events_crud,
+    update_event_crud,
+)
+from .database import get_async_session, get_read_session
+from .rabbitmq import dump_models, encode_json, offload_if_large
+from .schemas import (
+    EventBulkCreateResponse,
+    EventCreate,
+    EventResponse,
+    EventResult,
+    EventSuggestion,
+    EventUpdate,
+)
 
 events_router = APIRouter()
+# Service-to-service reads for bet-maker's HTTP transport; same payloads as
+# the RabbitMQ RPC replies.
+internal_router = APIRouter()
+# Production diagnostics, only served when DEBUG_TOKEN is set.
+debug_router = APIRouter(dependencies=[Depends(profiling.require_debug_token)])
 
 logger = logging.getLogger(__name__)
 
+event_list_adapter = TypeAdapter(list[EventCreate])
+
+
+async def iter_json_array_batches(request: Request) -> AsyncIterator[list[EventCreate]]:
+    try:
+        event_list = event_list_adapter.validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+
+    for start in range(0, len(event_list), BULK_INSERT_CHUNK_SIZE):
+        yield event_list[start : start + BULK_INSERT_CHUNK_SIZE]
+
+
+async def iter_ndjson_batches(request: Request) -> AsyncIterator[list[EventCreate]]:
+    """
+    Validates NDJSON records as the body streams in, so a large import is
+    inserted chunk by chunk instead of being buffered whole in memory.
+    """
+    batch = []
+    buffer = b""
+    line_number = 0
+
+    def parse_lines(lines: list[bytes]) -> None:
+        nonlocal line_number
+        for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                batch.append(EventCreate.model_validate_json(line))
+            except ValidationError as e:
+                raise RequestValidationError(
+                    [
+                        {**error, "loc": ("body", line_number, *error["loc"])}
+                        for error in e.errors(include_url=False)
+                    ]
+                )
+
+    async for chunk in request.stream():
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        parse_lines(lines)
+        if len(batch) >= BULK_INSERT_CHUNK_SIZE:
+            yield batch
+            batch = []
+
+    parse_lines([buffer])
+    if batch:
+        yield batch
+
 
 @events_router.post(
     "/", response_model=EventResponse, status_code=status.HTTP_201_CREATED
@@ -19,7 +100,9 @@ async def create_event(
     event: EventCreate, session: AsyncSession = Depends(get_async_session)
 ):
     try:
-        return await create_event_crud(session, event)
+        created_event = await create_event_crud(session, event)
+        autocomplete.invalidate()
+        return created_event
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -32,9 +115,56 @@ async def create_event(
         )
 
 
+@events_router.post(
+    "/bulk",
+    response_model=EventBulkCreateResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def bulk_create_events(
+    request: Request, session: AsyncSession = Depends(get_async_session)
+):
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        event_batches = iter_ndjson_batches(request)
+    else:
+        event_batches = iter_json_array_batches(request)
+
+    try:
+        created_ids = await bulk_create_events_crud(session, event_batches)
+        autocomplete.invalidate()
+        return EventBulkCreateResponse(ids=created_ids)
+    except (HTTPException, RequestValidationError) as e:
+        raise e
+    except Exception as e:
+        logger.error(
+            f"Unexpected error occurred while bulk creating events: {e}", exc_info=True
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred",
+        )
+
+
+@events_router.post("/results", response_model=list[EventResponse])
+async def settle_events(
+    results: list[EventResult], session: AsyncSession = Depends(get_async_session)
+):
+    try:
+        settled_events = await settle_events_crud(session, results)
+        autocomplete.invalidate()
+        return settled_events
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Unexpected error while settling events: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred",
+        )
+
+
 @events_router.get("/", response_model=list[EventResponse])
 async def get_all_events(
-    offset: int = 0, limit: int = 10, session: AsyncSession = Depends(get_async_session)
+    offset: int = 0, limit: int = 10, session: AsyncSession = Depends(get_read_session)
 ):
     try:
         return await get_all_events_crud(session, offset, limit)
@@ -50,6 +180,43 @@ async def get_all_events(
         )
 
 
+@events_router.get("/search", response_model=list[EventResponse])
+async def search_events(
+    q: str = Query(..., min_length=1, max_length=200),
+    open_only: bool = False,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(10, gt=0, le=100),
+    session: AsyncSession = Depends(get_read_session),
+):
+    try:
+        return await search_events_crud(session, q, open_only, offset, limit)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Unexpected error while searching events: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred",
+        )
+
+
+@events_router.get("/autocomplete", response_model=list[EventSuggestion])
+async def autocomplete_events(
+    prefix: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, gt=0, le=50),
+    session: AsyncSession = Depends(get_read_session),
+):
+    try:
+        index = await autocomplete.get_index(session)
+        return index.complete(prefix, limit)
+    except Exception as e:
+        logger.error(f"Unexpected error during autocomplete: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred",
+        )
+
+
 @events_router.put("/{event_id}", response_model=EventResponse)
 async def update_event(
     event_id: int,
@@ -57,7 +224,9 @@ async def update_event(
     session: AsyncSession = Depends(get_async_session),
 ):
     try:
-        return await update_event_crud(session, event_id, event_update)
+        updated_event = await update_event_crud(session, event_id, event_update)
+        autocomplete.invalidate()
+        return updated_event
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -68,3 +237,122 @@ async def update_event(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred",
         )
+
+
+async def etag_response(request: Request, payload: Any) -> Response:
+    """
+    Serializes `payload` the way RPC replies are serialized and answers 304
+    when the client already holds this exact body (If-None-Match).
+    """
+    body = await offload_if_large(payload, encode_json, payload)
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    if_none_match = request.headers.get("if-none-match", "")
+    client_etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in client_etags or "*" in client_etags:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+@internal_router.get("/events/available", response_model=list[EventResponse])
+async def internal_available_events(
+    request: Request,
+    starts_after: Optional[datetime] = None,
+    starts_before: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, gt=0, le=1000),
+    session: AsyncSession = Depends(get_read_session),
+):
+    with metrics.timed("http:get_available_events"):
+        events = await get_available_events(session, starts_after, starts_before, limit)
+    if events is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error during getting available events occurred.",
+        )
+
+    return await etag_response(
+        request, await offload_if_large(events, dump_models, events)
+    )
+
+
+@internal_router.get("/events/stream", response_model=list[EventResponse])
+async def internal_stream_available_events(
+    request: Request,
+    starts_after: Optional[datetime] = None,
+    starts_before: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, gt=0, le=1000),
+):
+    """
+    The open-events list as NDJSON, one line per chunk of at most
+    EVENT_STREAM_CHUNK_SIZE events (a JSON array). A failure part-way ends
+    the stream with an {"error": ...} line.
+    """
+
+    async def chunk_lines() -> AsyncIterator[bytes]:
+        try:
+            # Opened here rather than as a dependency, which would be closed
+            # once the route returns, before the body is sent.
+            async for session in get_read_session(request):
+                async for chunk in iter_available_events(
+                    session, EVENT_STREAM_CHUNK_SIZE, starts_after, starts_before, limit
+                ):
+                    yield encode_json(dump_models(chunk)) + b"\n"
+        except Exception as e:
+            logger.error(f"Error while streaming available events: {e}", exc_info=True)
+            yield encode_json(
+                {"error": "Error during getting available events occurred."}
+            ) + b"\n"
+
+    return StreamingResponse(chunk_lines(), media_type="application/x-ndjson")
+
+
+@internal_router.get("/events/available/{event_id}", response_model=EventResponse)
+async def internal_available_event_detail(
+    event_id: int,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+):
+    # Prices a bet, so like the RPC detail lookup it reads the primary.
+    with metrics.timed("http:get_available_event_detail"):
+        found = await get_available_event_details(session, [event_id])
+    if event_id not in found:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found or deadline has passed",
+        )
+
+    return await etag_response(request, found[event_id].model_dump())
+
+
+@debug_router.get("/profile", response_class=PlainTextResponse)
+async def capture_profile(
+    seconds: float = Query(10, gt=0, le=PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=1000),
+):
+    """
+    Samples this process's event loop for `seconds` and returns collapsed
+    stacks, for flamegraph.pl or speedscope.
+    """
+    if profiling.profile_lock.locked():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already being captured.",
+        )
+
+    async with profiling.profile_lock:
+        collapsed = await profiling.profile(seconds, interval_ms / 1000)
+
+    filename = f"profile-{int(time.time())}.folded"
+    return PlainTextResponse(
+        collapsed,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@debug_router.get("/slow-requests")
+async def slow_requests():
+    """The most recent requests over SLOW_REQUEST_THRESHOLD_MS, newest last."""
+    return list(profiling.slow_requests)
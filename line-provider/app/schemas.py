@@ -40,3 +40,30 @@ class EventResponse(BaseModel):
     timestamp: datetime
     deadline: datetime
     status: EventStatus
+
+
+class EventWindow(BaseModel):
+    """
+    Optional narrowing of the open-events list (RPC and GET
+    /internal/events/available) to deadlines in [starts_after, starts_before),
+    soonest first, at most `limit` of them.
+    """
+
+    starts_after: Optional[datetime] = None
+    starts_before: Optional[datetime] = None
+    limit: Optional[int] = Field(None, gt=0, le=1000)
+
+
+class EventSuggestion(BaseModel):
+    id: int
+    name: str
+    deadline: datetime
+
+
+class EventResult(BaseModel):
+    event_id: int
+    status: EventStatus
+
+
+class EventBulkCreateResponse(BaseModel):
+    ids: list[int]
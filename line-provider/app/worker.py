@@ -0,0 +1,44 @@
+"""
+Standalone consumer process, started with `python -m app.worker`.
+
+Runs the RabbitMQ consumer without the HTTP app, so consumers can be scaled
+independently of the (possibly multi-worker) web containers.
+"""
+
+import asyncio
+import logging
+import signal
+
+from . import loop_monitor, metrics
+from .config import METRICS_LOG_INTERVAL
+from .consumers import consume
+from .logging_config import setup_logging
+
+setup_logging()
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    consumer = asyncio.create_task(consume())
+    loop_watchdog = asyncio.create_task(loop_monitor.monitor_loop())
+    consumer.add_done_callback(lambda _: loop_watchdog.cancel())
+    if METRICS_LOG_INTERVAL > 0:
+        metrics_logger = asyncio.create_task(
+            metrics.log_periodically(METRICS_LOG_INTERVAL)
+        )
+        consumer.add_done_callback(lambda _: metrics_logger.cancel())
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, consumer.cancel)
+
+    logger.info("Worker started.")
+    try:
+        await consumer
+    except asyncio.CancelledError:
+        logger.info("Worker is shutting down.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
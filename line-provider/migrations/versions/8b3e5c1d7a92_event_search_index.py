@@ -0,0 +1,37 @@
+"""Event search index
+
+Revision ID: 8b3e5c1d7a92
+Revises: 4fce4bc20dc1
+Create Date: 2026-10-19 10:12:41.208113
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8b3e5c1d7a92"
+down_revision: Union[str, None] = "4fce4bc20dc1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_events_search",
+        "events",
+        [
+            sa.text(
+                "to_tsvector('simple'::regconfig, "
+                "name || ' ' || coalesce(description, ''))"
+            )
+        ],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_search", table_name="events", postgresql_using="gin")
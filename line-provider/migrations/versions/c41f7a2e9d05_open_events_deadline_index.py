@@ -0,0 +1,36 @@
+"""Open events deadline index
+
+Revision ID: c41f7a2e9d05
+Revises: 8b3e5c1d7a92
+Create Date: 2026-10-19 11:04:17.552390
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c41f7a2e9d05"
+down_revision: Union[str, None] = "8b3e5c1d7a92"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_events_open_deadline",
+        "events",
+        ["deadline"],
+        unique=False,
+        postgresql_where=sa.text("status = 'NOT_FINISHED'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_events_open_deadline",
+        table_name="events",
+        postgresql_where=sa.text("status = 'NOT_FINISHED'"),
+    )
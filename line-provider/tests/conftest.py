@@ -5,7 +5,7 @@ from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import NullPool
 
-from app.database import DATABASE_URL, get_async_session, metadata
+from app.database import DATABASE_URL, get_async_session, get_read_session, metadata
 from app.main import app
 
 
@@ -38,6 +38,7 @@ async def client(session) -> AsyncGenerator[AsyncClient, None]:
         yield session
 
     app.dependency_overrides[get_async_session] = override_get_async_session
+    app.dependency_overrides[get_read_session] = override_get_async_session
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
@@ -0,0 +1,207 @@
+import asyncio
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from pamqp.commands import Basic
+
+from app import consumers, crud, metrics
+from app.consumers import DetailLookupBatcher, handle_request
+
+
+def event_payload(name: str, deadline: datetime) -> dict:
+    return {
+        "name": name,
+        "coef_1st_team_win": "1.50",
+        "coef_2nd_team_win": "2.50",
+        "deadline": deadline.isoformat(),
+    }
+
+
+async def test_detail_lookups_are_batched_into_one_query(client, session, monkeypatch):
+    async def override_get_async_session():
+        yield session
+
+    monkeypatch.setattr(consumers, "get_async_session", override_get_async_session)
+
+    queries = []
+    get_available_event_details = crud.get_available_event_details
+
+    async def counting_get_details(session, event_ids):
+        queries.append(sorted(event_ids))
+        return await get_available_event_details(session, event_ids)
+
+    monkeypatch.setattr(consumers, "get_available_event_details", counting_get_details)
+
+    future = datetime.now() + timedelta(days=1)
+    past = datetime.now() - timedelta(days=1)
+    open_id = (
+        await client.post("/events/", json=event_payload("Open", future))
+    ).json()["id"]
+    closed_id = (
+        await client.post("/events/", json=event_payload("Closed", past))
+    ).json()["id"]
+
+    batcher = DetailLookupBatcher(window=0.01, max_size=100)
+    results = await asyncio.gather(
+        batcher.lookup(open_id), batcher.lookup(open_id), batcher.lookup(closed_id)
+    )
+
+    assert queries == [sorted([open_id, closed_id])]
+    assert [event.id if event else None for event in results] == [
+        open_id,
+        open_id,
+        None,
+    ]
+
+
+async def test_invalid_detail_lookup_skips_the_database():
+    response = await handle_request(
+        {"request": "get_available_event_detail", "event_id": "not-an-id"}
+    )
+
+    assert response == {"error": "Event not found or deadline has passed"}
+
+
+def test_latency_histogram_quantiles():
+    histogram = metrics.LatencyHistogram()
+    for milliseconds in [1] * 90 + [40] * 9 + [700]:
+        histogram.observe(milliseconds / 1000)
+
+    stats = histogram.snapshot()
+
+    assert stats["count"] == 100
+    assert stats["p50_ms"] == 1
+    assert stats["p95_ms"] == 50
+    assert stats["p99_ms"] == 50
+    assert stats["max_ms"] == 700
+
+
+async def test_unknown_request_types_share_one_histogram(monkeypatch):
+    monkeypatch.setattr(metrics, "histograms", defaultdict(metrics.LatencyHistogram))
+    channel = MagicMock()
+    channel.default_exchange.publish = AsyncMock()
+
+    for request_type in ("drop_tables", "get_everything", None):
+        message = MagicMock(reply_to="reply-queue")
+        message.body = json.dumps({"request": request_type}).encode()
+        await consumers.process_request_message(message, channel)
+
+    assert list(metrics.histograms) == ["unknown"]
+    assert metrics.histograms["unknown"].count == 3
+    channel.default_exchange.publish.assert_not_awaited()
+
+
+async def test_large_event_lists_are_serialized_off_the_loop(client, monkeypatch):
+    future = datetime.now() + timedelta(days=1)
+    for name in ("First", "Second"):
+        await client.post("/events/", json=event_payload(name, future))
+
+    threads = []
+    to_thread = asyncio.to_thread
+
+    async def recording_to_thread(func, *args):
+        threads.append(func.__name__)
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr("app.rabbitmq.OFFLOAD_SERIALIZATION_MIN_ITEMS", 2)
+    monkeypatch.setattr("app.rabbitmq.asyncio.to_thread", recording_to_thread)
+
+    response = await client.get("/internal/events/available")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert threads == ["dump_models", "encode_json"]
+
+
+async def test_event_list_request_honours_time_window(client, session, monkeypatch):
+    async def override_get_replica_session():
+        yield session
+
+    monkeypatch.setattr(consumers, "get_replica_session", override_get_replica_session)
+
+    now = datetime.now()
+    for name, hours in (("Tonight", 3), ("Next week", 24 * 7)):
+        await client.post(
+            "/events/", json=event_payload(name, now + timedelta(hours=hours))
+        )
+
+    response = await handle_request(
+        {
+            "request": "get_available_events",
+            "starts_before": (now + timedelta(hours=6)).isoformat(),
+            "limit": 10,
+        }
+    )
+    assert [event["name"] for event in response] == ["Tonight"]
+
+    response = await handle_request({"request": "get_available_events", "limit": -1})
+    assert response == {"error": "Invalid event window."}
+
+
+async def test_streamed_event_list_is_sent_in_numbered_chunks(
+    client, session, monkeypatch
+):
+    async def override_get_replica_session():
+        yield session
+
+    monkeypatch.setattr(consumers, "get_replica_session", override_get_replica_session)
+    monkeypatch.setattr(consumers, "EVENT_STREAM_CHUNK_SIZE", 2)
+
+    now = datetime.now()
+    for hours in (1, 2, 3):
+        await client.post(
+            "/events/",
+            json=event_payload(f"Event {hours}", now + timedelta(hours=hours)),
+        )
+
+    channel = MagicMock()
+    channel.default_exchange.publish = AsyncMock(return_value=Basic.Ack())
+    message = MagicMock(correlation_id="abc", reply_to="reply-queue")
+
+    await consumers.stream_available_events(
+        {"request": "get_available_events", "stream": True}, message, channel
+    )
+
+    replies = [
+        call.args[0] for call in channel.default_exchange.publish.await_args_list
+    ]
+    assert [reply.headers for reply in replies] == [
+        {"seq": 0, "end": False},
+        {"seq": 1, "end": False},
+        {"seq": 2, "end": True},
+    ]
+    assert [
+        [event["name"] for event in json.loads(reply.body)] for reply in replies
+    ] == [["Event 1", "Event 2"], ["Event 3"], []]
+    assert {reply.correlation_id for reply in replies} == {"abc"}
+
+
+async def test_stream_stops_once_the_reply_queue_is_gone(client, session, monkeypatch):
+    async def override_get_replica_session():
+        yield session
+
+    monkeypatch.setattr(consumers, "get_replica_session", override_get_replica_session)
+    monkeypatch.setattr(consumers, "EVENT_STREAM_CHUNK_SIZE", 1)
+
+    now = datetime.now()
+    for hours in (1, 2, 3):
+        await client.post(
+            "/events/",
+            json=event_payload(f"Event {hours}", now + timedelta(hours=hours)),
+        )
+
+    # A mandatory publish to a deleted reply queue is confirmed with the
+    # returned message instead of an ack.
+    channel = MagicMock()
+    channel.default_exchange.publish = AsyncMock(return_value=MagicMock())
+    message = MagicMock(correlation_id="abc", reply_to="reply-queue")
+
+    await consumers.stream_available_events(
+        {"request": "get_available_events", "stream": True}, message, channel
+    )
+
+    channel.default_exchange.publish.assert_awaited_once()
+    assert channel.default_exchange.publish.await_args.kwargs["mandatory"] is True
+    assert not consumers.stream_slots.locked()
@@ -1,6 +1,9 @@
+import json
 from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock
 
+from app.config import EVENT_ODDS_QUEUE_NAME
+
 FUTURE_DEADLINE = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
 
 
@@ -70,3 +73,120 @@ async def test_update_event_status_forces_deadline_and_notifies(client, monkeypa
         FUTURE_DEADLINE
     ) - timedelta(hours=1)
     send_message_mock.assert_awaited_once()
+
+
+async def test_update_event_odds_notifies_odds_queue(client, monkeypatch):
+    send_message_mock = AsyncMock()
+    monkeypatch.setattr("app.crud.send_message", send_message_mock)
+
+    create_response = await client.post(
+        "/events/",
+        json={"name": "Event 4", "deadline": FUTURE_DEADLINE},
+    )
+    event_id = create_response.json()["id"]
+
+    await client.put(f"/events/{event_id}", json={"coef_1st_team_win": "1.85"})
+    await client.put(f"/events/{event_id}", json={"name": "Event 4 renamed"})
+
+    send_message_mock.assert_awaited_once()
+    routing_key, body, queue_name = send_message_mock.await_args.args
+    assert routing_key == "event-odds-update"
+    assert queue_name == EVENT_ODDS_QUEUE_NAME
+    assert json.loads(body)["coef_1st_team_win"] == "1.85"
+
+
+async def test_bulk_create_events_json_array(client):
+    response = await client.post(
+        "/events/bulk",
+        json=[{"name": f"Bulk {i}", "deadline": FUTURE_DEADLINE} for i in range(3)],
+    )
+
+    assert response.status_code == 201
+    ids = response.json()["ids"]
+    assert len(ids) == 3
+    assert ids == sorted(ids)
+
+
+async def test_bulk_create_events_ndjson(client):
+    lines = [
+        json.dumps({"name": f"Stream {i}", "deadline": FUTURE_DEADLINE})
+        for i in range(5)
+    ]
+
+    response = await client.post(
+        "/events/bulk",
+        content="\n".join(lines) + "\n",
+        headers={"content-type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 201
+    assert len(response.json()["ids"]) == 5
+
+    list_response = await client.get("/events/", params={"limit": 10})
+    assert [event["name"] for event in list_response.json()] == [
+        f"Stream {i}" for i in range(5)
+    ]
+
+
+async def test_bulk_create_events_invalid_record_rejects_import(client):
+    lines = [
+        json.dumps({"name": "Valid", "deadline": FUTURE_DEADLINE}),
+        json.dumps({"name": "Missing deadline"}),
+    ]
+
+    response = await client.post(
+        "/events/bulk",
+        content="\n".join(lines),
+        headers={"content-type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][:2] == ["body", 2]
+
+
+async def test_settle_events_sends_one_batched_message(client, monkeypatch):
+    send_message_mock = AsyncMock()
+    monkeypatch.setattr("app.crud.send_message", send_message_mock)
+
+    bulk_response = await client.post(
+        "/events/bulk",
+        json=[{"name": f"Round {i}", "deadline": FUTURE_DEADLINE} for i in range(3)],
+    )
+    first_id, second_id, third_id = bulk_response.json()["ids"]
+
+    response = await client.post(
+        "/events/results",
+        json=[
+            {"event_id": first_id, "status": "FIRST_TEAM_WON"},
+            {"event_id": second_id, "status": "SECOND_TEAM_WON"},
+            {"event_id": third_id, "status": "NOT_FINISHED"},
+        ],
+    )
+
+    assert response.status_code == 200
+    assert [event["status"] for event in response.json()] == [
+        "FIRST_TEAM_WON",
+        "SECOND_TEAM_WON",
+        "NOT_FINISHED",
+    ]
+
+    send_message_mock.assert_awaited_once()
+    message = json.loads(send_message_mock.await_args.args[1])
+    assert message == {
+        "events": [
+            {"event_id": first_id, "new_status": "FIRST_TEAM_WON"},
+            {"event_id": second_id, "new_status": "SECOND_TEAM_WON"},
+        ]
+    }
+
+
+async def test_settle_events_unknown_event(client, monkeypatch):
+    send_message_mock = AsyncMock()
+    monkeypatch.setattr("app.crud.send_message", send_message_mock)
+
+    response = await client.post(
+        "/events/results", json=[{"event_id": 999, "status": "FIRST_TEAM_WON"}]
+    )
+
+    assert response.status_code == 404
+    send_message_mock.assert_not_awaited()
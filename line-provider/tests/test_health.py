@@ -0,0 +1,20 @@
+async def test_health_is_live_while_warming_up(client, monkeypatch):
+    monkeypatch.setattr("app.readiness.components", {"database": False})
+
+    response = await client.get("/health")
+
+    assert response.status_code == 200
+
+
+async def test_ready_only_once_every_component_is_warm(client, monkeypatch):
+    components = {"database": True, "broker": False}
+    monkeypatch.setattr("app.readiness.components", components)
+
+    warming_up = await client.get("/ready")
+    components["broker"] = True
+    ready = await client.get("/ready")
+
+    assert warming_up.status_code == 503
+    assert warming_up.json()["components"] == {"database": True, "broker": False}
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "ready"
@@ -0,0 +1,133 @@
+import json
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+from sqlalchemy import func, text
+from sqlalchemy.future import select
+
+from app.models import events, not_finished
+
+
+def event_payload(name: str, deadline: datetime) -> dict:
+    return {
+        "name": name,
+        "coef_1st_team_win": "1.50",
+        "coef_2nd_team_win": "2.50",
+        "deadline": deadline.isoformat(),
+    }
+
+
+async def test_internal_event_detail_supports_conditional_requests(client, monkeypatch):
+    monkeypatch.setattr("app.crud.send_message", AsyncMock())
+    deadline = datetime.now() + timedelta(days=1)
+    created = await client.post("/events/", json=event_payload("Detail", deadline))
+    event_id = created.json()["id"]
+
+    response = await client.get(f"/internal/events/available/{event_id}")
+
+    assert response.status_code == 200
+    assert response.json()["coef_1st_team_win"] == "1.50"
+    etag = response.headers["etag"]
+
+    not_modified = await client.get(
+        f"/internal/events/available/{event_id}", headers={"If-None-Match": etag}
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    await client.put(f"/events/{event_id}", json={"coef_1st_team_win": "1.70"})
+    changed = await client.get(
+        f"/internal/events/available/{event_id}", headers={"If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+async def test_internal_event_detail_closed_event_not_found(client):
+    deadline = datetime.now() - timedelta(days=1)
+    created = await client.post("/events/", json=event_payload("Closed", deadline))
+
+    response = await client.get(f"/internal/events/available/{created.json()['id']}")
+
+    assert response.status_code == 404
+
+
+async def test_internal_available_events_etag(client):
+    deadline = datetime.now() + timedelta(days=1)
+    await client.post("/events/", json=event_payload("Listed", deadline))
+
+    response = await client.get("/internal/events/available")
+
+    assert response.status_code == 200
+    assert any(event["name"] == "Listed" for event in response.json())
+    repeat = await client.get(
+        "/internal/events/available",
+        headers={"If-None-Match": response.headers["etag"]},
+    )
+    assert repeat.status_code == 304
+
+
+async def test_internal_available_events_time_window(client):
+    now = datetime.now()
+    for name, hours in (("Later", 30), ("Soon", 2), ("Sooner", 1)):
+        await client.post(
+            "/events/", json=event_payload(name, now + timedelta(hours=hours))
+        )
+
+    response = await client.get(
+        "/internal/events/available",
+        params={"starts_before": (now + timedelta(hours=12)).isoformat()},
+    )
+    assert [event["name"] for event in response.json()] == ["Sooner", "Soon"]
+
+    response = await client.get(
+        "/internal/events/available",
+        params={"starts_after": (now + timedelta(hours=1, minutes=30)).isoformat()},
+    )
+    assert [event["name"] for event in response.json()] == ["Soon", "Later"]
+
+    response = await client.get("/internal/events/available", params={"limit": 1})
+    assert [event["name"] for event in response.json()] == ["Sooner"]
+
+    response = await client.get("/internal/events/available", params={"limit": 0})
+    assert response.status_code == 422
+
+
+async def test_available_events_use_partial_deadline_index(session):
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    query = (
+        select(events.c.id)
+        .where(not_finished, events.c.deadline > func.now())
+        .order_by(events.c.deadline)
+        .limit(10)
+    )
+    compiled = query.compile(compile_kwargs={"literal_binds": True})
+
+    plan = (await session.execute(text(f"EXPLAIN {compiled}"))).scalars().all()
+
+    assert any("ix_events_open_deadline" in line for line in plan)
+
+
+async def test_internal_event_stream_sends_ndjson_chunks(client, session, monkeypatch):
+    async def override_get_read_session(request):
+        yield session
+
+    monkeypatch.setattr("app.router.get_read_session", override_get_read_session)
+    monkeypatch.setattr("app.router.EVENT_STREAM_CHUNK_SIZE", 2)
+
+    now = datetime.now()
+    for hours in (1, 2, 3):
+        await client.post(
+            "/events/",
+            json=event_payload(f"Event {hours}", now + timedelta(hours=hours)),
+        )
+
+    response = await client.get("/internal/events/stream", params={"limit": 3})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    chunks = [json.loads(line) for line in response.text.splitlines()]
+    assert [[event["name"] for event in chunk] for chunk in chunks] == [
+        ["Event 1", "Event 2"],
+        ["Event 3"],
+    ]
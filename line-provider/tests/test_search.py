@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+from sqlalchemy import text
+from sqlalchemy.future import select
+
+from app.crud import prefix_tsquery
+from app.models import events, search_document
+
+FUTURE_DEADLINE = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+PAST_DEADLINE = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+
+
+async def create_events(client, monkeypatch, *names_and_deadlines):
+    monkeypatch.setattr("app.crud.send_message", AsyncMock())
+    for name, deadline in names_and_deadlines:
+        response = await client.post(
+            "/events/", json={"name": name, "deadline": deadline}
+        )
+        assert response.status_code == 201
+
+
+def test_prefix_tsquery():
+    assert prefix_tsquery("Real  Madr") == "real:* & madr:*"
+    assert prefix_tsquery("it's") == "it:* & s:*"
+    assert prefix_tsquery(" -&| ") is None
+
+
+async def test_search_matches_word_prefixes(client, monkeypatch):
+    await create_events(
+        client,
+        monkeypatch,
+        ("Real Madrid vs Barcelona", FUTURE_DEADLINE),
+        ("Atletico Madrid vs Sevilla", FUTURE_DEADLINE),
+        ("Liverpool vs Arsenal", FUTURE_DEADLINE),
+    )
+
+    response = await client.get("/events/search", params={"q": "madr"})
+    assert response.status_code == 200
+    assert {event["name"] for event in response.json()} == {
+        "Real Madrid vs Barcelona",
+        "Atletico Madrid vs Sevilla",
+    }
+
+    response = await client.get("/events/search", params={"q": "real madr"})
+    assert [event["name"] for event in response.json()] == ["Real Madrid vs Barcelona"]
+
+
+async def test_search_paginates_and_filters_open_events(client, monkeypatch):
+    await create_events(
+        client,
+        monkeypatch,
+        ("Derby 1", FUTURE_DEADLINE),
+        ("Derby 2", FUTURE_DEADLINE),
+        ("Derby 3", PAST_DEADLINE),
+    )
+
+    first_page = await client.get("/events/search", params={"q": "derby", "limit": 2})
+    second_page = await client.get(
+        "/events/search", params={"q": "derby", "limit": 2, "offset": 2}
+    )
+    assert len(first_page.json()) == 2
+    assert len(second_page.json()) == 1
+
+    open_events = await client.get(
+        "/events/search", params={"q": "derby", "open_only": True}
+    )
+    assert {event["name"] for event in open_events.json()} == {"Derby 1", "Derby 2"}
+
+
+async def test_search_uses_gin_index(session):
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    query = select(events.c.id).where(
+        search_document.op("@@")(text("to_tsquery('simple'::regconfig, 'real:*')"))
+    )
+    compiled = query.compile(compile_kwargs={"literal_binds": True})
+
+    plan = (await session.execute(text(f"EXPLAIN {compiled}"))).scalars().all()
+
+    assert any("ix_events_search" in line for line in plan)
+
+
+async def test_autocomplete_matches_any_word_of_open_events(client, monkeypatch):
+    await create_events(
+        client,
+        monkeypatch,
+        ("Real Madrid vs Barcelona", FUTURE_DEADLINE),
+        ("Real Sociedad vs Betis", FUTURE_DEADLINE),
+        ("Real Oviedo vs Malaga", PAST_DEADLINE),
+    )
+
+    response = await client.get("/events/autocomplete", params={"prefix": "real m"})
+    assert response.status_code == 200
+    assert [event["name"] for event in response.json()] == ["Real Madrid vs Barcelona"]
+
+    response = await client.get("/events/autocomplete", params={"prefix": "MAD"})
+    assert [event["name"] for event in response.json()] == ["Real Madrid vs Barcelona"]
+    assert set(response.json()[0]) == {"id", "name", "deadline"}
+
+    response = await client.get("/events/autocomplete", params={"prefix": "real"})
+    assert len(response.json()) == 2